@@ -0,0 +1,96 @@
+"""/smart-ask answer tiers: everything on gpt-4o vs local answers and a model per category
+
+    python -m benchmarks.answer_tiers --requests 100 --chitchat-share 0.4 --llm-latency 1.0
+
+Runs two servers against the local stubs, ingests ncert_ch11.pdf into each
+and sends the same shuffled mix of document questions and small talk
+(greetings, thanks, "how do I upload a pdf") to /smart-ask: once with
+LOCAL_ANSWERS=0 and every category on gpt-4o, as before, and once with the
+default tiers. Reports the share of requests answered locally, chat calls,
+and the latency of each tier (the response's answered_by).
+
+Classification needs the all-MiniLM-L6-v2 router model in the local Hugging
+Face cache; the servers run offline, so without it every request fails.
+"""
+import argparse
+import json
+import os
+import random
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+import requests
+
+from benchmarks.e2e import ingest
+from benchmarks.harness import REPO_ROOT, ServerProcess, latency_summary, stub_environment
+from benchmarks.questions import CHITCHAT, DOCUMENT_QUESTIONS
+from benchmarks.stubs import openai_stub, sarvam_stub
+
+BASELINE_ENV = {
+    "LOCAL_ANSWERS": "0",
+    "SMART_ASK_MODELS": "meta_query=gpt-4o,system_query=gpt-4o,conversation=gpt-4o",
+}
+
+def build_questions(count: int, chitchat_share: float, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    return [rng.choice(CHITCHAT if rng.random() < chitchat_share else DOCUMENT_QUESTIONS) for _ in range(count)]
+
+def run_server(extra_env: Dict[str, str], questions: List[str], args, llm) -> Dict[str, Any]:
+    env = dict(extra_env, HF_HUB_OFFLINE="1", TRANSFORMERS_OFFLINE="1", COALESCE_REQUESTS="0")
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors = 0
+    with ServerProcess(extra_env=env) as server:
+        ingestion = ingest(server.url, os.path.join(REPO_ROOT, "ncert_ch11.pdf"), args.timeout)
+        if ingestion["status"] != "completed":
+            raise SystemExit(f"Ingestion failed: {ingestion}")
+        calls_before = llm.calls["/v1/chat/completions"]
+        for question in questions:
+            start = time.perf_counter()
+            response = requests.post(f"{server.url}/smart-ask", json={"question": question}, timeout=args.timeout)
+            if response.status_code != 200:
+                errors += 1
+                continue
+            latencies[response.json().get("answered_by") or "gpt-4o"].append(time.perf_counter() - start)
+        chat_calls = llm.calls["/v1/chat/completions"] - calls_before
+
+    answered = sum(len(samples) for samples in latencies.values())
+    return {
+        "errors": errors,
+        "chat_calls": chat_calls,
+        "local_share": round(len(latencies["local"]) / answered, 3) if answered else None,
+        "all": latency_summary([sample for samples in latencies.values() for sample in samples]),
+        "tiers": {tier: dict(latency_summary(samples), requests=len(samples)) for tier, samples in latencies.items() if samples},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--chitchat-share", type=float, default=0.4)
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    questions = build_questions(args.requests, args.chitchat_share, args.seed)
+    with openai_stub(latency=args.llm_latency) as llm, sarvam_stub() as sarvam:
+        stub_environment(openai=llm, sarvam=sarvam)
+        report = {
+            "config": vars(args),
+            "gpt-4o only": run_server(BASELINE_ENV, questions, args, llm),
+            "tiered": run_server({}, questions, args, llm),
+        }
+
+    for name in ("gpt-4o only", "tiered"):
+        run = report[name]
+        print(f"{name:12s} {run['chat_calls']:>4} chat calls | {run['errors']} errors | local {run['local_share']} | "
+              f"p50 {run['all']['p50_ms']} ms | p95 {run['all']['p95_ms']} ms")
+        for tier, stats in run["tiers"].items():
+            print(f"    {tier:12s} {stats['requests']:>4} requests | p50 {stats['p50_ms']} ms | p95 {stats['p95_ms']} ms")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
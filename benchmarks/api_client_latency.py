@@ -0,0 +1,60 @@
+"""Round-trip latency of sequential questions: bare requests.post vs APIClient
+
+    python -m benchmarks.api_client_latency --questions 200
+
+Runs the FastAPI app against the OpenAI stub (zero model latency by default,
+so only transport overhead is measured) and asks the same number of
+questions through bare requests.post calls and through the Streamlit
+APIClient's pooled session.
+"""
+import argparse
+import os
+import statistics
+import time
+
+import requests
+
+from benchmarks.harness import AppServer, seed_collection, stub_environment
+from benchmarks.stubs import openai_stub
+
+def summarize(label: str, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<26} mean {statistics.mean(samples) * 1000:7.2f} ms | "
+          f"p50 {statistics.median(samples) * 1000:7.2f} ms | p95 {p95 * 1000:7.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with openai_stub(latency=args.llm_latency, token_interval=0.0) as llm:
+        stub_environment(openai=llm)
+        import main as app_module
+        seed_collection(app_module)
+
+        with AppServer(app_module.app) as server:
+            os.environ["API_BASE_URL"] = server.url
+            from streamlit_app import APIClient
+
+            question = "what is the law of conservation of energy"
+            bare = []
+            for _ in range(args.questions):
+                start = time.perf_counter()
+                response = requests.post(f"{server.url}/ask", json={"question": question})
+                response.raise_for_status()
+                bare.append(time.perf_counter() - start)
+
+            pooled = []
+            for _ in range(args.questions):
+                start = time.perf_counter()
+                APIClient.ask(question)
+                pooled.append(time.perf_counter() - start)
+
+        print(f"{args.questions} sequential /ask calls")
+        summarize("requests.post (no session)", bare)
+        summarize("APIClient (pooled session)", pooled)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Whole-chapter summary: one huge prompt vs map-reduce with cached partials
+
+    python -m benchmarks.chapter_summary --llm-latency 1.0 --concurrency 4
+
+Extracts the sections of ncert_ch11.pdf and summarizes them with
+utils.summarizer against the OpenAI stub: cold (empty cache), warm (same
+text again) and incremental (one section edited, as after a re-ingest of a
+corrected PDF). The baseline is a single call carrying the whole chapter,
+which is what the summary tool would need without map-reduce. Reports
+calls, wall time and the largest and total prompt sizes.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("SUMMARY_CACHE_DIR", tempfile.mkdtemp(prefix="bench_summaries_"))
+
+from openai import OpenAI
+
+from benchmarks.harness import REPO_ROOT, stub_environment
+from benchmarks.stubs import openai_stub
+from utils.filter.clean_text import split_sections
+from utils.filter.extract_text_pdf import extract_and_save_text
+from utils.summarizer import Summarizer
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pdf", default=os.path.join(REPO_ROOT, "ncert_ch11.pdf"))
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    sections = split_sections(extract_and_save_text(args.pdf, tempfile.mkdtemp(prefix="bench_extract_")))
+    prompt_sizes = []
+
+    with openai_stub(latency=args.llm_latency) as llm:
+        stub_environment(openai=llm)
+        client = OpenAI()
+
+        async def chat(call, **kwargs):
+            prompt_sizes.append(sum(len(message["content"]) for message in kwargs["messages"]))
+            return await asyncio.to_thread(client.chat.completions.create, **kwargs)
+
+        summarizer = Summarizer(chat, concurrency=args.concurrency)
+
+        def run(name, coroutine_factory):
+            prompt_sizes.clear()
+            start = time.perf_counter()
+            asyncio.run(coroutine_factory())
+            print(f"{name:12s} {len(prompt_sizes):>3} calls | {time.perf_counter() - start:6.2f} s | "
+                  f"largest prompt {max(prompt_sizes, default=0):>6} chars | total {sum(prompt_sizes):>6} chars")
+
+        whole_text = "\n\n".join(section["text"] for section in sections)
+        run("one prompt", lambda: chat(
+            "summary_one_prompt",
+            model="gpt-4o",
+            messages=[{"role": "system", "content": "You are an expert at creating educational summaries."},
+                      {"role": "user", "content": f"Create a detailed summary of this chapter.\n{whole_text}"}],
+            response_format={"type": "json_object"}
+        ))
+        run("cold", lambda: summarizer.summarize(sections))
+        run("warm", lambda: summarizer.summarize(sections))
+        edited = [dict(section) for section in sections]
+        edited[-1]["text"] += " A corrected sentence added in the new edition."
+        run("incremental", lambda: summarizer.summarize(edited))
+
+    print(f"{len(sections)} sections, {len(whole_text)} chars")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Burst of identical questions, with and without request coalescing
+
+    python -m benchmarks.coalescing_burst --burst 40 --llm-latency 1.0
+    python -m benchmarks.coalescing_burst --endpoints ask,voice-ask --modes on
+
+Emulates a projected question: --burst students send the same question
+(with the small case/punctuation differences real typing has) at the same
+instant to each endpoint. For every mode a server runs against the local
+stubs with COALESCE_REQUESTS set accordingly, and the report lists the
+upstream OpenAI/Sarvam calls the burst caused and its latency percentiles.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List
+
+from benchmarks.e2e import ingest, send
+from benchmarks.harness import REPO_ROOT, ServerProcess, latency_summary, stub_environment
+from benchmarks.stubs import openai_stub, sarvam_stub
+
+VARIANTS = ["What is work?", "what is work", "What is work ?", "What  is WORK?"]
+TOOL_VARIANTS = ["Make flashcards on work and energy", "make flashcards on work and energy.",
+                 "Make flashcards on Work and Energy"]
+
+def upstream_calls(stub) -> int:
+    """API calls made to a stub, not counting new connections"""
+    return sum(count for path, count in stub.calls.items() if not path.startswith("__"))
+
+def burst(base_url: str, path: str, size: int, timeout: float) -> List[Any]:
+    """Send `size` near-identical requests to `path` at the same moment"""
+    variants = TOOL_VARIANTS if path == "/learning-tools" else VARIANTS
+    barrier = threading.Barrier(size)
+    results: List[Any] = [None] * size
+
+    def student(index: int):
+        barrier.wait()
+        results[index] = send(base_url, path, variants[index % len(variants)], timeout)
+
+    threads = [threading.Thread(target=student, args=(i,)) for i in range(size)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def run_mode(coalesce: bool, paths: List[str], args, llm, sarvam) -> Dict[str, Any]:
+    extra_env = {"HF_HUB_OFFLINE": "1", "TRANSFORMERS_OFFLINE": "1", "COALESCE_REQUESTS": "1" if coalesce else "0"}
+    report = {}
+    with ServerProcess(extra_env=extra_env) as server:
+        ingestion = ingest(server.url, os.path.join(REPO_ROOT, "ncert_ch11.pdf"), args.timeout)
+        if ingestion["status"] != "completed":
+            raise SystemExit(f"Ingestion failed: {ingestion}")
+        for path in paths:
+            send(server.url, path, "Warm-up question", args.timeout)
+
+        for path in paths:
+            before = {"openai": upstream_calls(llm), "sarvam": upstream_calls(sarvam)}
+            start = time.perf_counter()
+            results = burst(server.url, path, args.burst, args.timeout)
+            wall = time.perf_counter() - start
+            report[path] = {
+                "requests": len(results),
+                "errors": sum(1 for _, _, error in results if error),
+                "wall_seconds": round(wall, 3),
+                "upstream_calls": {
+                    "openai": upstream_calls(llm) - before["openai"],
+                    "sarvam": upstream_calls(sarvam) - before["sarvam"]
+                },
+                **latency_summary([seconds for _, seconds, error in results if not error])
+            }
+            print(f"coalesce={'on ' if coalesce else 'off'} {path:16s} openai calls "
+                  f"{report[path]['upstream_calls']['openai']:>4} | sarvam calls {report[path]['upstream_calls']['sarvam']:>4} | "
+                  f"p50 {report[path]['p50_ms']} ms | p99 {report[path]['p99_ms']} ms | "
+                  f"errors {report[path]['errors']}/{len(results)}", flush=True)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--burst", type=int, default=40, help="Simultaneous identical requests")
+    parser.add_argument("--endpoints", default="ask,learning-tools,voice-ask")
+    parser.add_argument("--modes", default="off,on", help="Coalescing modes to compare, in order")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Stub time to first token")
+    parser.add_argument("--token-interval", type=float, default=0.01, help="Stub time per further token")
+    parser.add_argument("--sarvam-latency", type=float, default=0.2)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+    paths = ["/" + name.strip().lstrip("/") for name in args.endpoints.split(",")]
+
+    with openai_stub(latency=args.llm_latency, token_interval=args.token_interval) as llm, \
+            sarvam_stub(latency=args.sarvam_latency) as sarvam:
+        stub_environment(openai=llm, sarvam=sarvam)
+        report = {
+            "config": vars(args),
+            "modes": {mode: run_mode(mode == "on", paths, args, llm, sarvam) for mode in args.modes.split(",")}
+        }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
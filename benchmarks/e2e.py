@@ -0,0 +1,187 @@
+"""Offline end-to-end benchmark: PDF ingestion plus a mixed question workload
+
+    python -m benchmarks.e2e --requests 200 --concurrency 8 --output e2e.json
+    python -m benchmarks.e2e --llm-latency 0.5 --jitter 0.2 --sarvam-latency 0.1
+
+Starts the OpenAI and Sarvam stubs, runs main:app under uvicorn in a child
+process, ingests ncert_ch11.pdf through /initialize, then sends a weighted
+mix of /ask, /smart-ask, /learning-tools and /voice-ask requests. The JSON
+report (throughput, p50/p95/p99 per endpoint, errors, server peak RSS and
+upstream call counts) is printed and optionally written to --output.
+
+/smart-ask needs the all-MiniLM-L6-v2 router model in the local Hugging Face
+cache. The server runs with HF_HUB_OFFLINE=1 unless --allow-downloads is
+given, so a missing model shows up as errors rather than a network fetch.
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from benchmarks.harness import REPO_ROOT, ServerProcess, latency_summary, stub_environment
+from benchmarks.questions import CHITCHAT, DOCUMENT_QUESTIONS, TOOL_REQUESTS
+from benchmarks.stubs import openai_stub, sarvam_stub
+
+ENDPOINT_QUESTIONS = {
+    "/ask": DOCUMENT_QUESTIONS,
+    "/smart-ask": DOCUMENT_QUESTIONS + CHITCHAT,
+    "/learning-tools": TOOL_REQUESTS + DOCUMENT_QUESTIONS[:4],
+    "/voice-ask": DOCUMENT_QUESTIONS,
+}
+
+_local = threading.local()
+
+def _session() -> requests.Session:
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """"ask=3,smart-ask=3" -> {"/ask": 3.0, "/smart-ask": 3.0}"""
+    weights = {}
+    for part in mix.split(","):
+        name, weight = part.split("=")
+        path = "/" + name.strip().lstrip("/")
+        if path not in ENDPOINT_QUESTIONS:
+            raise ValueError(f"Unknown endpoint in mix: {name}")
+        weights[path] = float(weight)
+    return weights
+
+def build_workload(weights: Dict[str, float], count: int, seed: int) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    paths = [path for path, weight in weights.items() if weight > 0]
+    chosen = rng.choices(paths, weights=[weights[path] for path in paths], k=count)
+    return [(path, rng.choice(ENDPOINT_QUESTIONS[path])) for path in chosen]
+
+def send(base_url: str, path: str, question: str, timeout: float) -> Tuple[str, float, Optional[str]]:
+    """Issue one request and read the whole body
+
+    Returns (path, seconds, error) where error is None on success, else the
+    HTTP status, "stream_error" or the exception class name.
+    """
+    start = time.perf_counter()
+    error = None
+    try:
+        if path == "/voice-ask":
+            response = _session().post(f"{base_url}{path}", data={"question": question}, timeout=timeout, stream=True)
+            for line in response.iter_lines(chunk_size=65536):
+                if line and json.loads(line).get("type") == "error":
+                    error = "stream_error"
+        else:
+            response = _session().post(f"{base_url}{path}", json={"question": question}, timeout=timeout)
+        if response.status_code != 200:
+            error = str(response.status_code)
+    except requests.exceptions.RequestException as e:
+        error = type(e).__name__
+    if error and not error.startswith("4"):
+        # uvicorn closes the connection after an unhandled error; don't reuse it
+        _local.__dict__.pop("session", None)
+    return path, time.perf_counter() - start, error
+
+def ingest(base_url: str, pdf_path: str, timeout: float) -> Dict[str, Any]:
+    start = time.perf_counter()
+    job = requests.post(f"{base_url}/initialize", json={"pdf_path": pdf_path}, timeout=30).json()
+    while True:
+        status = requests.get(f"{base_url}/initialize/{job['job_id']}", timeout=30).json()
+        if status["status"] in ("completed", "failed") or time.perf_counter() - start > timeout:
+            break
+        time.sleep(0.1)
+    seconds = time.perf_counter() - start
+    return {
+        "job_id": job["job_id"],
+        "status": status["status"],
+        "error": status.get("error"),
+        "seconds": round(seconds, 3),
+        "chunks": status["chunks_total"],
+        "chunks_per_sec": round(status["chunks_total"] / seconds, 2) if seconds > 0 else None
+    }
+
+def run_workload(base_url: str, workload: List[Tuple[str, str]], concurrency: int, timeout: float) -> Dict[str, Any]:
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(lambda item: send(base_url, item[0], item[1], timeout), workload))
+        wall = time.perf_counter() - start
+
+    return summarize(results, wall)
+
+def summarize(results: List[Tuple[str, float, Optional[str]]], wall: float) -> Dict[str, Any]:
+    """Overall and per-endpoint throughput, latency of successful requests and error kinds"""
+    def stats(samples):
+        return {
+            "requests": len(samples),
+            "errors": sum(1 for _, error in samples if error),
+            "error_kinds": dict(Counter(error for _, error in samples if error)),
+            "throughput_rps": round(len(samples) / wall, 2) if wall > 0 else None,
+            **latency_summary([seconds for seconds, error in samples if not error])
+        }
+
+    report = {"wall_seconds": round(wall, 3), **stats([(seconds, error) for _, seconds, error in results])}
+    report["endpoints"] = {
+        path: stats([(seconds, error) for p, seconds, error in results if p == path])
+        for path in sorted({path for path, _, _ in results})
+    }
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pdf", default=os.path.join(REPO_ROOT, "ncert_ch11.pdf"))
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mix", default="ask=3,smart-ask=3,learning-tools=2,voice-ask=1",
+                        help="Relative weight per endpoint")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Stub time to first token")
+    parser.add_argument("--token-interval", type=float, default=0.0, help="Stub time per further token")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra uniform random latency, both stubs")
+    parser.add_argument("--sarvam-latency", type=float, default=0.02)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--allow-downloads", action="store_true", help="Let the server fetch missing models")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--server-log", help="Write the server's output to this file")
+    args = parser.parse_args()
+
+    with openai_stub(latency=args.llm_latency, jitter=args.jitter, token_interval=args.token_interval) as llm, \
+            sarvam_stub(latency=args.sarvam_latency, jitter=args.jitter) as sarvam:
+        stub_environment(openai=llm, sarvam=sarvam)
+        extra_env = {} if args.allow_downloads else {"HF_HUB_OFFLINE": "1", "TRANSFORMERS_OFFLINE": "1"}
+
+        with ServerProcess(extra_env=extra_env, log_path=args.server_log) as server:
+            ingestion = ingest(server.url, os.path.abspath(args.pdf), args.timeout)
+            if ingestion["status"] != "completed":
+                raise SystemExit(f"Ingestion failed: {ingestion}")
+
+            weights = parse_mix(args.mix)
+            # One untimed request per endpoint loads lazy models and opens connections
+            for path in weights:
+                send(server.url, path, ENDPOINT_QUESTIONS[path][0], args.timeout)
+            calls_before = {"openai": dict(llm.calls), "sarvam": dict(sarvam.calls)}
+
+            workload = run_workload(server.url, build_workload(weights, args.requests, args.seed),
+                                    args.concurrency, args.timeout)
+            peak_rss = server.peak_rss_bytes()
+
+    report = {
+        "config": vars(args),
+        "ingestion": ingestion,
+        "workload": workload,
+        "server_peak_rss_mb": round(peak_rss / 1024 / 1024, 1) if peak_rss else None,
+        "upstream_calls": {
+            name: {path: count - calls_before[name].get(path, 0) for path, count in stub.calls.items()}
+            for name, stub in (("openai", llm), ("sarvam", sarvam))
+        }
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Helpers for running the FastAPI app against the local stubs"""
+import math
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+
+from benchmarks.stubs import StubServer, embed_text
+
+SAMPLE_CHUNKS = [
+    "energy is the capacity to do work and is measured in joules.",
+    "the law of conservation of energy states that energy can neither be created nor destroyed.",
+    "kinetic energy is the energy possessed by a body due to its motion.",
+    "potential energy is the energy stored in a body due to its position or configuration.",
+]
+
+def stub_environment(openai: Optional[StubServer] = None, sarvam: Optional[StubServer] = None):
+    """Point the OpenAI SDK and Sarvam tools at the stubs; call before importing main"""
+    if openai is not None:
+        os.environ["OPENAI_API_KEY"] = "stub-key"
+        os.environ["OPENAI_BASE_URL"] = f"{openai.url}/v1"
+    if sarvam is not None:
+        os.environ["SARVAM_API_KEY"] = "stub-key"
+        os.environ["SARVAM_API_BASE_URL"] = sarvam.url
+    # Fresh caches so results are not served from a previous run
+    os.environ["SARVAM_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench_sarvam_cache_")
+
+def clear_sarvam_caches():
+    """Empty the translation/audio caches between timed runs"""
+    from sarvamai_tools.cache import audio_cache, translation_cache
+
+    for cache in (translation_cache, audio_cache):
+        for name in os.listdir(cache.directory):
+            shutil.rmtree(os.path.join(cache.directory, name), ignore_errors=True)
+
+def seed_collection(app_module, chunks=SAMPLE_CHUNKS):
+    """Give the app a small in-memory-embedded collection without running ingestion
+
+    Switches to a temporary working directory first so the vector DB and
+    processing output never land in the repository.
+    """
+    from utils.embeddings.store_embeddings import store_embeddings_in_chroma
+
+    os.chdir(tempfile.mkdtemp(prefix="bench_app_"))
+    app_module.pdf_processor._collection = store_embeddings_in_chroma(
+        [{"chunk": chunk, "embedding": embed_text(chunk)} for chunk in chunks],
+        db_path="vector_db/bench"
+    )
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def percentile(samples: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in 0-100) of the samples"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = max(math.ceil(q / 100 * len(ordered)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+def latency_summary(samples: List[float]) -> Dict[str, Optional[float]]:
+    """p50/p95/p99/mean/max in milliseconds"""
+    def ms(value):
+        return round(value * 1000, 2) if value is not None else None
+    return {
+        "p50_ms": ms(percentile(samples, 50)),
+        "p95_ms": ms(percentile(samples, 95)),
+        "p99_ms": ms(percentile(samples, 99)),
+        "mean_ms": ms(sum(samples) / len(samples)) if samples else None,
+        "max_ms": ms(max(samples)) if samples else None
+    }
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class AppServer:
+    """Runs an ASGI app under uvicorn on a background thread"""
+
+    def __init__(self, app, port: Optional[int] = None):
+        import uvicorn
+
+        self.port = port or free_port()
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "AppServer":
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
+
+class ServerProcess:
+    """Runs main:app under uvicorn in a child process, in a scratch working directory
+
+    The child inherits the current environment (call stub_environment first),
+    so its memory can be measured on its own. extra_env overrides variables
+    for the child only. The server's output goes to log_path if given. With
+    preload, gunicorn imports the app once and forks the uvicorn workers. A
+    given workdir is kept on exit, so a later server can start on its state.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        extra_env: Optional[Dict[str, str]] = None,
+        startup_timeout: float = 120,
+        log_path: Optional[str] = None,
+        preload: bool = False,
+        workdir: Optional[str] = None
+    ):
+        self.port = free_port()
+        self.workers = workers
+        self.preload = preload
+        self.keep_workdir = workdir is not None
+        self.workdir = workdir or tempfile.mkdtemp(prefix="bench_server_")
+        self.env = dict(os.environ, PYTHONPATH=REPO_ROOT, **(extra_env or {}))
+        self.startup_timeout = startup_timeout
+        self.log_path = log_path
+        self._log = None
+        self.process: Optional[subprocess.Popen] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "ServerProcess":
+        self._log = open(self.log_path, 'w') if self.log_path else subprocess.DEVNULL
+        if self.preload:
+            command = [sys.executable, "-m", "gunicorn", "main:app", "-k", "uvicorn.workers.UvicornWorker", "--preload",
+                       "-w", str(self.workers), "-b", f"127.0.0.1:{self.port}", "--log-level", "warning"]
+        else:
+            command = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(self.port),
+                       "--workers", str(self.workers), "--log-level", "warning"]
+        self.process = subprocess.Popen(
+            command,
+            cwd=self.workdir,
+            env=self.env,
+            stdout=self._log,
+            stderr=self._log if self.log_path else None
+        )
+        deadline = time.time() + self.startup_timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Server exited during startup with code {self.process.returncode}")
+            try:
+                requests.get(f"{self.url}/metrics", timeout=1)
+                return self
+            except requests.exceptions.ConnectionError:
+                time.sleep(0.2)
+        self.__exit__()
+        raise RuntimeError("Server did not start in time")
+
+    def pids(self) -> List[int]:
+        """The server process followed by its children (the workers, Linux only)"""
+        pids = [self.process.pid]
+        try:
+            with open(f"/proc/{self.process.pid}/task/{self.process.pid}/children") as f:
+                pids += [int(pid) for pid in f.read().split()]
+        except OSError:
+            pass
+        return pids
+
+    def memory(self) -> Dict[int, Dict[str, int]]:
+        """Rss, Pss and private (unshared) bytes per process from /proc/<pid>/smaps_rollup"""
+        memory = {}
+        for pid in self.pids():
+            fields = {}
+            try:
+                with open(f"/proc/{pid}/smaps_rollup") as f:
+                    for line in f:
+                        parts = line.split()
+                        if len(parts) == 3 and parts[2] == "kB":
+                            fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+            except OSError:
+                continue
+            memory[pid] = {
+                "rss": fields.get("Rss", 0),
+                "pss": fields.get("Pss", 0),
+                "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+            }
+        return memory
+
+    def peak_rss_bytes(self) -> Optional[int]:
+        """High-water mark of resident memory of the server and its workers (Linux only)"""
+        total = 0
+        for pid in self.pids():
+            try:
+                with open(f"/proc/{pid}/status") as f:
+                    for line in f:
+                        if line.startswith("VmHWM:"):
+                            total += int(line.split()[1]) * 1024
+            except OSError:
+                return None
+        return total or None
+
+    def __exit__(self, *exc):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if self.log_path and self._log is not None:
+            self._log.close()
+        if not self.keep_workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
@@ -0,0 +1,118 @@
+"""/ask tail latency with a slow-tailed LLM: no deadlines vs deadlines, hedging and the breaker
+
+    python -m benchmarks.hedging --requests 300 --concurrency 4 --slow-fraction 0.03 --slow-latency 8
+
+Runs two servers against the local stubs, ingests ncert_ch11.pdf into each
+and sends the same /ask questions, with a --slow-fraction of chat
+completions stalling --slow-latency seconds in the OpenAI stub. The
+baseline runs with LLM_HEDGE=0, no circuit breaker and a deadline long
+enough never to fire, as before; the other with hedging and a
+--deadline. Reports latency percentiles, errors and the chat calls sent
+(hedges included).
+
+A second, degraded phase makes every completion stall --degraded-latency
+seconds and sends --degraded-requests more questions: without a breaker
+each waits out its deadline, with one the server starts answering 503 at
+once after LLM_BREAKER_FAILURES timeouts.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from benchmarks.e2e import ingest
+from benchmarks.harness import REPO_ROOT, ServerProcess, latency_summary, stub_environment
+from benchmarks.questions import DOCUMENT_QUESTIONS
+from benchmarks.stubs import openai_stub, sarvam_stub
+
+def ask(base_url: str, question: str, timeout: float) -> Tuple[float, Optional[str]]:
+    start = time.perf_counter()
+    try:
+        response = requests.post(f"{base_url}/ask", json={"question": question}, timeout=timeout)
+        error = None if response.status_code == 200 else f"HTTP {response.status_code}"
+    except requests.RequestException as e:
+        error = type(e).__name__
+    return time.perf_counter() - start, error
+
+def send(base_url: str, count: int, concurrency: int, timeout: float) -> List[Tuple[float, Optional[str]]]:
+    questions = [DOCUMENT_QUESTIONS[i % len(DOCUMENT_QUESTIONS)] for i in range(count)]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(lambda question: ask(base_url, question, timeout), questions))
+
+def phase(base_url: str, count: int, args, llm) -> Dict[str, Any]:
+    calls_before = llm.calls["/v1/chat/completions"]
+    slow_before = llm.calls["__slow__"]
+    results = send(base_url, count, args.concurrency, args.timeout)
+    errors = [error for _, error in results if error]
+    return {
+        "requests": count,
+        "errors": len(errors),
+        "error_kinds": {kind: errors.count(kind) for kind in set(errors)},
+        "chat_calls": llm.calls["/v1/chat/completions"] - calls_before,
+        "slow_calls": llm.calls["__slow__"] - slow_before,
+        "latency": latency_summary([seconds for seconds, error in results if not error]),
+        "failure_latency": latency_summary([seconds for seconds, error in results if error]),
+    }
+
+def run_server(extra_env: Dict[str, str], args, llm) -> Dict[str, Any]:
+    env = dict(extra_env, COALESCE_REQUESTS="0")
+    with ServerProcess(extra_env=env) as server:
+        ingestion = ingest(server.url, os.path.join(REPO_ROOT, "ncert_ch11.pdf"), args.timeout)
+        if ingestion["status"] != "completed":
+            raise SystemExit(f"Ingestion failed: {ingestion}")
+        llm.slow_fraction, llm.slow_latency = args.slow_fraction, args.slow_latency
+        steady = phase(server.url, args.requests, args, llm)
+        llm.slow_fraction, llm.slow_latency = 1.0, args.degraded_latency
+        degraded = phase(server.url, args.degraded_requests, args, llm)
+        llm.slow_fraction = 0.0
+        metrics = requests.get(f"{server.url}/metrics", timeout=30).text
+    return {
+        "steady": steady,
+        "degraded": degraded,
+        "hedges": {line.split(" ")[0]: float(line.split(" ")[1]) for line in metrics.splitlines()
+                   if line.startswith("llm_hedges_total{")},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--slow-fraction", type=float, default=0.03, help="Share of chat completions that stall")
+    parser.add_argument("--slow-latency", type=float, default=8.0, help="Seconds a stalled completion takes on top")
+    parser.add_argument("--deadline", type=float, default=6.0, help="LLM_TIMEOUT_SECONDS of the hedged server")
+    parser.add_argument("--degraded-requests", type=int, default=16)
+    parser.add_argument("--degraded-latency", type=float, default=30.0)
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    configs = {
+        "no deadlines": {"LLM_HEDGE": "0", "LLM_TIMEOUT_SECONDS": str(args.timeout), "LLM_BREAKER_FAILURES": "0"},
+        "hedged": {"LLM_TIMEOUT_SECONDS": str(args.deadline)},
+    }
+    with openai_stub(latency=args.llm_latency) as llm, sarvam_stub() as sarvam:
+        stub_environment(openai=llm, sarvam=sarvam)
+        report = {"config": vars(args)}
+        for name, env in configs.items():
+            report[name] = run_server(env, args, llm)
+
+    for name in configs:
+        run = report[name]
+        for phase_name in ("steady", "degraded"):
+            result = run[phase_name]
+            ok, failed = result["latency"], result["failure_latency"]
+            print(f"{name:12s} {phase_name:8s} {result['chat_calls']:>4} chat calls ({result['slow_calls']} slow) | "
+                  f"{result['errors']} errors {result['error_kinds']} | p50 {ok['p50_ms']} ms | p95 {ok['p95_ms']} ms | "
+                  f"p99 {ok['p99_ms']} ms | max {ok['max_ms']} ms | failures p50 {failed['p50_ms']} ms")
+        print(f"{name:12s} hedges {run['hedges']}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Closed-loop load generator with a concurrency sweep and saturation detection
+
+    python -m benchmarks.load_sweep --levels 1,2,4,8,16,32 --duration 20
+    python -m benchmarks.load_sweep --url http://localhost:8000 --mode basic --slo-p95-ms 3000
+
+Each level runs that many simulated students, each sending a question,
+waiting for the full answer, optionally "thinking", and asking again. The
+questions are a weighted mix of document questions, chit-chat and learning
+tool requests (benchmarks/questions.py, or --corpus with the same keys),
+routed the way the Streamlit app routes them in the chosen mode.
+
+A level counts as saturated when throughput grows by less than --min-gain
+over the previous level, the error rate exceeds --max-error-rate, or p95
+exceeds --slo-p95-ms. The sweep stops at the first saturated level and
+reports the last healthy one as the recommended concurrency.
+
+Without --url a server is started against the local stub backends and
+ncert_ch11.pdf is ingested first, so the sweep runs offline.
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.e2e import ingest, send, summarize
+from benchmarks.harness import REPO_ROOT, ServerProcess, stub_environment
+from benchmarks.questions import CHITCHAT, DOCUMENT_QUESTIONS, TOOL_REQUESTS
+from benchmarks.stubs import openai_stub, sarvam_stub
+
+# Streamlit mode -> endpoint per kind of question
+MODE_ROUTES = {
+    "smart": {"document": "/smart-ask", "chitchat": "/smart-ask", "tool": "/learning-tools"},
+    "basic": {"document": "/ask", "chitchat": "/ask", "tool": "/learning-tools"},
+}
+
+def load_corpus(path: Optional[str]) -> Dict[str, List[str]]:
+    if path is None:
+        return {"document": DOCUMENT_QUESTIONS, "chitchat": CHITCHAT, "tool": TOOL_REQUESTS}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def parse_weights(text: str) -> Dict[str, float]:
+    return {name.strip(): float(weight) for name, weight in (part.split("=") for part in text.split(","))}
+
+def run_level(
+    base_url: str,
+    pick,
+    concurrency: int,
+    duration: float,
+    think_time: float,
+    timeout: float,
+    seed: int
+) -> Dict[str, Any]:
+    """Run `concurrency` closed-loop clients for `duration` seconds"""
+    results: List[Tuple[str, float, Optional[str]]] = []
+    start = time.perf_counter()
+    stop_at = start + duration
+
+    def client(index: int):
+        rng = random.Random(seed * 1000 + index)
+        while time.perf_counter() < stop_at:
+            path, question = pick(rng)
+            results.append(send(base_url, path, question, timeout))
+            if think_time:
+                time.sleep(rng.expovariate(1 / think_time))
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Requests in flight at stop_at finish late; count them against the real wall time
+    level = summarize(results, time.perf_counter() - start)
+    level["concurrency"] = concurrency
+    return level
+
+def saturation_reason(level: Dict[str, Any], previous: Optional[Dict[str, Any]], args) -> Optional[str]:
+    error_rate = level["errors"] / level["requests"] if level["requests"] else 1.0
+    if error_rate > args.max_error_rate:
+        return f"error rate {error_rate:.1%}"
+    if args.slo_p95_ms and (level["p95_ms"] is None or level["p95_ms"] > args.slo_p95_ms):
+        return f"p95 {level['p95_ms']} ms over SLO"
+    if previous and level["throughput_rps"] < previous["throughput_rps"] * (1 + args.min_gain):
+        return f"throughput {level['throughput_rps']} rps vs {previous['throughput_rps']} rps"
+    return None
+
+def sweep(base_url: str, args) -> Dict[str, Any]:
+    corpus = load_corpus(args.corpus)
+    routes = MODE_ROUTES[args.mode]
+    weights = parse_weights(args.mix)
+    kinds = [kind for kind in weights if weights[kind] > 0 and corpus.get(kind)]
+
+    def pick(rng: random.Random) -> Tuple[str, str]:
+        kind = rng.choices(kinds, weights=[weights[kind] for kind in kinds])[0]
+        return routes[kind], rng.choice(corpus[kind])
+
+    if args.warmup:
+        run_level(base_url, pick, 1, args.warmup, 0.0, args.timeout, seed=0)
+
+    levels: List[Dict[str, Any]] = []
+    recommended = None
+    saturated_at = None
+    for index, concurrency in enumerate(int(c) for c in args.levels.split(",")):
+        level = run_level(base_url, pick, concurrency, args.duration, args.think_time, args.timeout, seed=index + 1)
+        reason = saturation_reason(level, levels[-1] if levels else None, args)
+        level["saturated"] = reason
+        levels.append(level)
+        print(f"c={concurrency:<4} {level['throughput_rps']:>7} rps | p50 {level['p50_ms']} ms | "
+              f"p95 {level['p95_ms']} ms | p99 {level['p99_ms']} ms | errors {level['errors']}/{level['requests']}"
+              + (f" | saturated: {reason}" if reason else ""), flush=True)
+        if reason:
+            saturated_at = concurrency
+            break
+        recommended = concurrency
+
+    return {
+        "config": vars(args),
+        "levels": levels,
+        "saturated_at": saturated_at,
+        "recommended_concurrency": recommended,
+        "peak_throughput_rps": max((level["throughput_rps"] for level in levels), default=None)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Existing server to load; default starts one against the stubs")
+    parser.add_argument("--levels", default="1,2,4,8,16,32", help="Concurrency levels, in order")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per level")
+    parser.add_argument("--warmup", type=float, default=5, help="Seconds of single-client warm-up")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between a client's questions")
+    parser.add_argument("--mode", choices=sorted(MODE_ROUTES), default="smart")
+    parser.add_argument("--mix", default="document=6,chitchat=2,tool=2", help="Weight per question kind")
+    parser.add_argument("--corpus", help="JSON file with document/chitchat/tool question lists")
+    parser.add_argument("--min-gain", type=float, default=0.1, help="Least throughput gain per level")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--slo-p95-ms", type=float, help="Saturated once p95 exceeds this")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local server")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Stub time to first token")
+    parser.add_argument("--token-interval", type=float, default=0.01, help="Stub time per further token")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--output", help="Write the JSON curve to this file")
+    args = parser.parse_args()
+
+    if args.url:
+        report = sweep(args.url.rstrip("/"), args)
+    else:
+        with openai_stub(latency=args.llm_latency, jitter=args.jitter, token_interval=args.token_interval) as llm, \
+                sarvam_stub(latency=0.05, jitter=args.jitter) as sarvam:
+            stub_environment(openai=llm, sarvam=sarvam)
+            with ServerProcess(workers=args.workers, extra_env={"HF_HUB_OFFLINE": "1", "TRANSFORMERS_OFFLINE": "1"}) as server:
+                ingestion = ingest(server.url, os.path.join(REPO_ROOT, "ncert_ch11.pdf"), args.timeout)
+                if ingestion["status"] != "completed":
+                    raise SystemExit(f"Ingestion failed: {ingestion}")
+                report = sweep(server.url, args)
+
+    print(f"recommended concurrency: {report['recommended_concurrency']}, "
+          f"saturated at: {report['saturated_at']}, peak {report['peak_throughput_rps']} rps")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Prompt tokens per request: the previous inline prompts vs utils.prompts
+
+    python -m benchmarks.prompt_tokens --context-chunks 1 12
+
+Builds each kind of LLM request the server sends (Q&A, tool analysis, the
+four tools, the tool reply) for questions over ncert_ch11.pdf, once with
+the prompts as they were written inline before (instructions and JSON
+schemas interleaved with the context, schemas pretty-printed) and once
+with utils.prompts. Context is one retrieved chunk, or several joined to
+show the budget at work. Reports tokens per request and how many of them
+sit in the stable prefix a provider can cache. Runs offline; counts are
+exact with tiktoken installed and ~4 characters per token otherwise.
+"""
+import argparse
+import json
+import os
+import tempfile
+
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+
+from benchmarks.harness import REPO_ROOT
+from utils import prompts
+from utils.action_handler import ActionHandler
+from utils.filter.clean_text import clean_text
+from utils.filter.extract_text_pdf import extract_and_save_text
+
+TOOL_RESULT = {
+    "flashcards": [{"front": f"What is property {i} of sound?", "back": "A wave property with a worked example. " * 4}
+                   for i in range(5)]
+}
+
+def old_prompts(query: str, context: str, tool_schemas) -> dict:
+    """The user prompts of the previous inline layout, with their system messages"""
+    return {
+        "ask": ("You are a helpful physics teacher.", f"""Based on the following context, answer the question.
+    Context: {context}
+    Question: {query}"""),
+        "tool_analysis": ("You are a learning assistant that analyzes queries for potential tool usage.",
+                          f"""Analyze this query to determine if a learning tool would be helpful.It is not neccessary that every query needs learning tool hence respond accordingly.
+            Query: {query}
+
+            Available tools:
+            {json.dumps(tool_schemas, indent=2)}
+
+            Respond in JSON format with:
+            - should_use_tool (boolean)
+            - tool (string, name of tool if should_use_tool is true)
+            - parameters (object with required parameters if should_use_tool is true)
+            - confidence (float between 0 and 1)
+            - reasoning (string explaining the decision)
+            """),
+        "create_flashcards": ("You are an expert at creating educational flashcards.",
+                              f"""Create flashcards for learning about echo.
+        Use this content as reference: {context}
+
+        Generate 5 flashcards in this JSON format:
+        {{
+            "flashcards": [
+                {{"front": "question/term", "back": "answer/definition"}}
+            ]
+        }}
+
+        Make the cards clear, concise, and focused on key concepts."""),
+        "generate_practice": ("You are an expert at creating educational practice problems.",
+                              f"""Create practice problems about echo at basic level.
+            Use this content as reference: {context}
+
+            Generate problems in this JSON format:
+            {{
+                "problems": [
+                    {{
+                        "question": "problem statement",
+                        "solution": "step-by-step solution",
+                        "final_answer": "the answer",
+                        "explanation": "explanation of concepts used"
+                    }}
+                ]
+            }}"""),
+        "create_concept_map": ("You are an expert at creating concept maps.",
+                               f"""Create a concept map centered on echo.
+        Use this content as reference: {context}
+
+        Generate the concept map in this JSON format:
+        {{
+            "central_concept": "main topic",
+            "connections": [
+                {{
+                    "concept": "related concept",
+                    "relationship": "how it relates",
+                    "sub_concepts": ["more specific ideas"]
+                }}
+            ]
+        }}"""),
+        "generate_summary": ("You are an expert at creating educational summaries.",
+                             f"""Create a detailed summary about echo.
+        Use this content as reference: {context}
+
+        Generate the summary in this JSON format:
+        {{
+            "main_points": ["key ideas"],
+            "details": {{
+                "concept": "explanation"
+            }},
+            "examples": ["relevant examples"],
+            "additional_notes": "any important considerations"
+        }}"""),
+        "tool_response": ("You are a helpful learning assistant.",
+                          f"""Generate a helpful response to the user's query that incorporates the tool results.
+        Query: {query}
+        Tool Used: create_flashcards
+        Tool Results: {json.dumps(TOOL_RESULT, indent=2)}
+
+        Provide a natural, conversational response that:
+        1. Acknowledges the user's question
+        2. Explains what was created/generated
+        3. Guides them on how to use the results
+        """),
+    }
+
+def new_prompts(query: str, context: str, analysis_system: str) -> dict:
+    return {
+        "ask": (prompts.QA_SYSTEM, prompts.qa_user(query, context)),
+        "tool_analysis": (analysis_system, f"Query: {query}"),
+        "create_flashcards": (prompts.FLASHCARDS_SYSTEM, prompts.tool_user("Create 5 flashcards for learning about echo.", context)),
+        "generate_practice": (prompts.PRACTICE_SYSTEM, prompts.tool_user("Create practice problems about echo at basic level.", context)),
+        "create_concept_map": (prompts.CONCEPT_MAP_SYSTEM, prompts.tool_user("Create a concept map centered on echo.", context)),
+        "generate_summary": (prompts.SUMMARY_SYSTEM, prompts.tool_user("Create a detailed summary about echo.", context)),
+        "tool_response": (prompts.TOOL_RESPONSE_SYSTEM, prompts.tool_response_user(query, "create_flashcards", TOOL_RESULT)),
+    }
+
+def tokens(system: str, user: str):
+    messages = [{"role": "system", "content": system}, {"role": "user", "content": user}]
+    return prompts.count_message_tokens(messages), prompts.count_tokens(system)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pdf", default=os.path.join(REPO_ROOT, "ncert_ch11.pdf"))
+    parser.add_argument("--context-chunks", type=int, nargs="+", default=[1, 12],
+                        help="Retrieved chunks joined into the context, one run per value")
+    args = parser.parse_args()
+
+    chunks = clean_text(extract_and_save_text(args.pdf, tempfile.mkdtemp(prefix="bench_extract_")))
+    chunks.sort(key=len, reverse=True)
+    handler = ActionHandler()
+    query = "make flashcards on echo"
+    print(f"token counts: {'tiktoken o200k_base' if prompts._encoding is not None else '~4 chars per token (tiktoken not installed)'}")
+
+    for n in args.context_chunks:
+        context = "\n".join(chunks[:n])
+        before = old_prompts(query, context, handler.tool_schemas)
+        after = new_prompts(query, context, handler.analysis_system)
+        print(f"\ncontext: {n} chunk(s), {prompts.count_tokens(context)} tokens "
+              f"(budget PROMPT_CONTEXT_TOKENS={prompts.PROMPT_CONTEXT_TOKENS})")
+        totals = [0, 0, 0, 0]
+        for call in before:
+            old_total, old_prefix = tokens(*before[call])
+            new_total, new_prefix = tokens(*after[call])
+            for i, value in enumerate((old_total, old_prefix, new_total, new_prefix)):
+                totals[i] += value
+            print(f"{call:20s} before {old_total:>6} tokens ({old_prefix / old_total:4.0%} static prefix) | "
+                  f"after {new_total:>6} tokens ({new_prefix / new_total:4.0%} static prefix) | {new_total / old_total - 1:+5.0%}")
+        print(f"{'all':20s} before {totals[0]:>6} tokens ({totals[1] / totals[0]:4.0%} static prefix) | "
+              f"after {totals[2]:>6} tokens ({totals[3] / totals[2]:4.0%} static prefix) | {totals[2] / totals[0] - 1:+5.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Question corpus for the workload benchmarks, grouped by kind of traffic
+
+Document questions follow the NCERT Class 9 chapter on work and energy
+(ncert_ch11.pdf); tool requests use the keywords the OpenAI stub maps to
+each learning tool.
+"""
+DOCUMENT_QUESTIONS = [
+    "what is the law of conservation of energy",
+    "define work done by a constant force",
+    "what is kinetic energy and how is it calculated",
+    "explain potential energy of an object at a height",
+    "what is the commercial unit of energy",
+    "how is power defined",
+    "when is the work done by a force negative",
+    "what are the different forms of energy",
+    "how does energy transform when a ball is thrown up",
+    "what is one joule of work",
+    "what is the relation between kilowatt hour and joule",
+    "why is no work done when carrying a load on a level road",
+]
+
+CHITCHAT = [
+    "hello",
+    "thank you so much",
+    "good morning",
+    "what can you do",
+    "how do I upload a pdf",
+    "clear the conversation",
+    "that was helpful",
+    "who are you",
+]
+
+TOOL_REQUESTS = [
+    "make flashcards on kinetic and potential energy",
+    "give me practice problems on work done",
+    "create a concept map of energy",
+    "summarize the section on power",
+    "create flashcards about the law of conservation of energy",
+    "I want practice questions on power and energy",
+]
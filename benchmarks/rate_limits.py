@@ -0,0 +1,95 @@
+"""Interactive questions during a re-ingest against a rate-limited OpenAI stub
+
+    python -m benchmarks.rate_limits --rpm 120 --burst-seconds 5 --interval 2.0
+
+Ingests ncert_ch11.pdf once without limits, then turns on OpenAI-style
+request (and optionally token) limits in the stub, re-ingests the PDF (one
+embedding call per chunk) and sends /ask questions every --interval
+seconds until the re-ingest finishes. The server runs twice: with the
+client-side limiter off (no OPENAI_LIMITS, so calls only back off after a
+429) and with it set to the stub's limits, which hold for all models together. Reports 429s, re-ingest time and the
+latency and errors of the interactive questions.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from benchmarks.e2e import ingest
+from benchmarks.harness import REPO_ROOT, ServerProcess, latency_summary, stub_environment
+from benchmarks.questions import DOCUMENT_QUESTIONS
+from benchmarks.stubs import OpenAILimits, openai_stub, sarvam_stub
+
+def ask(base_url: str, question: str, timeout: float) -> Tuple[float, Optional[str]]:
+    start = time.perf_counter()
+    try:
+        response = requests.post(f"{base_url}/ask", json={"question": question}, timeout=timeout)
+        error = None if response.status_code == 200 else f"HTTP {response.status_code}"
+    except requests.RequestException as e:
+        error = type(e).__name__
+    return time.perf_counter() - start, error
+
+def run_server(limiter_env: Dict[str, str], args, llm) -> Dict[str, Any]:
+    pdf_path = os.path.join(REPO_ROOT, "ncert_ch11.pdf")
+    with ServerProcess(extra_env=limiter_env) as server:
+        if ingest(server.url, pdf_path, args.timeout)["status"] != "completed":
+            raise SystemExit("Initial ingestion failed")
+
+        llm.admit = OpenAILimits(args.rpm, args.tpm, args.burst_seconds).admit
+        rate_limited_before = llm.calls["__rate_limited__"]
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            reingest = pool.submit(ingest, server.url, pdf_path, args.timeout)
+            futures = []
+            while not reingest.done():
+                futures.append(pool.submit(ask, server.url, DOCUMENT_QUESTIONS[len(futures) % len(DOCUMENT_QUESTIONS)], args.timeout))
+                time.sleep(args.interval)
+            results: List[Tuple[float, Optional[str]]] = [future.result() for future in futures]
+            ingestion = reingest.result()
+        llm.admit = None
+
+    return {
+        "ingest_status": ingestion["status"],
+        "ingest_seconds": ingestion["seconds"],
+        "rate_limited": llm.calls["__rate_limited__"] - rate_limited_before,
+        "asks": len(results),
+        "ask_errors": sum(1 for _, error in results if error),
+        "ask_latency": latency_summary([seconds for seconds, error in results if not error]),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rpm", type=int, default=120)
+    parser.add_argument("--tpm", type=int, default=0)
+    parser.add_argument("--burst-seconds", type=float, default=5.0,
+                        help="Stub and limiter hold this many seconds of the per-minute limits")
+    parser.add_argument("--interval", type=float, default=2.0, help="Seconds between interactive /ask requests")
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    configs = {
+        "backoff only": {"OPENAI_LIMITS": ""},
+        "limiter": {"OPENAI_LIMITS": f"*={args.rpm}:{args.tpm}", "OPENAI_LIMIT_BURST_SECONDS": str(args.burst_seconds)},
+    }
+    with openai_stub(latency=args.llm_latency) as llm, sarvam_stub() as sarvam:
+        stub_environment(openai=llm, sarvam=sarvam)
+        report = {"config": vars(args)}
+        for name, env in configs.items():
+            report[name] = run_server(env, args, llm)
+
+    for name in configs:
+        run = report[name]
+        print(f"{name:13s} {run['rate_limited']:>4} x 429 | re-ingest {run['ingest_status']} in {run['ingest_seconds']:6.1f} s | "
+              f"/ask {run['asks']} sent, {run['ask_errors']} errors, p50 {run['ask_latency']['p50_ms']} ms, "
+              f"p95 {run['ask_latency']['p95_ms']} ms, max {run['ask_latency']['max_ms']} ms")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
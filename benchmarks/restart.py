@@ -0,0 +1,93 @@
+"""Server restart: reopening the persisted index vs ingesting the PDF again
+
+    python -m benchmarks.restart --llm-latency 0.3
+
+Ingests ncert_ch11.pdf into a server running in a scratch directory and
+stops it, then starts servers on the same directory and times from launch
+until the first /ask is answered, counting embedding calls made before it:
+
+- "re-ingest": REOPEN_INDEX=0, so /initialize runs again, as before
+- "reopen": the Chroma build under vector_db/ is reopened at startup
+- "reopen shared": the same with SHARED_INDEX=1 (its own first ingestion)
+- "stale manifest": the manifest names another chunker version, so the
+  index is not reopened and /ask reports the system is not initialized
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict
+
+import requests
+
+from benchmarks.e2e import ingest
+from benchmarks.harness import REPO_ROOT, ServerProcess, stub_environment
+from benchmarks.stubs import openai_stub, sarvam_stub
+
+PDF_PATH = os.path.join(REPO_ROOT, "ncert_ch11.pdf")
+
+def restart(workdir: str, env: Dict[str, str], reingest: bool, args, llm) -> Dict[str, Any]:
+    embeddings_before = llm.calls["/v1/embeddings"]
+    start = time.perf_counter()
+    with ServerProcess(extra_env=env, workdir=workdir) as server:
+        ready = time.perf_counter() - start
+        if reingest:
+            ingest(server.url, PDF_PATH, args.timeout)
+        embedding_calls = llm.calls["/v1/embeddings"] - embeddings_before
+        response = requests.post(f"{server.url}/ask", json={"question": "What is an echo?"}, timeout=args.timeout)
+        answered = time.perf_counter() - start
+    return {
+        "server_ready_seconds": round(ready, 2),
+        "first_answer_seconds": round(answered, 2),
+        "ask_status": response.status_code,
+        "embedding_calls_before_ask": embedding_calls,
+    }
+
+def make_stale(workdir: str):
+    for path in glob.glob(os.path.join(workdir, "vector_db", "build_*", "manifest.json")):
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        manifest["chunker_version"] = -1
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    chroma_dir = tempfile.mkdtemp(prefix="bench_restart_")
+    shared_dir = tempfile.mkdtemp(prefix="bench_restart_shared_")
+    report: Dict[str, Any] = {"config": vars(args)}
+    try:
+        with openai_stub(latency=args.llm_latency) as llm, sarvam_stub() as sarvam:
+            stub_environment(openai=llm, sarvam=sarvam)
+            for workdir, env in ((chroma_dir, {}), (shared_dir, {"SHARED_INDEX": "1"})):
+                with ServerProcess(extra_env=env, workdir=workdir) as server:
+                    if ingest(server.url, PDF_PATH, args.timeout)["status"] != "completed":
+                        raise SystemExit("Initial ingestion failed")
+
+            report["re-ingest"] = restart(chroma_dir, {"REOPEN_INDEX": "0"}, True, args, llm)
+            report["reopen"] = restart(chroma_dir, {}, False, args, llm)
+            report["reopen shared"] = restart(shared_dir, {"SHARED_INDEX": "1"}, False, args, llm)
+            make_stale(chroma_dir)
+            report["stale manifest"] = restart(chroma_dir, {}, False, args, llm)
+    finally:
+        shutil.rmtree(chroma_dir, ignore_errors=True)
+        shutil.rmtree(shared_dir, ignore_errors=True)
+
+    for name in ("re-ingest", "reopen", "reopen shared", "stale manifest"):
+        run = report[name]
+        print(f"{name:14s} server up {run['server_ready_seconds']:6.2f} s | first /ask {run['ask_status']} after "
+              f"{run['first_answer_seconds']:6.2f} s | {run['embedding_calls_before_ask']} embedding calls")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
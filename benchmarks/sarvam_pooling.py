@@ -0,0 +1,96 @@
+"""Per-call latency of Sarvam calls with and without connection pooling
+
+    python -m benchmarks.sarvam_pooling --calls 200 --connect-delay 0.05
+
+Runs against the local Sarvam stub; --connect-delay emulates the TCP+TLS
+handshake that every unpooled call pays against the real HTTPS endpoint.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+import requests
+
+from benchmarks.stubs import sarvam_stub
+from sarvamai_tools.client import AsyncSarvamClient, SarvamClient
+
+PAYLOAD = {
+    "input": "Energy can neither be created nor destroyed.",
+    "source_language_code": "en-IN",
+    "target_language_code": "hi-IN",
+    "speaker_gender": "Male",
+    "mode": "formal",
+    "model": "mayura:v1",
+    "enable_preprocessing": True
+}
+
+def summarize(label: str, samples: List[float]):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<22} mean {statistics.mean(samples) * 1000:7.2f} ms | "
+          f"p50 {statistics.median(samples) * 1000:7.2f} ms | p95 {p95 * 1000:7.2f} ms")
+
+def bench_unpooled(url: str, calls: int) -> List[float]:
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        response = requests.post(f"{url}/translate", json=PAYLOAD, headers={"api-subscription-key": "bench"})
+        response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def bench_pooled(url: str, calls: int) -> List[float]:
+    client = SarvamClient(api_key="bench", base_url=url)
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        client.post("/translate", json=PAYLOAD)
+        samples.append(time.perf_counter() - start)
+    client.close()
+    return samples
+
+async def bench_async(url: str, calls: int, concurrency: int) -> List[float]:
+    client = AsyncSarvamClient(api_key="bench", base_url=url, pool_size=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await client.post("/translate", json=PAYLOAD)
+            samples.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    await client.aclose()
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub processing time per call (s)")
+    parser.add_argument("--connect-delay", type=float, default=0.05, help="Emulated handshake per connection (s)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent calls for the async run")
+    args = parser.parse_args()
+
+    with sarvam_stub(latency=args.latency, connect_delay=args.connect_delay) as stub:
+        results = {
+            "requests.post (no pool)": bench_unpooled(stub.url, args.calls),
+            "SarvamClient (pooled)": bench_pooled(stub.url, args.calls),
+        }
+        connections_before_async = stub.calls["__connections__"]
+        start = time.perf_counter()
+        results[f"AsyncSarvamClient x{args.concurrency}"] = asyncio.run(
+            bench_async(stub.url, args.calls, args.concurrency)
+        )
+        async_wall = time.perf_counter() - start
+
+        print(f"{args.calls} calls each, connect delay {args.connect_delay * 1000:.0f} ms")
+        for label, samples in results.items():
+            summarize(label, samples)
+        print(f"async wall time {async_wall:.2f}s, "
+              f"{stub.calls['__connections__'] - connections_before_async} connections opened")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Per-section learning materials precomputed at ingest vs generated on demand
+
+    python -m benchmarks.section_precompute --llm-latency 2.0 --workers 4
+
+Runs two servers against the local stubs, one with PRECOMPUTE_SECTION_TOOLS
+off and one with it on, ingests ncert_ch11.pdf into both (waiting for the
+precompute stage on the second) and sends the same /learning-tools requests
+naming chapter sections, plus one that names no section. Reports how long
+the precompute stage took and the latency and chat calls per request.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict
+
+import requests
+
+from benchmarks.e2e import ingest
+from benchmarks.harness import REPO_ROOT, ServerProcess, stub_environment
+from benchmarks.stubs import openai_stub, sarvam_stub
+
+SECTION_REQUESTS = [
+    "summarize the section on echo",
+    "make flashcards on reverberation",
+    "create a concept map of speed of sound",
+    "make flashcards on the production of sound",
+    "summarize the section on sound waves",
+]
+OTHER_REQUESTS = ["create a concept map of the human ear"]
+
+def wait_for_precompute(base_url: str, job_id: str, timeout: float) -> Dict[str, Any]:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        state = requests.get(f"{base_url}/initialize/{job_id}", timeout=30).json()["precompute"]
+        if state is None or state["status"] in ("completed", "failed"):
+            return dict(state or {}, seconds=round(time.perf_counter() - start, 2))
+        time.sleep(0.2)
+    raise SystemExit("Precompute did not finish in time")
+
+def run_server(precompute: bool, args, llm) -> Dict[str, Any]:
+    extra_env = {
+        "HF_HUB_OFFLINE": "1",
+        "PRECOMPUTE_SECTION_TOOLS": "1" if precompute else "0",
+        "PRECOMPUTE_WORKERS": str(args.workers),
+        "SECTION_STORE_DIR": tempfile.mkdtemp(prefix="sections_"),
+        "TOOL_CACHE_DIR": tempfile.mkdtemp(prefix="tool_cache_"),
+    }
+    report: Dict[str, Any] = {"requests": {}}
+    with ServerProcess(extra_env=extra_env) as server:
+        ingestion = ingest(server.url, os.path.join(REPO_ROOT, "ncert_ch11.pdf"), args.timeout)
+        if ingestion["status"] != "completed":
+            raise SystemExit(f"Ingestion failed: {ingestion}")
+        if precompute:
+            calls_before = llm.calls["/v1/chat/completions"]
+            report["precompute"] = wait_for_precompute(server.url, ingestion["job_id"], args.timeout)
+            report["precompute"]["chat_calls"] = llm.calls["/v1/chat/completions"] - calls_before
+
+        for question in SECTION_REQUESTS + OTHER_REQUESTS:
+            calls_before = llm.calls["/v1/chat/completions"]
+            start = time.perf_counter()
+            response = requests.post(f"{server.url}/learning-tools", json={"question": question}, timeout=args.timeout)
+            response.raise_for_status()
+            report["requests"][question] = {
+                "ms": round((time.perf_counter() - start) * 1000, 1),
+                "chat_calls": llm.calls["/v1/chat/completions"] - calls_before
+            }
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--llm-latency", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, default=4, help="PRECOMPUTE_WORKERS")
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    with openai_stub(latency=args.llm_latency) as llm, sarvam_stub() as sarvam:
+        stub_environment(openai=llm, sarvam=sarvam)
+        report = {"config": vars(args), "on_demand": run_server(False, args, llm), "precomputed": run_server(True, args, llm)}
+
+    precompute = report["precomputed"]["precompute"]
+    print(f"precompute stage: {precompute['done']} materials, {precompute['failed']} failed, "
+          f"{precompute['chat_calls']} chat calls, {precompute['seconds']} s")
+    for question in SECTION_REQUESTS + OTHER_REQUESTS:
+        before, after = report["on_demand"]["requests"][question], report["precomputed"]["requests"][question]
+        print(f"{question:45s} on demand {before['ms']:>8} ms ({before['chat_calls']} calls) | "
+              f"precomputed {after['ms']:>8} ms ({after['chat_calls']} calls)")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
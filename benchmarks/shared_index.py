@@ -0,0 +1,155 @@
+"""Several workers: per-worker Chroma index vs one memory-mapped shared index
+
+    python -m benchmarks.shared_index --workers 4 --synthetic-chunks 100000
+
+Coverage: ingests ncert_ch11.pdf into a --workers server and sends /ask
+questions, once with the per-worker Chroma index, where only the worker
+that ran the ingestion can answer, and once with SHARED_INDEX=1.
+
+Memory: publishes a --synthetic-chunks index (random vectors, stub
+embedding size) into a shared index directory, starts servers on it with
+one and with --workers workers, sends /ask questions until every worker
+has mapped it and reads Pss from /proc/<pid>/smaps_rollup. That runs with
+uvicorn --workers, which starts each worker from scratch, and with
+gunicorn --preload, which forks them from a process that already imported
+the app. The cost of each extra worker is the Pss growth per worker added.
+The preloaded server then re-ingests the PDF and reports how long until
+every worker serves the new version.
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import numpy as np
+import requests
+
+from benchmarks.harness import REPO_ROOT, ServerProcess, stub_environment
+from benchmarks.questions import DOCUMENT_QUESTIONS
+from benchmarks.stubs import embed_text, openai_stub, sarvam_stub
+
+def ingest(base_url: str, pdf_path: str, timeout: float) -> Dict[str, Any]:
+    """Like benchmarks.e2e.ingest, but a worker that does not know the job (404) is not an error"""
+    start = time.perf_counter()
+    job = requests.post(f"{base_url}/initialize", json={"pdf_path": pdf_path}, timeout=30).json()
+    status, unknown = {"status": "queued"}, 0
+    while time.perf_counter() - start < timeout:
+        response = requests.get(f"{base_url}/initialize/{job['job_id']}", timeout=30)
+        if response.status_code == 404:
+            unknown += 1
+        else:
+            status = response.json()
+            if status["status"] in ("completed", "failed"):
+                break
+        time.sleep(0.1)
+    return {"status": status["status"], "seconds": round(time.perf_counter() - start, 2), "status_polls_404": unknown}
+
+def ask_all(base_url: str, count: int, concurrency: int = 8) -> Counter:
+    def ask(question: str) -> int:
+        return requests.post(f"{base_url}/ask", json={"question": question}, timeout=120).status_code
+
+    questions = [DOCUMENT_QUESTIONS[i % len(DOCUMENT_QUESTIONS)] for i in range(count)]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return Counter(pool.map(ask, questions))
+
+def served_versions(base_url: str, samples: int) -> Counter:
+    """shared_index_version reported by /metrics over `samples` scrapes (each goes to some worker)"""
+    versions = Counter()
+    for _ in range(samples):
+        for line in requests.get(f"{base_url}/metrics", timeout=30).text.splitlines():
+            if line.startswith("shared_index_version"):
+                versions[int(float(line.split()[-1]))] += 1
+    return versions
+
+def publish_synthetic(directory: str, chunks: int, seed: int = 7):
+    from utils.embeddings.index_manifest import build_manifest
+    from utils.embeddings.shared_index import SharedIndex
+
+    rng = np.random.default_rng(seed)
+    dim = len(embed_text("dimension probe"))
+    vectors = rng.random((chunks, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    SharedIndex(directory).publish(vectors, [f"synthetic chunk {i}" for i in range(chunks)],
+                                   build_manifest("synthetic", "synthetic.pdf", [], chunks))
+
+def coverage(args) -> Dict[str, Any]:
+    pdf_path = os.path.join(REPO_ROOT, "ncert_ch11.pdf")
+    report = {}
+    for name, env in (("per-worker chroma", {}), ("shared index", {"SHARED_INDEX": "1"})):
+        with ServerProcess(workers=args.workers, extra_env=env) as server:
+            ingestion = ingest(server.url, pdf_path, args.timeout)
+            answers = ask_all(server.url, args.asks)
+        report[name] = {"ingestion": ingestion, "ask_status": dict(answers)}
+    return report
+
+def memory(args, preload: bool, workers: int, index_dir: str) -> Dict[str, Any]:
+    env = {"SHARED_INDEX": "1", "SHARED_INDEX_DIR": index_dir}
+    with ServerProcess(workers=workers, extra_env=env, preload=preload) as server:
+        ask_all(server.url, args.asks)
+        processes = server.memory()
+        result = {
+            "pss_mb": round(sum(p["pss"] for p in processes.values()) / 2**20, 1),
+            "rss_mb": [round(p["rss"] / 2**20, 1) for p in processes.values()],
+            "private_mb": [round(p["private"] / 2**20, 1) for p in processes.values()],
+        }
+        if preload and workers > 1:
+            before = served_versions(server.url, 4 * workers)
+            ingestion = ingest(server.url, os.path.join(REPO_ROOT, "ncert_ch11.pdf"), args.timeout)
+            start = time.perf_counter()
+            target = max(before) + 1
+            while True:
+                ask_all(server.url, 2 * workers)
+                versions = served_versions(server.url, 4 * workers)
+                if set(versions) == {target} or time.perf_counter() - start > args.timeout:
+                    break
+            result["reload"] = {"ingestion": ingestion, "versions_before": dict(before), "versions_after": dict(versions),
+                                "all_workers_seconds": round(time.perf_counter() - start, 2)}
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--synthetic-chunks", type=int, default=100000)
+    parser.add_argument("--asks", type=int, default=40, help="/ask requests per measurement")
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    with openai_stub(latency=0.05, token_interval=0.0) as llm, sarvam_stub() as sarvam:
+        stub_environment(openai=llm, sarvam=sarvam)
+        report: Dict[str, Any] = {"config": vars(args), "coverage": coverage(args)}
+        for name, preload in (("uvicorn --workers", False), ("gunicorn --preload", True)):
+            index_dir = tempfile.mkdtemp(prefix="bench_shared_index_")
+            try:
+                publish_synthetic(index_dir, args.synthetic_chunks)
+                runs: List[Dict[str, Any]] = [memory(args, preload, workers, index_dir) for workers in (1, args.workers)]
+            finally:
+                shutil.rmtree(index_dir, ignore_errors=True)
+            extra = (runs[1]["pss_mb"] - runs[0]["pss_mb"]) / (args.workers - 1)
+            report[name] = {"1 worker": runs[0], f"{args.workers} workers": runs[1],
+                            "pss_per_extra_worker_mb": round(extra, 1),
+                            "extra_worker_share": round(extra / runs[0]["pss_mb"], 3)}
+
+    for name, run in report["coverage"].items():
+        print(f"{name:18s} ingestion {run['ingestion']['status']} ({run['ingestion']['status_polls_404']} status polls 404) | "
+              f"/ask status codes {run['ask_status']}")
+    for name in ("uvicorn --workers", "gunicorn --preload"):
+        run = report[name]
+        many = run[f"{args.workers} workers"]
+        print(f"{name:18s} Pss 1 worker {run['1 worker']['pss_mb']} MB | {args.workers} workers {many['pss_mb']} MB | "
+              f"+{run['pss_per_extra_worker_mb']} MB per extra worker ({run['extra_worker_share']:.0%} of the first) | "
+              f"private MB per process {many['private_mb']}")
+        if "reload" in many:
+            print(f"{'':18s} re-ingest: versions {many['reload']['versions_before']} -> {many['reload']['versions_after']}, "
+                  f"all workers on the new one after {many['reload']['all_workers_seconds']} s")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""End-of-speech-to-transcript latency: whole-file upload vs streaming STT
+
+    python -m benchmarks.streaming_stt --stt-factor 0.15
+
+Builds a synthetic 16 kHz recording (tone bursts separated by pauses, with
+leading/trailing silence) and transcribes it against the local Sarvam stub:
+once uploaded whole after recording ends, once fed in real time through
+StreamingTranscriber, and once through the in-memory VAD path used by the
+Streamlit app. Reports bytes uploaded and latency after the speaker stops.
+"""
+import argparse
+import math
+import struct
+import time
+
+from benchmarks.stubs import sarvam_stub
+from sarvamai_tools.client import SarvamClient, set_client
+from sarvamai_tools.stt_check import transcribe_audio_bytes
+from sarvamai_tools.streaming_stt import StreamingTranscriber, _pcm_to_wav, transcribe_recording
+
+RATE = 16000
+
+def tone(seconds: float, amplitude: int = 8000) -> bytes:
+    return b"".join(
+        struct.pack("<h", int(amplitude * math.sin(2 * math.pi * 220 * i / RATE)))
+        for i in range(int(seconds * RATE))
+    )
+
+def silence(seconds: float) -> bytes:
+    return b"\x00\x00" * int(seconds * RATE)
+
+def recording() -> bytes:
+    parts = [silence(1.0)]
+    for _ in range(4):
+        parts += [tone(2.0), silence(0.8)]
+    parts.append(silence(1.5))
+    return b"".join(parts)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stt-factor", type=float, default=0.15, help="Stub STT seconds per audio second")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub fixed time per STT call (s)")
+    parser.add_argument("--chunk-ms", type=int, default=100, help="Recorder chunk size for streaming")
+    args = parser.parse_args()
+
+    pcm = recording()
+    wav = _pcm_to_wav(pcm, RATE, 1)
+    print(f"recording: {len(pcm) / 2 / RATE:.1f}s, {len(wav)} bytes")
+
+    with sarvam_stub(latency=args.latency, stt_realtime_factor=args.stt_factor) as stub:
+        set_client(SarvamClient(api_key="bench", base_url=stub.url))
+
+        start = time.perf_counter()
+        transcribe_audio_bytes(wav)
+        whole = time.perf_counter() - start
+        sent_whole = stub.bytes_in["/speech-to-text-translate"]
+
+        start = time.perf_counter()
+        transcribe_recording(wav)
+        in_memory = time.perf_counter() - start
+        sent_in_memory = stub.bytes_in["/speech-to-text-translate"] - sent_whole
+
+        transcriber = StreamingTranscriber(RATE)
+        chunk = int(RATE * args.chunk_ms / 1000) * 2
+        for i in range(0, len(pcm), chunk):
+            transcriber.feed(pcm[i:i + chunk])
+            time.sleep(args.chunk_ms / 1000)  # recorder delivers audio in real time
+        start = time.perf_counter()
+        transcriber.finish()
+        streaming = time.perf_counter() - start
+
+        print(f"whole upload:      {whole:.2f}s after end of speech, {sent_whole} bytes sent")
+        print(f"in-memory + VAD:   {in_memory:.2f}s after end of speech, {sent_in_memory} bytes sent")
+        print(f"streaming + VAD:   {streaming:.2f}s after end of speech, {transcriber.bytes_sent} bytes sent")
+
+if __name__ == "__main__":
+    main()
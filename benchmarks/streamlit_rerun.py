@@ -0,0 +1,77 @@
+"""Streamlit rerun time with a long chat history and a large practice set
+
+    python -m benchmarks.streamlit_rerun --messages 200 --problems 20
+    python -m benchmarks.streamlit_rerun --app /tmp/streamlit_app_before.py
+
+Seeds session state with the given number of chat messages (every other
+answer carrying a few seconds of voice audio) plus a practice-problem tool
+result, then times repeated script reruns with Streamlit's AppTest runner.
+Point --app at an older copy of streamlit_app.py to compare before/after.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("CHAT_AUDIO_DIR", tempfile.mkdtemp(prefix="bench_chat_audio_"))
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.stubs import make_wav
+from utils.chat_history import ChatHistory
+
+def seed(at: AppTest, messages: int, problems: int):
+    audio = make_wav(3.0)
+    history = ChatHistory(max_messages=max(messages, 1))
+    for i in range(messages):
+        role = "user" if i % 2 == 0 else "assistant"
+        history.add({
+            "role": role,
+            "content": f"Message {i}: " + "Energy is the capacity to do work. " * 6,
+            "metadata": {} if role == "user" else {"query_type": "document_query", "confidence": 0.9, "context_used": True},
+            "timestamp": "10:00:00"
+        }, audio_data=audio + bytes([i % 256]) if role == "assistant" and i % 4 == 1 else None)
+    at.session_state["chat_history"] = history
+    at.session_state["pdf_processed"] = True
+    at.session_state["current_tool_type"] = "generate_practice"
+    at.session_state["current_tool_result"] = {"problems": [
+        {
+            "question": f"A ball of mass {i + 1} kg falls from 10 m. What is its kinetic energy just before it hits the ground?",
+            "solution": "Potential energy mgh is converted into kinetic energy. " * 4,
+            "final_answer": f"{(i + 1) * 98} J",
+            "explanation": "Conservation of mechanical energy. " * 4
+        }
+        for i in range(problems)
+    ]}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default="streamlit_app.py")
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--problems", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    at = AppTest.from_file(os.path.abspath(args.app), default_timeout=60)
+    seed(at, args.messages, args.problems)
+    at.run()  # warm-up: imports and first render
+    if at.exception:
+        raise SystemExit(f"App raised: {at.exception}")
+
+    samples = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - start)
+
+    elements = sum(1 for _ in at.main) + sum(1 for _ in at.sidebar)
+    print(f"{args.app}: {args.messages} messages, {args.problems} problems, {elements} top-level elements")
+    report = at.session_state["chat_history"].memory_report()
+    print(f"session memory: {report['text_bytes']} text bytes, "
+          f"{report['audio_clips']} clips ({report['audio_bytes_on_disk']} bytes) on disk")
+    print(f"rerun time: median {statistics.median(samples) * 1000:.1f} ms, "
+          f"min {min(samples) * 1000:.1f} ms, max {max(samples) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
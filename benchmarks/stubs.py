@@ -0,0 +1,362 @@
+"""Local stand-ins for the external APIs used by the benchmarks
+
+Each StubServer runs a keep-alive HTTP/1.1 server on a background thread
+with configurable per-request latency and jitter. `connect_delay` adds a
+one-off delay per new connection to emulate the TCP+TLS handshake a real
+HTTPS endpoint would cost. The OpenAI stub can also enforce per-minute
+request and token limits, answering 429 with Retry-After like the API, and
+make a random share of chat completions stall to emulate a slow tail.
+"""
+import base64
+import hashlib
+import io
+import json
+import math
+import random
+import re
+import threading
+import time
+import wave
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Route = Callable[["StubServer", Dict[str, str], bytes], Tuple[int, Any]]
+
+def make_wav(seconds: float, rate: int = 22050) -> bytes:
+    """Silent 16-bit mono WAV of the given duration"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(b"\x00\x00" * int(seconds * rate))
+    return buffer.getvalue()
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        if self.server.stub.connect_delay:
+            time.sleep(self.server.stub.connect_delay)
+        self.server.stub.record("__connections__")
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        stub = self.server.stub
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if len(body) < length:
+            self.close_connection = True  # client cancelled mid-upload
+            return
+        path = self.path.split("?")[0]
+        stub.record(path)
+        route = stub.routes.get(path)
+        if route is None:
+            self._send(404, {"error": f"no stub route for {path}"})
+            return
+        rejection = stub.admit(path, body) if stub.admit else None
+        if rejection is not None:
+            stub.record("__rate_limited__")
+            self._send(*rejection)
+            return
+        stub.sleep()
+        status, payload = route(stub, dict(self.headers), body)
+        if callable(payload):
+            try:
+                payload(self)  # route streams its own response
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True  # client stopped reading early
+            return
+        try:
+            self._send(status, payload)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # client gave up (timed out or cancelled a hedge)
+
+    def _send(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+class StubServer:
+    """Threaded local HTTP server dispatching POST paths to route functions"""
+
+    def __init__(
+        self,
+        routes: Dict[str, Route],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        connect_delay: float = 0.0,
+        port: int = 0
+    ):
+        self.routes = routes
+        self.latency = latency
+        self.jitter = jitter
+        self.connect_delay = connect_delay
+        self.admit: Optional[Callable[[str, bytes], Optional[Tuple[int, Any, Dict[str, str]]]]] = None
+        self.calls: Counter = Counter()
+        self.bytes_in: Counter = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, path: str):
+        with self._lock:
+            self.calls[path] += 1
+
+    def record_bytes(self, path: str, count: int):
+        with self._lock:
+            self.bytes_in[path] += count
+
+    def sleep(self):
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def start(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def _sarvam_translate(stub: StubServer, headers: Dict[str, str], body: bytes):
+    payload = json.loads(body)
+    return 200, {"translated_text": f"[{payload['target_language_code']}] {payload['input']}"}
+
+def _sarvam_tts(stub: StubServer, headers: Dict[str, str], body: bytes):
+    payload = json.loads(body)
+    # Roughly 15 characters of speech per second
+    audios = [base64.b64encode(make_wav(max(len(text) / 15, 0.1))).decode("ascii") for text in payload["inputs"]]
+    return 200, {"audios": audios}
+
+def _sarvam_stt(stub: StubServer, headers: Dict[str, str], body: bytes):
+    # Processing time grows with the uploaded audio (16 kHz 16-bit mono assumed)
+    audio_seconds = len(body) / 32000
+    time.sleep(audio_seconds * getattr(stub, "stt_realtime_factor", 0.0))
+    stub.record_bytes("/speech-to-text-translate", len(body))
+    return 200, {"transcript": "what is the law of conservation of energy", "language_code": "en-IN", "bytes_received": len(body)}
+
+def sarvam_stub(stt_realtime_factor: float = 0.0, **kwargs) -> StubServer:
+    """Stand-in for the Sarvam translate, text-to-speech and speech-to-text-translate APIs
+
+    stt_realtime_factor adds that many seconds of STT processing per second
+    of uploaded audio.
+    """
+    stub = StubServer({
+        "/translate": _sarvam_translate,
+        "/text-to-speech": _sarvam_tts,
+        "/speech-to-text-translate": _sarvam_stt,
+    }, **kwargs)
+    stub.stt_realtime_factor = stt_realtime_factor
+    return stub
+
+STUB_ANSWER = (
+    "Energy is the capacity to do work. "
+    "According to the law of conservation of energy, energy can neither be created nor destroyed; "
+    "it can only be transformed from one form to another. "
+    "For example, when a ball falls, its potential energy is converted into kinetic energy. "
+    "The total mechanical energy stays the same if we ignore air resistance. "
+    "This is why the sum of kinetic and potential energy is constant for a freely falling body."
+)
+
+def embed_text(text: str, dim: int = 256) -> List[float]:
+    """Deterministic bag-of-words embedding, so similar texts land close together"""
+    vector = [0.0] * dim
+    for word in re.findall(r"[a-z]+", text.lower()):
+        vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % dim] += 1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+TOOL_KEYWORDS = [
+    ("flashcard", "create_flashcards", {"concept": "energy", "num_cards": 5}),
+    ("practice", "generate_practice", {"topic": "energy", "difficulty": "basic"}),
+    ("concept map", "create_concept_map", {"central_concept": "energy", "depth": 2}),
+    ("summar", "generate_summary", {"topic": "energy", "format": "brief"}),
+]
+
+def _tool_result(system_prompt: str) -> Dict[str, Any]:
+    if "flashcards" in system_prompt:
+        return {"flashcards": [{"front": f"Term {i}", "back": f"Definition {i} of a form of energy"} for i in range(5)]}
+    if "practice problems" in system_prompt:
+        return {"problems": [{
+            "question": f"A {i + 1} kg ball falls 10 m. Find its kinetic energy at the ground.",
+            "solution": "Potential energy mgh turns into kinetic energy.",
+            "final_answer": f"{(i + 1) * 98} J",
+            "explanation": "Conservation of mechanical energy."
+        } for i in range(3)]}
+    if "concept maps" in system_prompt:
+        return {"central_concept": "Energy", "connections": [
+            {"concept": "Kinetic energy", "relationship": "energy of motion", "sub_concepts": ["velocity", "mass"]},
+            {"concept": "Potential energy", "relationship": "stored energy", "sub_concepts": ["height", "spring"]}
+        ]}
+    return {"main_points": ["Energy is conserved"], "details": {"Work": "Force times displacement"},
+            "examples": ["A falling ball"], "additional_notes": "Ignore air resistance"}
+
+def tool_chat_content(stub: "StubServer", payload: Dict[str, Any]) -> str:
+    """Chat content that also answers the ActionHandler's JSON-mode prompts
+
+    Tool analysis picks a tool from keywords in the question (flashcards,
+    practice, concept map, summary) and takes the topic from the words after
+    "on", "of" or "about"; tool prompts get a small valid result.
+    Plain chat requests get the canned answer.
+    """
+    if (payload.get("response_format") or {}).get("type") != "json_object":
+        return stub.chat_answer
+    messages = payload.get("messages", [])
+    system_prompt = messages[0]["content"] if messages else ""
+    if "tool usage" in system_prompt:
+        question = re.search(r"Query: (.*)", messages[-1]["content"])
+        question = question.group(1).lower() if question else ""
+        topic = re.search(r"\b(?:on|of|about)\s+(?:the\s+)?(.+)$", question)
+        for keyword, tool, parameters in TOOL_KEYWORDS:
+            if keyword in question:
+                if topic:
+                    parameters = dict(parameters, **{next(iter(parameters)): topic.group(1).strip()})
+                return json.dumps({"should_use_tool": True, "tool": tool, "parameters": parameters,
+                                   "confidence": 0.9, "reasoning": f"asked for {keyword}"})
+        return json.dumps({"should_use_tool": False, "confidence": 0.8, "reasoning": "plain question"})
+    return json.dumps(_tool_result(system_prompt))
+
+def _openai_chat(stub: StubServer, headers: Dict[str, str], body: bytes):
+    payload = json.loads(body)
+    if stub.slow_fraction and random.random() < stub.slow_fraction:
+        stub.record("__slow__")
+        time.sleep(stub.slow_latency)
+    content = stub.chat_content(stub, payload)
+    tokens = re.findall(r"\S+\s*", content)
+    prompt_tokens = sum(len(m.get("content") or "") for m in payload.get("messages", [])) // 4
+    base = {"id": "chatcmpl-stub", "created": int(time.time()), "model": payload.get("model", "stub")}
+
+    if payload.get("stream"):
+        def stream(handler: BaseHTTPRequestHandler):
+            handler.send_response(200)
+            handler.send_header("Content-Type", "text/event-stream")
+            handler.send_header("Connection", "close")
+            handler.end_headers()
+            handler.close_connection = True
+            for i, token in enumerate(tokens):
+                if i:
+                    time.sleep(stub.token_interval)
+                chunk = dict(base, object="chat.completion.chunk", choices=[
+                    {"index": 0, "delta": {"role": "assistant", "content": token} if i == 0 else {"content": token}, "finish_reason": None}
+                ])
+                handler.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                handler.wfile.flush()
+            final = dict(base, object="chat.completion.chunk", choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+            handler.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            handler.wfile.flush()
+        return 200, stream
+
+    time.sleep(stub.token_interval * max(len(tokens) - 1, 0))
+    return 200, dict(base, object="chat.completion", choices=[
+        {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+    ], usage={"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens), "total_tokens": prompt_tokens + len(tokens)})
+
+def _openai_embeddings(stub: StubServer, headers: Dict[str, str], body: bytes):
+    payload = json.loads(body)
+    inputs = payload["input"] if isinstance(payload["input"], list) else [payload["input"]]
+    data = [{"object": "embedding", "index": i, "embedding": embed_text(str(text))} for i, text in enumerate(inputs)]
+    tokens = sum(len(str(text)) for text in inputs) // 4
+    return 200, {"object": "list", "data": data, "model": payload.get("model", "stub"),
+                 "usage": {"prompt_tokens": tokens, "total_tokens": tokens}}
+
+class OpenAILimits:
+    """Per-minute request and token buckets enforced the way the OpenAI API does
+
+    A request counts its prompt (~4 characters per token) plus max_tokens
+    against the token limit. Like the API, which may enforce a minute's
+    limit over shorter periods, at most burst_seconds of it can be used at
+    once. Over-limit requests get a 429 with retry-after-ms / retry-after
+    headers and are not served.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, burst_seconds: float = 60.0):
+        self.limits = {"requests": rpm, "tokens": tpm}
+        self.capacity = {kind: max(limit * burst_seconds / 60, 1.0) for kind, limit in self.limits.items()}
+        self.levels = dict(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def request_tokens(path: str, body: bytes) -> int:
+        payload = json.loads(body)
+        if path == "/v1/embeddings":
+            inputs = payload["input"] if isinstance(payload["input"], list) else [payload["input"]]
+            return sum(len(str(text)) for text in inputs) // 4
+        prompt = sum(len(m.get("content") or "") for m in payload.get("messages", [])) // 4
+        return prompt + (payload.get("max_tokens") or 0)
+
+    def admit(self, path: str, body: bytes) -> Optional[Tuple[int, Any, Dict[str, str]]]:
+        cost = {"requests": 1, "tokens": self.request_tokens(path, body)}
+        with self._lock:
+            now = time.monotonic()
+            for kind, limit in self.limits.items():
+                if limit:
+                    self.levels[kind] = min(self.capacity[kind], self.levels[kind] + (now - self.updated) * limit / 60)
+            self.updated = now
+            for kind, limit in self.limits.items():
+                needed = min(cost[kind], self.capacity[kind])
+                if limit and self.levels[kind] < needed:
+                    wait = (needed - self.levels[kind]) * 60 / limit
+                    return 429, {"error": {
+                        "message": f"Rate limit reached for {kind} per min: limit {limit}",
+                        "type": kind, "code": "rate_limit_exceeded"
+                    }}, {"retry-after-ms": str(math.ceil(wait * 1000)), "retry-after": str(math.ceil(wait))}
+            for kind, limit in self.limits.items():
+                if limit:
+                    self.levels[kind] -= cost[kind]
+        return None
+
+def openai_stub(
+    token_interval: float = 0.02,
+    chat_content: Callable[[StubServer, Dict[str, Any]], str] = tool_chat_content,
+    chat_answer: str = STUB_ANSWER,
+    rpm: int = 0,
+    tpm: int = 0,
+    slow_fraction: float = 0.0,
+    slow_latency: float = 0.0,
+    **kwargs
+) -> StubServer:
+    """Stand-in for the OpenAI chat completions (incl. SSE streaming) and embeddings APIs
+
+    `latency` is the time to first token; each further token takes
+    token_interval seconds, streamed or not. Non-zero rpm/tpm enforce
+    OpenAI-style rate limits (see OpenAILimits). A slow_fraction of chat
+    completions waits slow_latency seconds more before answering.
+    """
+    stub = StubServer({
+        "/v1/chat/completions": _openai_chat,
+        "/v1/embeddings": _openai_embeddings,
+    }, **kwargs)
+    if rpm or tpm:
+        stub.admit = OpenAILimits(rpm, tpm).admit
+    stub.token_interval = token_interval
+    stub.slow_fraction = slow_fraction
+    stub.slow_latency = slow_latency
+    stub.chat_content = chat_content
+    stub.chat_answer = chat_answer
+    return stub
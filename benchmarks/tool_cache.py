@@ -0,0 +1,78 @@
+"""Learning-tool result cache: cold, warm and "fresh results" rounds
+
+    python -m benchmarks.tool_cache --rounds cold,warm,variety --llm-latency 1.0
+
+Sends every tool request in benchmarks/questions.py once per round to a
+server running against the local stubs with an empty tool cache. "cold"
+and "warm" are plain requests (the second should be served from the
+cache); "variety" sets the fresh-results flag. Reports OpenAI chat calls,
+latency per round and the tool_cache_requests_total counters.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict
+
+import requests
+
+from benchmarks.e2e import ingest
+from benchmarks.harness import REPO_ROOT, ServerProcess, latency_summary, stub_environment
+from benchmarks.questions import TOOL_REQUESTS
+from benchmarks.stubs import openai_stub, sarvam_stub
+
+def cache_counters(base_url: str) -> Dict[str, float]:
+    """tool_cache_requests_total samples keyed by result, summed over tools"""
+    counters: Dict[str, float] = {}
+    for line in requests.get(f"{base_url}/metrics", timeout=30).text.splitlines():
+        if line.startswith("tool_cache_requests_total{"):
+            labels, value = line.rsplit(" ", 1)
+            result = labels.split('result="')[1].split('"')[0]
+            counters[result] = counters.get(result, 0) + float(value)
+    return counters
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", default="cold,warm,variety")
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {"config": vars(args), "rounds": {}}
+    with openai_stub(latency=args.llm_latency) as llm, sarvam_stub() as sarvam:
+        stub_environment(openai=llm, sarvam=sarvam)
+        extra_env = {"HF_HUB_OFFLINE": "1", "TOOL_CACHE_DIR": tempfile.mkdtemp(prefix="tool_cache_")}
+        with ServerProcess(extra_env=extra_env) as server:
+            ingestion = ingest(server.url, os.path.join(REPO_ROOT, "ncert_ch11.pdf"), args.timeout)
+            if ingestion["status"] != "completed":
+                raise SystemExit(f"Ingestion failed: {ingestion}")
+
+            for name in args.rounds.split(","):
+                calls_before = llm.calls["/v1/chat/completions"]
+                counters_before = cache_counters(server.url)
+                latencies = []
+                for question in TOOL_REQUESTS:
+                    start = time.perf_counter()
+                    response = requests.post(f"{server.url}/learning-tools", timeout=args.timeout,
+                                             json={"question": question, "variety": name == "variety"})
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - start)
+                counters = cache_counters(server.url)
+                report["rounds"][name] = {
+                    "requests": len(TOOL_REQUESTS),
+                    "chat_calls": llm.calls["/v1/chat/completions"] - calls_before,
+                    "cache": {result: count - counters_before.get(result, 0) for result, count in counters.items()},
+                    **latency_summary(latencies)
+                }
+                result = report["rounds"][name]
+                print(f"{name:8s} chat calls {result['chat_calls']:>3} | p50 {result['p50_ms']} ms | "
+                      f"mean {result['mean_ms']} ms | cache {result['cache']}", flush=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
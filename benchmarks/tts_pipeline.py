@@ -0,0 +1,78 @@
+"""Time-to-first-audio and total time of the long-text TTS pipeline
+
+    python -m benchmarks.tts_pipeline --latency 0.4 --workers 4
+
+Synthesizes a multi-paragraph answer against the local Sarvam stub, once
+sequentially and once with bounded parallelism, and checks that the
+stitched audio covers the whole text in order. A final repeat run shows
+the translation/audio cache serving the same answer without Sarvam calls.
+"""
+import argparse
+import io
+import os
+import shutil
+import tempfile
+import time
+import wave
+
+# Start from an empty translation/audio cache so the first runs hit the stub
+os.environ["SARVAM_CACHE_DIR"] = tempfile.mkdtemp(prefix="sarvam_cache_")
+
+from benchmarks.stubs import sarvam_stub
+from sarvamai_tools.cache import audio_cache, cache_stats, translation_cache
+from sarvamai_tools.client import SarvamClient, set_client
+from sarvamai_tools.tts_pipeline import concatenate_wavs, split_text, stream_speech
+
+ANSWER = " ".join([
+    "Work is said to be done when a force moves an object through a distance.",
+    "The work done is the product of the force and the displacement in the direction of the force.",
+    "Energy is the capacity to do work, and it is measured in joules.",
+    "Kinetic energy is the energy an object has because of its motion, equal to half the mass times the square of the velocity.",
+    "Potential energy is stored energy that depends on the position or configuration of an object.",
+    "The law of conservation of energy states that energy can neither be created nor destroyed, only transformed from one form to another.",
+    "Power is the rate of doing work, and its unit is the watt, which is one joule per second.",
+] * 3)
+
+def duration(wav_bytes: bytes) -> float:
+    with wave.open(io.BytesIO(wav_bytes), 'rb') as wav:
+        return wav.getnframes() / wav.getframerate()
+
+def run(workers: int, language: str):
+    start = time.perf_counter()
+    first = None
+    segments = []
+    for segment in stream_speech(ANSWER, target_language=language, max_workers=workers):
+        if first is None:
+            first = time.perf_counter() - start
+        segments.append(segment)
+    total = time.perf_counter() - start
+    return first, total, concatenate_wavs(segments), len(segments)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.4, help="Stub time per API call (s)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--language", default="hi-IN")
+    args = parser.parse_args()
+
+    with sarvam_stub(latency=args.latency) as stub:
+        set_client(SarvamClient(api_key="bench", base_url=stub.url))
+        pieces = split_text(ANSWER)
+        print(f"{len(ANSWER)} characters -> {len(pieces)} pieces (max {max(map(len, pieces))} chars)")
+        for workers in (1, args.workers):
+            # Empty the caches so both runs translate and synthesize every piece
+            for cache in (translation_cache, audio_cache):
+                for name in os.listdir(cache.directory):
+                    shutil.rmtree(os.path.join(cache.directory, name))
+            first, total, audio, count = run(workers, args.language)
+            print(f"workers={workers}: first audio {first:.2f}s, total {total:.2f}s, "
+                  f"{count} segments, {duration(audio):.1f}s of audio")
+        calls_before = sum(stub.calls.values())
+        first, total, audio, count = run(args.workers, args.language)
+        print(f"cached repeat: first audio {first:.3f}s, total {total:.3f}s, "
+              f"{sum(stub.calls.values()) - calls_before} Sarvam calls")
+        print(f"stub calls: {dict(stub.calls)}")
+        print(f"cache stats: {cache_stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Time-to-first-audio of a voice question: sequential flow vs /voice-ask
+
+    python -m benchmarks.voice_pipeline --runs 5
+
+Sequential is the Streamlit flow before the pipeline existed: upload the
+whole recording to STT, POST /ask, then synthesize the full answer. The
+pipelined run posts the recording to /voice-ask and times the first audio
+event. Both use local stand-ins for OpenAI and Sarvam.
+"""
+import argparse
+import io
+import json
+import statistics
+import time
+import wave
+
+import requests
+
+from benchmarks.stubs import STUB_ANSWER, openai_stub, sarvam_stub
+from benchmarks.harness import AppServer, clear_sarvam_caches, seed_collection, stub_environment
+
+def speech_wav(seconds: float = 4.0) -> bytes:
+    """Loud square-wave 'speech' that survives voice-activity detection"""
+    rate = 16000
+    frames = b"".join((b"\x40\x1f" if (i // 40) % 2 else b"\xc0\xe0") for i in range(int(seconds * rate)))
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(frames)
+    return buffer.getvalue()
+
+def sequential(url: str, audio: bytes, language: str) -> float:
+    from sarvamai_tools.stt_check import transcribe_audio_bytes
+    from sarvamai_tools.tts_check import text_to_speech
+
+    start = time.perf_counter()
+    question, _ = transcribe_audio_bytes(audio)
+    answer = requests.post(f"{url}/ask", json={"question": question}).json()["answer"]
+    text_to_speech(answer, target_language=language)
+    return time.perf_counter() - start
+
+def pipelined(url: str, audio: bytes, language: str) -> float:
+    start = time.perf_counter()
+    with requests.post(
+        f"{url}/voice-ask",
+        files={"audio": ("question.wav", audio, "audio/wav")},
+        data={"language_code": language},
+        stream=True
+    ) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            event = json.loads(line)
+            if event["type"] == "audio":
+                return time.perf_counter() - start
+            if event["type"] == "error":
+                raise Exception(event["detail"])
+    raise Exception("No audio received")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Stub time to first token (s)")
+    parser.add_argument("--token-interval", type=float, default=0.03, help="Stub time per token (s)")
+    parser.add_argument("--sarvam-latency", type=float, default=0.3, help="Stub time per Sarvam call (s)")
+    parser.add_argument("--language", default="hi-IN")
+    args = parser.parse_args()
+
+    with openai_stub(latency=args.llm_latency, token_interval=args.token_interval) as llm, \
+            sarvam_stub(latency=args.sarvam_latency, stt_realtime_factor=0.1) as sarvam:
+        stub_environment(openai=llm, sarvam=sarvam)
+        import main as app_module
+        seed_collection(app_module)
+
+        audio = speech_wav()
+        with AppServer(app_module.app) as server:
+            results = {"sequential": [], "pipelined": []}
+            for _ in range(args.runs):
+                clear_sarvam_caches()
+                results["sequential"].append(sequential(server.url, audio, args.language))
+                clear_sarvam_caches()
+                results["pipelined"].append(pipelined(server.url, audio, args.language))
+
+        print(f"answer: {len(STUB_ANSWER)} chars; LLM TTFT {args.llm_latency}s + {args.token_interval}s/token; "
+              f"Sarvam {args.sarvam_latency}s/call")
+        for label, samples in results.items():
+            print(f"{label:<11} time to first audio: median {statistics.median(samples):.2f}s, "
+                  f"min {min(samples):.2f}s, max {max(samples):.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Bulk ingestion of a whole directory (or manifest) of textbook PDFs
+
+Text extraction and cleaning run across a process pool while the parent
+process embeds finished documents through a shared batcher and on-disk
+embedding cache, upserting everything into one multi-document collection.
+Every document is recorded in a state file next to the index, with its
+path and either its chunk count or the error it failed with; an
+interrupted run picks up where it stopped and retries the failed ones.
+
+The result is a separate collection under --index-dir (default library_db).
+main.py does not serve it: the API answers from the single PDF loaded
+through /initialize.
+
+    python bulk_ingest.py textbooks/ --index-dir library_db
+    python bulk_ingest.py manifest.txt --workers 8
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Tuple
+
+from utils.disk_cache import DiskCache
+from utils.embeddings.embedding_batcher import EmbeddingBatcher
+from utils.embeddings.store_embeddings import get_or_create_chroma_collection
+from utils.pdf_processor import PDFProcessor, file_sha256
+
+STATE_FILE = "bulk_ingest_state.json"
+
+def find_pdfs(source: str) -> List[str]:
+    """List PDFs in a directory tree, or read them from a .txt/.json manifest"""
+    if os.path.isdir(source):
+        return sorted(
+            os.path.join(root, name)
+            for root, _, files in os.walk(source)
+            for name in files
+            if name.lower().endswith(".pdf")
+        )
+    with open(source, 'r', encoding='utf-8') as f:
+        if source.endswith(".json"):
+            return json.load(f)
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+def load_state(index_dir: str) -> Dict[str, dict]:
+    path = os.path.join(index_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_state(index_dir: str, state: Dict[str, dict]):
+    path = os.path.join(index_dir, STATE_FILE)
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def _extract_worker(pdf_path: str, doc_id: str, work_dir: str) -> Tuple[str, str, List[str], float]:
+    """Runs in a pool process: extract and clean one PDF"""
+    start = time.perf_counter()
+    chunks = PDFProcessor.extract_chunks(pdf_path, os.path.join(work_dir, doc_id))
+    return pdf_path, doc_id, chunks, time.perf_counter() - start
+
+def rate(count: float, seconds: float) -> str:
+    return f"{count / seconds:.1f}/s" if seconds > 0 else "n/a"
+
+def bulk_ingest(source: str, index_dir: str, workers: int, batch_size: int, cache_dir: str, work_dir: str):
+    pdfs = find_pdfs(source)
+    os.makedirs(index_dir, exist_ok=True)
+    state = load_state(index_dir)
+
+    pending = []
+    for pdf_path in pdfs:
+        doc_id = file_sha256(pdf_path)[:16]
+        if "ingested_at" in state.get(doc_id, {}):
+            print(f"Skipping {pdf_path} (already ingested)")
+        else:
+            pending.append((pdf_path, doc_id))
+    print(f"{len(pdfs)} PDFs found, {len(pending)} to ingest")
+    if not pending:
+        return
+
+    collection = get_or_create_chroma_collection(db_path=index_dir)
+    max_batch = collection._client.get_max_batch_size()
+    batcher = EmbeddingBatcher(batch_size=batch_size, cache=DiskCache(cache_dir))
+    totals = {"extract": 0.0, "embed": 0.0, "index": 0.0, "chunks": 0, "docs": 0}
+    run_start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_extract_worker, path, doc_id, work_dir): (path, doc_id) for path, doc_id in pending}
+        for future in as_completed(futures):
+            try:
+                pdf_path, doc_id, chunks, extract_secs = future.result()
+                if not chunks:
+                    raise Exception("no text extracted")
+            except Exception as e:
+                pdf_path, doc_id = futures[future]
+                print(f"Extraction failed for {pdf_path}: {str(e)}")
+                state[doc_id] = {"path": pdf_path, "error": str(e), "failed_at": time.time()}
+                save_state(index_dir, state)
+                continue
+
+            start = time.perf_counter()
+            embeddings = batcher.embed(chunks)
+            embed_secs = time.perf_counter() - start
+
+            start = time.perf_counter()
+            source_name = os.path.basename(pdf_path)
+            for first in range(0, len(chunks), max_batch):  # Chroma rejects larger single writes
+                last = first + max_batch
+                collection.upsert(
+                    documents=chunks[first:last],
+                    embeddings=embeddings[first:last],
+                    metadatas=[{"source": source_name, "doc_id": doc_id} for _ in chunks[first:last]],
+                    ids=[f"{doc_id}_chunk_{i}" for i in range(first, min(last, len(chunks)))]
+                )
+            index_secs = time.perf_counter() - start
+
+            state[doc_id] = {"path": pdf_path, "chunks": len(chunks), "ingested_at": time.time()}
+            save_state(index_dir, state)
+
+            totals["extract"] += extract_secs
+            totals["embed"] += embed_secs
+            totals["index"] += index_secs
+            totals["chunks"] += len(chunks)
+            totals["docs"] += 1
+            print(
+                f"{source_name}: {len(chunks)} chunks | "
+                f"extract {extract_secs:.1f}s ({rate(len(chunks), extract_secs)}) | "
+                f"embed {embed_secs:.1f}s ({rate(len(chunks), embed_secs)}) | "
+                f"index {index_secs:.1f}s ({rate(len(chunks), index_secs)})"
+            )
+
+    wall = time.perf_counter() - run_start
+    print("\nSummary:")
+    print(f"  documents: {totals['docs']}, chunks: {totals['chunks']}, wall time: {wall:.1f}s")
+    print(f"  extract+clean: {rate(totals['chunks'], totals['extract'])} per worker ({workers} workers)")
+    print(f"  embed: {rate(totals['chunks'], totals['embed'])}, "
+          f"{batcher.api_calls} API calls, {batcher.cache_hits} cache hits")
+    print(f"  index: {rate(totals['chunks'], totals['index'])}")
+    print(f"  overall: {rate(totals['chunks'], wall)}, {rate(totals['docs'], wall)} documents")
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest a directory or manifest of PDFs into one index")
+    parser.add_argument("source", help="Directory of PDFs, or a .txt/.json manifest of PDF paths")
+    parser.add_argument("--index-dir", default="library_db", help="Persistent ChromaDB directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Extraction processes")
+    parser.add_argument("--batch-size", type=int, default=64, help="Chunks per embeddings API call")
+    parser.add_argument("--cache-dir", default=".cache/embeddings", help="Embedding cache directory")
+    parser.add_argument("--work-dir", default="extracted_texts/bulk", help="Directory for extracted text")
+    args = parser.parse_args()
+
+    bulk_ingest(args.source, args.index_dir, args.workers, args.batch_size, args.cache_dir, args.work_dir)
+
+if __name__ == "__main__":
+    main()
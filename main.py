@@ -1,18 +1,52 @@
-from fastapi import FastAPI, HTTPException
-from openai import OpenAI
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.formparsers import MultiPartParser
+from openai import AsyncOpenAI
 from pydantic import BaseModel
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
 from utils.action_handler import ActionHandler
 from utils.smart_query_router import SmartQueryRouter
 from utils.pdf_processor import PDFProcessor
+from utils.ingestion_jobs import IngestionJobManager
+from utils.voice_pipeline import VoicePipeline
 from utils.embeddings.store_embeddings import query_similar_chunks
+from utils.embeddings.shared_index import SHARED_INDEX, SHARED_INDEX_DIR, SharedIndex
+from utils.disk_cache import DiskCache
+from utils.local_responder import local_answer, model_for
+from utils.metrics import REQUEST_SECONDS, REQUESTS, SMART_ASK_ANSWERS, SMART_ASK_SECONDS, registry, stage_timer
+from utils.resilience import LLM_BREAKER_RESET_SECONDS, LLMUnavailable, llm_call
+from utils.prompts import CHAT_SYSTEM, QA_SYSTEM, TEACHER_SYSTEM, build_messages, qa_user, record_usage
+from utils.singleflight import SingleFlight, normalize_question
+from utils.tracing import format_timings, parse_traceparent, set_request_id, should_sample, start_trace
+import asyncio
+import hashlib
 import json
+import os
+import tempfile
+import time
+import uuid
 
 DEFAULT_PDF_PATH= "ncert_ch11.pdf"
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "100")) * 1024 * 1024
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+UPLOAD_FORM_OVERHEAD = 64 * 1024  # multipart boundaries and part headers around the file
+ALLOW_DEBUG_TIMINGS = os.getenv("ALLOW_DEBUG_TIMINGS", "1") == "1"
+# Threads for blocking OpenAI/Chroma calls; asyncio's default is only cpu_count + 4
+BLOCKING_IO_THREADS = int(os.getenv("BLOCKING_IO_THREADS", "32"))
+# Load models at import, so workers forked by gunicorn --preload share them copy-on-write
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "0") == "1"
+# Serve the last ingested PDF again after a restart, without /initialize
+REOPEN_INDEX = os.getenv("REOPEN_INDEX", "1") == "1"
 
 class Query(BaseModel):
     question: str
 
+class ToolQuery(Query):
+    variety: bool = False  # skip cached tool results and generate a fresh set
+
 class QueryResponse(BaseModel):
     answer: str
     query_type: str
@@ -20,37 +54,139 @@ class QueryResponse(BaseModel):
     context_used: bool
     tool_used: Optional[str] = None
     tool_result: Optional[dict] = None
+    answered_by: Optional[str] = None  # "local" or the model that wrote the answer
 
 class InitializeRequest(BaseModel):
     pdf_path: Optional[str] = DEFAULT_PDF_PATH
 
 app = FastAPI()
-client = OpenAI()
-pdf_processor = PDFProcessor()
+if os.getenv("API_GZIP", "1") == "1":
+    # Tool results (practice sets, summaries) compress well
+    app.add_middleware(GZipMiddleware, minimum_size=1000)
+client = AsyncOpenAI(max_retries=0)  # retries go through utils.rate_limiter
+if SHARED_INDEX:
+    # Several workers: every one serves the index whichever of them ingested it
+    pdf_processor = PDFProcessor(shared_index=SharedIndex(SHARED_INDEX_DIR))
+    ingestion_jobs = IngestionJobManager(pdf_processor, job_store=DiskCache(os.path.join(SHARED_INDEX_DIR, "jobs")))
+else:
+    pdf_processor = PDFProcessor()
+    ingestion_jobs = IngestionJobManager(pdf_processor)
+if PRELOAD_MODELS:
+    app.state.query_router = SmartQueryRouter()
+
+# Identical questions in flight at the same time share one upstream computation
+ask_flight = SingleFlight("/ask")
+smart_ask_flight = SingleFlight("/smart-ask")
+learning_tools_flight = SingleFlight("/learning-tools")
+voice_ask_flight = SingleFlight("/voice-ask")
+
+def flight_key(question: str, *extra):
+    """Coalescing key: the normalized question within the document being served"""
+    return (normalize_question(question), pdf_processor.current_source_hash) + extra
+
+async def chat_completion(call: str, **kwargs):
+    """Chat completion under the call's deadline, hedged when slow (utils.resilience)"""
+    response = await llm_call(call, "interactive", client.chat.completions.create, **kwargs)
+    record_usage(call, response)
+    return response
+
+@app.exception_handler(LLMUnavailable)
+async def llm_unavailable(request: Request, exc: LLMUnavailable):
+    """Missed deadlines and an open circuit breaker are the upstream's fault: 503, retry later"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(int(LLM_BREAKER_RESET_SECONDS))}
+    )
+
+@app.on_event("startup")
+async def configure_executor():
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=BLOCKING_IO_THREADS, thread_name_prefix="blocking-io")
+    )
+
+@app.on_event("startup")
+async def reopen_index():
+    if REOPEN_INDEX and not await asyncio.to_thread(pdf_processor.reopen):
+        print("No persisted index to reopen; call /initialize or /upload")
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count requests and time them until the response starts, per route template"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        REQUEST_SECONDS.observe(time.perf_counter() - start, method=request.method, path=path)
+        REQUESTS.inc(method=request.method, path=path, status=str(status))
+
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    """Assign a request ID and record a span tree for sampled requests
+
+    Sending "X-Debug-Timings: 1" forces a trace and returns per-stage
+    durations in the X-Debug-Timings response header. An incoming W3C
+    traceparent continues the caller's trace.
+    """
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    set_request_id(request_id)
+    debug = ALLOW_DEBUG_TIMINGS and request.headers.get("X-Debug-Timings") == "1"
+    remote = parse_traceparent(request.headers.get("traceparent"))
+
+    if not should_sample(forced=debug or (remote is not None and remote[2])):
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+    start = time.perf_counter()
+    with start_trace(
+        f"{request.method} {request.url.path}",
+        request_id,
+        trace_id=remote[0] if remote else None,
+        parent_id=remote[1] if remote else None,
+        **{"http.method": request.method, "http.target": request.url.path}
+    ) as root:
+        response = await call_next(request)
+        route = request.scope.get("route")
+        if route is not None:
+            root.name = f"{request.method} {route.path}"
+        root.set_attribute("http.status_code", response.status_code)
+        if debug:
+            response.headers["X-Debug-Timings"] = format_timings(root.trace, (time.perf_counter() - start) * 1000)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+@app.get("/metrics")
+async def metrics():
+    """Request, stage and Sarvam latency histograms in Prometheus text format"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 @app.post("/ask")
 async def answer_question(query: Query):
     """Basic Q&A endpoint that always uses PDF context"""
+    return await ask_flight.do(flight_key(query.question), lambda: basic_answer(query))
+
+async def basic_answer(query: Query) -> QueryResponse:
     if pdf_processor.collection is None:
         raise HTTPException(
             status_code=400,
             detail="System not initialized. Please call /initialize endpoint first"
         )
     
-    similar_chunks, is_relevant = query_similar_chunks(query.question, pdf_processor.collection)
+    similar_chunks, is_relevant = await asyncio.to_thread(query_similar_chunks, query.question, pdf_processor.collection)
     context = similar_chunks['documents'][0][0]
     
-    prompt = f"""Based on the following context, answer the question.
-    Context: {context}
-    Question: {query.question}"""
-    
-    response = client.chat.completions.create(
-         model="gpt-4o",
-        messages=[
-            {"role": "system", "content": "You are a helpful physics teacher."},
-            {"role": "user", "content": prompt}
-        ]
-    )
+    with stage_timer("llm"):
+        response = await chat_completion(
+            "ask",
+            model="gpt-4o",
+            messages=build_messages("ask", QA_SYSTEM, qa_user(query.question, context))
+        )
 
     return QueryResponse(
         answer=response.choices[0].message.content,
@@ -62,11 +198,27 @@ async def answer_question(query: Query):
 @app.post("/smart-ask")
 async def smart_answer_question(query: Query):
     """Smart endpoint that determines whether to use PDF context or not"""
+    return await smart_ask_flight.do(flight_key(query.question), lambda: smart_answer(query))
+
+async def smart_answer(query: Query) -> QueryResponse:
     if not hasattr(app.state, "query_router"):
         app.state.query_router = SmartQueryRouter()
 
     try:
+        start = time.perf_counter()
         classification = await app.state.query_router.classify_query(query.question)
+
+        answer = local_answer(classification)
+        if answer is not None:
+            SMART_ASK_ANSWERS.inc(tier="local", category=classification["category"])
+            SMART_ASK_SECONDS.observe(time.perf_counter() - start, tier="local")
+            return QueryResponse(
+                answer=answer,
+                query_type=classification["category"],
+                confidence=classification["confidence"],
+                context_used=False,
+                answered_by="local"
+            )
         
         if classification["category"] == "document_query":
             if pdf_processor.collection is None:
@@ -75,37 +227,41 @@ async def smart_answer_question(query: Query):
                     detail="System not initialized. Please call /initialize endpoint first"
                 )
             
-            similar_chunks, is_relevant = query_similar_chunks(query.question, pdf_processor.collection)
+            similar_chunks, is_relevant = await asyncio.to_thread(query_similar_chunks, query.question, pdf_processor.collection)
             context = similar_chunks['documents'][0][0]
-            prompt = f"""Based on the following context, answer the question.
-            Context: {context}
-            Question: {query.question}"""
-            system_prompt = "You are a helpful physics teacher."
+            system_prompt, prompt = QA_SYSTEM, qa_user(query.question, context)
         else:
-            prompt = query.question
-            system_prompt = "You are a helpful assistant."
-
-        response = client.chat.completions.create(
-             model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ]
-        )
+            system_prompt, prompt = CHAT_SYSTEM, query.question
+
+        model = model_for(classification["category"])
+        with stage_timer("llm"):
+            response = await chat_completion(
+                "smart_ask",
+                model=model,
+                messages=build_messages("smart_ask", system_prompt, prompt)
+            )
+        SMART_ASK_ANSWERS.inc(tier=model, category=classification["category"])
+        SMART_ASK_SECONDS.observe(time.perf_counter() - start, tier=model)
 
         return QueryResponse(
             answer=response.choices[0].message.content,
             query_type=classification["category"],
             confidence=classification["confidence"],
-            context_used=classification["requires_context"]
+            context_used=classification["requires_context"],
+            answered_by=model
         )
 
+    except LLMUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/learning-tools")
-async def learning_tools_qa(query: Query):
+async def learning_tools_qa(query: ToolQuery):
     """Enhanced Q&A endpoint that integrates learning tools based on query analysis"""
+    return await learning_tools_flight.do(flight_key(query.question, query.variety), lambda: learning_tools_answer(query))
+
+async def learning_tools_answer(query: ToolQuery) -> QueryResponse:
     if not hasattr(app.state, "action_handler"):
         app.state.action_handler = ActionHandler(pdf_processor)
 
@@ -122,7 +278,7 @@ async def learning_tools_qa(query: Query):
             print("going inside collection  as pdf_processor collection is not none")
             print("pdf procceor is ", pdf_processor.collection)
 
-            similar_chunks, is_relevant = query_similar_chunks(query.question, pdf_processor.collection)
+            similar_chunks, is_relevant = await asyncio.to_thread(query_similar_chunks, query.question, pdf_processor.collection)
             context = similar_chunks['documents'][0][0] if similar_chunks['documents'] else None
 
             print("context is ", context)
@@ -135,7 +291,8 @@ async def learning_tools_qa(query: Query):
             tool_result = await app.state.action_handler.execute_action(
                 tool_analysis["tool"],
                 tool_analysis["parameters"],
-                context
+                context,
+                variety=query.variety
             )
 
             print("tool result is ", tool_result)
@@ -160,13 +317,12 @@ async def learning_tools_qa(query: Query):
             )
         else:
             # Fall back to regular Q&A if no tool is applicable
-            response = client.chat.completions.create(
-                 model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "You are a helpful teacher."},
-                    {"role": "user", "content": query.question}
-                ]
-            )
+            with stage_timer("llm"):
+                response = await chat_completion(
+                    "tool_fallback",
+                    model="gpt-4o",
+                    messages=build_messages("tool_fallback", TEACHER_SYSTEM, query.question)
+                )
             
             return QueryResponse(
                 answer=response.choices[0].message.content,
@@ -175,14 +331,130 @@ async def learning_tools_qa(query: Query):
                 context_used=context is not None
             )
 
+    except LLMUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/voice-ask")
+async def voice_ask(
+    audio: Optional[UploadFile] = File(None),
+    question: Optional[str] = Form(None),
+    language_code: Optional[str] = Form(None),
+    speaker: str = Form("meera")
+):
+    """Voice Q&A that overlaps STT, retrieval, LLM streaming and TTS
+
+    Streams newline-delimited JSON events: transcript, text deltas, audio
+    segments (base64 WAV, in order) and a final done event with timings.
+    Identical concurrent requests (same question or audio, language and
+    speaker) share one pipeline run and receive the same events.
+    """
+    if pdf_processor.collection is None:
+        raise HTTPException(
+            status_code=400,
+            detail="System not initialized. Please call /initialize endpoint first"
+        )
+    if audio is None and not question:
+        raise HTTPException(status_code=400, detail="Provide either audio or a question")
+
+    if not hasattr(app.state, "voice_pipeline"):
+        app.state.voice_pipeline = VoicePipeline()
+
+    audio_bytes = await audio.read() if audio is not None else None
+    source = question if audio_bytes is None else f"audio:{hashlib.sha256(audio_bytes).hexdigest()}"
+    key = flight_key(source, language_code, speaker)
+
+    async def events():
+        async for event in app.state.voice_pipeline.run(
+            pdf_processor.collection,
+            audio_bytes=audio_bytes,
+            question=question,
+            language_code=language_code,
+            speaker=speaker
+        ):
+            yield json.dumps(event) + "\n"
+
+    # Followers share the encoded lines too, so base64 audio is serialized once
+    return StreamingResponse(voice_ask_flight.stream(key, events), media_type="application/x-ndjson")
+
 @app.post("/initialize")
 async def initialize_system(request: InitializeRequest):
-    """Initialize the QA system with a PDF file"""
+    """Queue ingestion of a PDF file; poll /initialize/{job_id} for progress"""
+    if not os.path.exists(request.pdf_path):
+        raise HTTPException(status_code=400, detail=f"PDF not found: {request.pdf_path}")
+
+    job = ingestion_jobs.submit(request.pdf_path)
+    return {"status": "queued", "job_id": job.job_id, "message": "Ingestion job queued"}
+
+async def limited_body(request: Request, limit: int):
+    """Chunks of the request body; stops with 413 as soon as more than limit bytes arrived"""
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > limit:
+            raise HTTPException(status_code=413, detail="Uploaded file is too large")
+        yield chunk
+
+async def read_upload_form(request: Request):
+    """The multipart form of /upload, refused before it is read past MAX_UPLOAD_MB"""
+    limit = MAX_UPLOAD_BYTES + UPLOAD_FORM_OVERHEAD
     try:
-        pdf_processor.process_pdf(request.pdf_path)
-        return {"status": "success", "message": "System initialized successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Initialization failed: {str(e)}")
\ No newline at end of file
+        declared = int(request.headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Content-Length")
+    if declared > limit:
+        raise HTTPException(status_code=413, detail="Uploaded file is too large")
+    if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+    return await MultiPartParser(request.headers, limited_body(request, limit), max_files=1).parse()
+
+@app.post("/upload")
+async def upload_pdf(request: Request):
+    """Upload a PDF (form field "file") and queue it for ingestion, skipping files already indexed
+
+    The form is parsed here rather than by FastAPI, so an upload over
+    MAX_UPLOAD_MB is refused from its Content-Length, or as soon as that
+    much has arrived, instead of after the whole body was spooled. The file
+    is hashed while it is copied to disk in 1 MB chunks, so memory use stays
+    bounded and the frontend need not share a filesystem with the backend.
+    """
+    form = await read_upload_form(request)
+    file = form.get("file")
+    if file is None or isinstance(file, str):
+        await form.close()
+        raise HTTPException(status_code=400, detail="Expected a PDF in the form field 'file'")
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    sha = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=413, detail="Uploaded file is too large")
+                sha.update(chunk)
+                out.write(chunk)
+
+        source_hash = sha.hexdigest()
+        if source_hash == pdf_processor.current_source_hash:
+            return {"status": "already_ingested", "sha256": source_hash, "message": "PDF is already indexed"}
+
+        pdf_path = os.path.join(UPLOAD_DIR, f"{source_hash}.pdf")
+        os.replace(tmp_path, pdf_path)
+    finally:
+        await form.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    job = ingestion_jobs.submit(pdf_path, source_hash=source_hash)
+    return {"status": job.status, "job_id": job.job_id, "sha256": source_hash, "message": "Ingestion job queued"}
+
+@app.get("/initialize/{job_id}")
+async def initialization_status(job_id: str):
+    """Report stage, chunk counts, throughput and ETA of an ingestion job"""
+    status = ingestion_jobs.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job ID: {job_id}")
+    return status
@@ -0,0 +1,31 @@
+import os
+from typing import Any, Dict
+
+from utils.disk_cache import DiskCache
+
+CACHE_DIR = os.getenv("SARVAM_CACHE_DIR", ".cache/sarvam")
+TRANSLATION_CACHE_MB = int(os.getenv("SARVAM_TRANSLATION_CACHE_MB", "50"))
+AUDIO_CACHE_MB = int(os.getenv("SARVAM_AUDIO_CACHE_MB", "500"))
+
+translation_cache = DiskCache(os.path.join(CACHE_DIR, "translations"), max_bytes=TRANSLATION_CACHE_MB * 1024 * 1024)
+audio_cache = DiskCache(os.path.join(CACHE_DIR, "audio"), max_bytes=AUDIO_CACHE_MB * 1024 * 1024)
+
+def translation_key(
+    text: str,
+    source_language: str,
+    target_language: str,
+    mode: str,
+    model: str,
+    speaker_gender: str = "Male"
+) -> str:
+    return DiskCache.make_key("translation", text, source_language, target_language, mode, model, speaker_gender)
+
+def audio_key(text: str, language: str, speaker: str, model: str) -> str:
+    return DiskCache.make_key("tts", text, language, speaker, model)
+
+def cache_stats() -> Dict[str, Any]:
+    """Hit/miss counts and sizes of the translation and audio caches"""
+    return {
+        "translations": translation_cache.stats(),
+        "audio": audio_cache.stats()
+    }
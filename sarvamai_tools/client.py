@@ -0,0 +1,156 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+from utils.metrics import SARVAM_ERRORS, SARVAM_SECONDS
+
+load_dotenv()
+
+SARVAM_API_BASE_URL = os.getenv("SARVAM_API_BASE_URL", "https://api.sarvam.ai")
+CONNECT_TIMEOUT = float(os.getenv("SARVAM_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("SARVAM_READ_TIMEOUT", "60"))
+MAX_RETRIES = int(os.getenv("SARVAM_MAX_RETRIES", "3"))
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+def _backoff_delay(attempt: int, base: float, retry_after: Optional[str] = None) -> float:
+    """Full-jitter exponential backoff, honouring a Retry-After header in seconds"""
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return random.uniform(0, base * (2 ** attempt))
+
+class SarvamClient:
+    """Sarvam.ai client that reuses pooled keep-alive connections across calls
+
+    Requests are retried with jittered backoff on 429/5xx responses and on
+    connection errors. Bodies must be bytes/dicts (not open files) so that a
+    retry can resend them.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = SARVAM_API_BASE_URL,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+        max_retries: int = MAX_RETRIES,
+        backoff: float = 0.5,
+        pool_size: int = 10
+    ):
+        self.api_key = api_key or os.getenv("SARVAM_API_KEY")
+        if not self.api_key:
+            raise ValueError("API key is required")
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"api-subscription-key": self.api_key})
+
+    def post(self, path: str, **kwargs) -> Dict[str, Any]:
+        """POST to a Sarvam endpoint and return the decoded JSON body"""
+        with SARVAM_SECONDS.time(SARVAM_ERRORS, path=path):
+            return self._post(path, **kwargs)
+
+    def _post(self, path: str, **kwargs) -> Dict[str, Any]:
+        url = f"{self.base_url}{path}"
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(url, timeout=self.timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(_backoff_delay(attempt, self.backoff))
+                continue
+
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                time.sleep(_backoff_delay(attempt, self.backoff, response.headers.get("Retry-After")))
+                continue
+
+            response.raise_for_status()
+            return response.json()
+
+    def close(self):
+        self.session.close()
+
+class AsyncSarvamClient:
+    """asyncio counterpart of SarvamClient built on a pooled httpx.AsyncClient"""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = SARVAM_API_BASE_URL,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+        max_retries: int = MAX_RETRIES,
+        backoff: float = 0.5,
+        pool_size: int = 10
+    ):
+        self.api_key = api_key or os.getenv("SARVAM_API_KEY")
+        if not self.api_key:
+            raise ValueError("API key is required")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers={"api-subscription-key": self.api_key},
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+
+    async def post(self, path: str, **kwargs) -> Dict[str, Any]:
+        """POST to a Sarvam endpoint and return the decoded JSON body"""
+        with SARVAM_SECONDS.time(SARVAM_ERRORS, path=path):
+            return await self._post(path, **kwargs)
+
+    async def _post(self, path: str, **kwargs) -> Dict[str, Any]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self.client.post(path, **kwargs)
+            except (httpx.ConnectError, httpx.TimeoutException):
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(_backoff_delay(attempt, self.backoff))
+                continue
+
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                await asyncio.sleep(_backoff_delay(attempt, self.backoff, response.headers.get("Retry-After")))
+                continue
+
+            response.raise_for_status()
+            return response.json()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+_client: Optional[SarvamClient] = None
+_client_lock = threading.Lock()
+
+def get_client() -> SarvamClient:
+    """Process-wide shared SarvamClient"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = SarvamClient()
+    return _client
+
+def set_client(client: SarvamClient):
+    """Replace the shared client, e.g. to point the tools at a local stub server"""
+    global _client
+    with _client_lock:
+        _client = client
@@ -0,0 +1,127 @@
+import io
+import wave
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from sarvamai_tools.stt_check import transcribe_audio_bytes
+from sarvamai_tools.vad import EnergyVAD, speech_segments
+
+class StreamingTranscriber:
+    """Transcribe audio while it is still being recorded
+
+    Raw 16-bit PCM is pushed in with feed(). Silence is cut by voice-activity
+    detection, and each speech segment is uploaded on a background thread as
+    soon as the speaker pauses, so by the time recording stops only the last
+    segment is still waiting for a transcript.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        channels: int = 1,
+        prompt: Optional[str] = None,
+        frame_ms: int = 30,
+        silence_ms: int = 600,
+        padding_ms: int = 150,
+        max_segment_seconds: float = 25.0,
+        max_workers: int = 4
+    ):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.prompt = prompt
+        self.frame_ms = frame_ms
+        self._frame_bytes = int(sample_rate * frame_ms / 1000) * 2 * channels
+        self._silence_frames = max(silence_ms // frame_ms, 1)
+        self._padding_frames = padding_ms // frame_ms
+        self._max_frames = int(max_segment_seconds * 1000 / frame_ms)
+
+        self._vad = EnergyVAD()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stt")
+        self._futures: List[Future] = []
+        self._pending = b""
+        self._recent: List[bytes] = []  # silence kept for leading padding
+        self._segment: List[bytes] = []
+        self._trailing_silence = 0
+
+        self.bytes_received = 0
+        self.bytes_sent = 0
+
+    def feed(self, pcm: bytes):
+        """Add recorded PCM; complete speech segments are uploaded immediately"""
+        self.bytes_received += len(pcm)
+        self._pending += pcm
+        while len(self._pending) >= self._frame_bytes:
+            frame = self._pending[:self._frame_bytes]
+            self._pending = self._pending[self._frame_bytes:]
+            self._process_frame(frame)
+
+    def _process_frame(self, frame: bytes):
+        speech = self._vad.is_speech(frame, self.channels)
+        if not self._segment:
+            if speech:
+                self._segment = self._recent + [frame]
+                self._trailing_silence = 0
+            else:
+                self._recent = (self._recent + [frame])[-self._padding_frames:] if self._padding_frames else []
+            return
+
+        self._segment.append(frame)
+        self._trailing_silence = 0 if speech else self._trailing_silence + 1
+        if self._trailing_silence >= self._silence_frames or len(self._segment) >= self._max_frames:
+            self._flush()
+
+    def _flush(self):
+        if not self._segment:
+            return
+        # Keep only padding_frames of the trailing silence
+        drop = max(self._trailing_silence - self._padding_frames, 0)
+        frames = self._segment[:len(self._segment) - drop] if drop else self._segment
+        self._upload(b"".join(frames))
+        self._segment = []
+        self._recent = []
+        self._trailing_silence = 0
+
+    def _upload(self, pcm: bytes):
+        wav_bytes = _pcm_to_wav(pcm, self.sample_rate, self.channels)
+        self.bytes_sent += len(wav_bytes)
+        self._futures.append(self._executor.submit(transcribe_audio_bytes, wav_bytes, self.prompt))
+
+    def finish(self) -> Tuple[str, str]:
+        """Flush the last segment and return (transcript, language_code)"""
+        if self._pending:
+            self._process_frame(self._pending)
+            self._pending = b""
+        self._flush()
+        try:
+            results = [future.result() for future in self._futures]
+        finally:
+            self._executor.shutdown(wait=False)
+        transcript = " ".join(text.strip() for text, _ in results if text and text.strip())
+        language_code = next((code for _, code in results if code), "en-IN")
+        return transcript, language_code
+
+def _pcm_to_wav(pcm: bytes, sample_rate: int, channels: int) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+def transcribe_recording(audio_bytes: bytes, prompt: Optional[str] = None, max_workers: int = 4) -> Tuple[str, str]:
+    """Transcribe a finished in-memory WAV recording
+
+    Silence is cut before upload and pauses split the recording into
+    segments that are transcribed concurrently.
+    """
+    segments = speech_segments(audio_bytes)
+    if not segments:
+        return "", "en-IN"
+    if len(segments) == 1:
+        return transcribe_audio_bytes(segments[0], prompt)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stt") as executor:
+        results = list(executor.map(lambda segment: transcribe_audio_bytes(segment, prompt), segments))
+    transcript = " ".join(text.strip() for text, _ in results if text and text.strip())
+    language_code = next((code for _, code in results if code), "en-IN")
+    return transcript, language_code
@@ -1,25 +1,15 @@
 import requests
-import os
 from dotenv import load_dotenv
+from sarvamai_tools.client import get_client
 
 load_dotenv()
 
-def transcribe_and_translate_audio(audio_file_path, prompt=None):
-    print("entered inside transcribe and translate ")
-
-    print("audio file path ", audio_file_path)
-
+def transcribe_audio_bytes(audio_bytes: bytes, prompt=None):
     """
-    Transcribe and translate audio using Sarvam.ai Speech-to-Text-Translate API
+    Transcribe and translate in-memory WAV audio using Sarvam.ai Speech-to-Text-Translate API
     """
-    api_key = os.getenv("SARVAM_API_KEY")
-    if not api_key:
-        raise ValueError("API key is required")
-
-    url = "https://api.sarvam.ai/speech-to-text-translate"
-    
     files = {
-        'file': ('audio.wav', open(audio_file_path, 'rb'), 'audio/wav')
+        'file': ('audio.wav', audio_bytes, 'audio/wav')
     }
     
     data = {
@@ -29,18 +19,20 @@ def transcribe_and_translate_audio(audio_file_path, prompt=None):
     if prompt:
         data['prompt'] = prompt
     
-    headers = {
-        'api-subscription-key': api_key
-    }
-    
     try:
-        response = requests.post(url, files=files, data=data, headers=headers)
-        response.raise_for_status()
-        print("transcription response is ", response.json())
+        result = get_client().post("/speech-to-text-translate", files=files, data=data)
+        print("transcription response is ", result)
 
-
-
-        return response.json().get("transcript", ""), response.json().get("language_code", "en-IN")
+        return result.get("transcript", ""), result.get("language_code", "en-IN")
         
     except requests.exceptions.RequestException as e:
-        raise Exception(f"Error occurred: {e}")
\ No newline at end of file
+        raise Exception(f"Error occurred: {e}")
+
+def transcribe_and_translate_audio(audio_file_path, prompt=None):
+    """
+    Transcribe and translate audio using Sarvam.ai Speech-to-Text-Translate API
+    """
+    print("audio file path ", audio_file_path)
+
+    with open(audio_file_path, 'rb') as audio_file:
+        return transcribe_audio_bytes(audio_file.read(), prompt)
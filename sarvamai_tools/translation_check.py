@@ -1,9 +1,12 @@
 import requests
-import os
 from dotenv import load_dotenv
+from sarvamai_tools.cache import translation_cache, translation_key
+from sarvamai_tools.client import get_client
 
 load_dotenv()
 
+TRANSLATION_MODEL = "mayura:v1"
+
 def translate_text(
     input_text: str,
     target_language: str,
@@ -16,33 +19,25 @@ def translate_text(
     print("input text in translate text is ", input_text)
     
 
-    """Translate text using Sarvam.ai API"""
-    api_key = os.getenv("SARVAM_API_KEY")
-    if not api_key:
-        raise ValueError("API key is required")
-    
-    url = "https://api.sarvam.ai/translate"
-    
+    """Translate text using Sarvam.ai API, serving repeated requests from the cache"""
+    key = translation_key(input_text, source_language, target_language, mode, TRANSLATION_MODEL, speaker_gender)
+    cached = translation_cache.get(key)
+    if cached is not None:
+        return cached
+
     payload = {
         "input": input_text,
         "source_language_code": source_language,
         "target_language_code": target_language,
         "speaker_gender": speaker_gender,
         "mode": mode,
-        "model": "mayura:v1",
+        "model": TRANSLATION_MODEL,
         "enable_preprocessing": True
     }
     
-    headers = {
-        "Content-Type": "application/json",
-        "api-subscription-key": api_key
-    }
-
     try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        
-        result = response.json()
+        result = get_client().post("/translate", json=payload)
+        translation_cache.set(key, result["translated_text"])
         return result["translated_text"]
         
     except requests.exceptions.RequestException as e:
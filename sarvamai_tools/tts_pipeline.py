@@ -0,0 +1,118 @@
+import base64
+import io
+import re
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List
+
+from sarvamai_tools.cache import audio_cache, audio_key
+from sarvamai_tools.client import get_client
+from sarvamai_tools.translation_check import translate_text
+
+# Longest input the text-to-speech API accepts per item
+MAX_TTS_CHARS = 500
+TTS_MODEL = "bulbul:v1"
+
+def split_text(text: str, max_chars: int = MAX_TTS_CHARS) -> List[str]:
+    """Split text at sentence boundaries into pieces of at most max_chars
+
+    Sentences are packed greedily; a single sentence longer than max_chars
+    is split at word boundaries instead.
+    """
+    sentences = [s.strip() for s in re.split(r'(?<=[.!?।])\s+', text) if s.strip()]
+    pieces = []
+    current = ""
+    for sentence in sentences:
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+def concatenate_wavs(segments: List[bytes]) -> bytes:
+    """Join WAV segments that share the same format into one WAV stream"""
+    output = io.BytesIO()
+    with wave.open(output, 'wb') as out:
+        for i, segment in enumerate(segments):
+            with wave.open(io.BytesIO(segment), 'rb') as wav:
+                if i == 0:
+                    out.setparams(wav.getparams())
+                out.writeframes(wav.readframes(wav.getnframes()))
+    return output.getvalue()
+
+def synthesize_segment(text: str, target_language: str = "en-IN", speaker: str = "meera") -> bytes:
+    """Translate (if needed) and synthesize one piece of text into a WAV segment"""
+    if target_language != "en-IN":
+        try:
+            text = translate_text(
+                input_text=text,
+                target_language=target_language,
+                source_language="en-IN"
+            )
+        except Exception as e:
+            raise Exception(f"Translation failed: {str(e)}")
+
+    key = audio_key(text, target_language, speaker, TTS_MODEL)
+    cached = audio_cache.get_bytes(key)
+    if cached is not None:
+        return cached
+
+    # Translated text can come back longer than the English piece
+    payload = {
+        "inputs": split_text(text),
+        "target_language_code": target_language,
+        "speaker": speaker,
+        "model": TTS_MODEL
+    }
+    result = get_client().post("/text-to-speech", json=payload)
+    audios = [base64.b64decode(audio) for audio in result.get("audios") or []]
+    if not audios:
+        raise Exception("Text-to-speech returned no audio")
+    segment = audios[0] if len(audios) == 1 else concatenate_wavs(audios)
+    audio_cache.set_bytes(key, segment)
+    return segment
+
+def stream_speech(
+    text: str,
+    target_language: str = "en-IN",
+    speaker: str = "meera",
+    max_workers: int = 4
+) -> Iterator[bytes]:
+    """Synthesize text of any length, yielding WAV segments in order
+
+    Pieces are translated and synthesized concurrently (at most max_workers
+    in flight), and each segment is yielded as soon as it and all earlier
+    segments are ready, so the first one can be played straight away.
+    """
+    pieces = split_text(text)
+    if not pieces:
+        return
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts") as executor:
+        futures = [executor.submit(synthesize_segment, piece, target_language, speaker) for piece in pieces]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+def long_text_to_speech(
+    text: str,
+    target_language: str = "en-IN",
+    speaker: str = "meera",
+    max_workers: int = 4
+) -> bytes:
+    """Synthesize text of any length into a single WAV stream"""
+    segments = list(stream_speech(text, target_language, speaker, max_workers))
+    return concatenate_wavs(segments) if segments else b""
@@ -0,0 +1,94 @@
+import io
+import wave
+from typing import Any, List, Tuple
+
+import numpy as np
+
+class EnergyVAD:
+    """Frame-level voice activity detection on 16-bit PCM audio
+
+    A frame counts as speech when its RMS energy is above both a fixed floor
+    and a multiple of the running background-noise estimate.
+    """
+
+    def __init__(self, min_energy: float = 300.0, noise_multiplier: float = 2.5, noise_smoothing: float = 0.95):
+        self.min_energy = min_energy
+        self.noise_multiplier = noise_multiplier
+        self.noise_smoothing = noise_smoothing
+        self.noise_floor = None
+
+    def is_speech(self, frame: bytes, channels: int = 1) -> bool:
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float64)
+        if channels > 1:
+            samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+        if samples.size == 0:
+            return False
+        energy = float(np.sqrt(np.mean(samples ** 2)))
+
+        if self.noise_floor is None:
+            # Recordings may start mid-speech, so never start above the fixed floor
+            self.noise_floor = min(energy, self.min_energy)
+        threshold = max(self.min_energy, self.noise_floor * self.noise_multiplier)
+        speech = energy > threshold
+        if not speech:
+            self.noise_floor = self.noise_smoothing * self.noise_floor + (1 - self.noise_smoothing) * energy
+        return speech
+
+def read_wav(wav_bytes: bytes) -> Tuple[Any, bytes]:
+    """Return the wave params and raw PCM frames of a WAV file"""
+    with wave.open(io.BytesIO(wav_bytes), 'rb') as wav:
+        return wav.getparams(), wav.readframes(wav.getnframes())
+
+def write_wav(params: Any, pcm: bytes) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(params.nchannels)
+        wav.setsampwidth(params.sampwidth)
+        wav.setframerate(params.framerate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+def speech_segments(
+    wav_bytes: bytes,
+    frame_ms: int = 30,
+    silence_ms: int = 600,
+    padding_ms: int = 150,
+    max_segment_seconds: float = 25.0
+) -> List[bytes]:
+    """Cut a WAV recording into speech-only WAV segments
+
+    Silence longer than silence_ms ends a segment; leading/trailing silence is
+    dropped apart from padding_ms around each segment. Segments are also cut
+    at max_segment_seconds so no single upload gets too large.
+    """
+    params, pcm = read_wav(wav_bytes)
+    if params.sampwidth != 2:
+        return [wav_bytes]  # only 16-bit PCM is analysed
+
+    frame_bytes = int(params.framerate * frame_ms / 1000) * params.sampwidth * params.nchannels
+    frames = [pcm[i:i + frame_bytes] for i in range(0, len(pcm), frame_bytes)]
+    vad = EnergyVAD()
+    flags = [vad.is_speech(frame, params.nchannels) for frame in frames]
+
+    silence_frames = max(silence_ms // frame_ms, 1)
+    padding_frames = padding_ms // frame_ms
+    max_frames = int(max_segment_seconds * 1000 / frame_ms)
+
+    segments = []
+    start = None
+    last_speech = None
+    for i, speech in enumerate(flags):
+        if speech:
+            if start is None:
+                start = i
+            last_speech = i
+        if start is not None and (i - last_speech >= silence_frames or i - start + 1 >= max_frames):
+            segments.append((start, last_speech + 1))
+            start = None
+    if start is not None:
+        segments.append((start, last_speech + 1))
+
+    return [
+        write_wav(params, b"".join(frames[max(s - padding_frames, 0):min(e + padding_frames, len(frames))]))
+        for s, e in segments
+    ]
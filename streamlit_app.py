@@ -1,14 +1,18 @@
-import base64
 import streamlit as st
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 from typing import Optional
+import hashlib
 import json
-import tempfile
+import time
 from audio_recorder_streamlit import audio_recorder
-from sarvamai_tools.stt_check import transcribe_and_translate_audio
-from sarvamai_tools.tts_check import text_to_speech
+from sarvamai_tools.streaming_stt import transcribe_recording
+from sarvamai_tools.tts_pipeline import stream_speech, concatenate_wavs
+from sarvamai_tools.cache import cache_stats
+from utils.chat_history import ChatHistory, load_audio
 import logging
 
 logging.basicConfig(
@@ -18,29 +22,205 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # API endpoint configurations
-API_BASE_URL = "http://localhost:8000"
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+CONNECT_TIMEOUT = 5
+STATUS_TIMEOUT = (CONNECT_TIMEOUT, 10)
+ANSWER_TIMEOUT = (CONNECT_TIMEOUT, 180)
+
+# Rendering limits: only this much is laid out on each rerun
+CHAT_PAGE_SIZE = 20
+PROBLEMS_PER_PAGE = 5
+
+# Styles for every learning tool, sent once per run from main()
+TOOL_CSS = """
+    <style>
+        .flashcard {
+            padding: 20px;
+            border-radius: 10px;
+            margin: 10px 0;
+            min-height: 200px;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            text-align: center;
+            font-size: 1.2em;
+            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+            transition: transform 0.3s ease;
+        }
+        .question-card {
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+        }
+        .answer-card {
+            background: linear-gradient(135deg, #84fab0 0%, #8fd3f4 100%);
+            color: #1a1a1a;
+        }
+        .problem-card {
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            padding: 20px;
+            border-radius: 15px;
+            color: white;
+            margin: 20px 0;
+            box-shadow: 0 8px 16px rgba(0, 0, 0, 0.2);
+        }
+        .solution-section {
+            background: linear-gradient(135deg, #84fab0 0%, #8fd3f4 100%);
+            padding: 15px;
+            border-radius: 12px;
+            margin: 10px 0;
+            color: #1a1a1a;
+        }
+        .answer-section {
+            background: linear-gradient(135deg, #f6d365 0%, #fda085 100%);
+            padding: 15px;
+            border-radius: 12px;
+            margin: 10px 0;
+            color: #1a1a1a;
+        }
+        .explanation-section {
+            background: linear-gradient(135deg, #e0c3fc 0%, #8ec5fc 100%);
+            padding: 15px;
+            border-radius: 12px;
+            margin: 10px 0;
+            color: #1a1a1a;
+        }
+        /* Central Concept Styling */
+        .concept-central {
+            background: linear-gradient(135deg, #FF6B6B 0%, #FF8E53 100%);
+            padding: 20px;
+            border-radius: 15px;
+            color: white;
+            text-align: center;
+            margin: 20px auto;
+            max-width: 80%;
+            box-shadow: 0 8px 16px rgba(0, 0, 0, 0.2);
+            transition: all 0.3s ease;
+        }
+        .concept-central:hover {
+            transform: translateY(-5px);
+            box-shadow: 0 12px 20px rgba(0, 0, 0, 0.3);
+        }
+        .summary-header {
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            padding: 15px;
+            border-radius: 15px;
+            color: white;
+            margin: 20px 0 10px 0;
+            box-shadow: 0 4px 8px rgba(0, 0, 0, 0.2);
+            text-align: center;
+        }
+        .main-point-card {
+            background: linear-gradient(135deg, #84fab0 0%, #8fd3f4 100%);
+            padding: 15px;
+            border-radius: 12px;
+            margin: 10px 0;
+            color: #1a1a1a;
+            box-shadow: 0 3px 6px rgba(0, 0, 0, 0.1);
+            transition: transform 0.2s ease;
+        }
+        .main-point-card:hover {
+            transform: translateX(10px);
+        }
+        .detail-card {
+            background: linear-gradient(135deg, #f6d365 0%, #fda085 100%);
+            padding: 15px;
+            border-radius: 12px;
+            margin: 10px 0;
+            color: #1a1a1a;
+            box-shadow: 0 3px 6px rgba(0, 0, 0, 0.1);
+        }
+        .example-card {
+            background: linear-gradient(135deg, #e0c3fc 0%, #8ec5fc 100%);
+            padding: 15px;
+            border-radius: 12px;
+            margin: 10px 0;
+            color: #1a1a1a;
+            box-shadow: 0 3px 6px rgba(0, 0, 0, 0.1);
+            transition: transform 0.2s ease;
+        }
+        .example-card:hover {
+            transform: scale(1.02);
+        }
+        .notes-card {
+            background: linear-gradient(135deg, #FF6B6B 0%, #FF8E53 100%);
+            padding: 15px;
+            border-radius: 12px;
+            margin: 10px 0;
+            color: white;
+            box-shadow: 0 3px 6px rgba(0, 0, 0, 0.1);
+        }
+    </style>
+"""
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """Keep-alive session shared across reruns and sessions
+
+    Connection failures are retried for every call; 5xx responses are only
+    retried for idempotent GETs, since POSTs may trigger paid LLM calls.
+    """
+    retry = Retry(
+        total=3,
+        connect=3,
+        backoff_factor=0.3,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip"})
+    return session
 
 class APIClient:
     @staticmethod
     def initialize_system(pdf_path: str) -> dict:
-        """Initialize the system through the API"""
+        """Queue PDF ingestion through the API and return the job info"""
         try:
-            response = requests.post(
+            response = get_session().post(
                 f"{API_BASE_URL}/initialize",
-                json={"pdf_path": pdf_path}
+                json={"pdf_path": pdf_path},
+                timeout=STATUS_TIMEOUT
             )
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             raise Exception(f"Error initializing system: {str(e)}")
 
+    @staticmethod
+    def upload_pdf(file_name: str, file_obj) -> dict:
+        """Upload a PDF to the backend for ingestion and return the job info"""
+        try:
+            response = get_session().post(
+                f"{API_BASE_URL}/upload",
+                files={"file": (file_name, file_obj, "application/pdf")},
+                timeout=ANSWER_TIMEOUT
+            )
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Error uploading PDF: {str(e)}")
+
+    @staticmethod
+    def get_initialization_status(job_id: str) -> dict:
+        """Get progress of a queued ingestion job"""
+        try:
+            response = get_session().get(f"{API_BASE_URL}/initialize/{job_id}", timeout=STATUS_TIMEOUT)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Error checking initialization status: {str(e)}")
+
     @staticmethod
     def ask(question: str) -> dict:
         """Get answer from basic FastAPI endpoint"""
         try:
-            response = requests.post(
+            response = get_session().post(
                 f"{API_BASE_URL}/ask",
-                json={"question": question}
+                json={"question": question},
+                timeout=ANSWER_TIMEOUT
             )
             response.raise_for_status()
             print("response json for the query is ", response.json())
@@ -52,9 +232,10 @@ class APIClient:
     def smart_ask(question: str) -> dict:
         """Get answer from smart FastAPI endpoint"""
         try:
-            response = requests.post(
+            response = get_session().post(
                 f"{API_BASE_URL}/smart-ask",
-                json={"question": question}
+                json={"question": question},
+                timeout=ANSWER_TIMEOUT
             )
             response.raise_for_status()
             return response.json()
@@ -62,12 +243,13 @@ class APIClient:
             raise Exception(f"Error getting answer: {str(e)}")
 
     @staticmethod
-    def learning_tools_qa(question: str) -> dict:
+    def learning_tools_qa(question: str, variety: bool = False) -> dict:
         """Get answer from learning tools endpoint"""
         try:
-            response = requests.post(
+            response = get_session().post(
                 f"{API_BASE_URL}/learning-tools",
-                json={"question": question}
+                json={"question": question, "variety": variety},
+                timeout=ANSWER_TIMEOUT
             )
             response.raise_for_status()
             return response.json()
@@ -75,10 +257,29 @@ class APIClient:
             raise Exception(f"Error getting answer: {str(e)}")
 
 
+def wait_for_ingestion(job_id: str):
+    """Show progress of an ingestion job until it completes"""
+    progress_bar = st.progress(0.0)
+    status_text = st.empty()
+    while True:
+        status = APIClient.get_initialization_status(job_id)
+        if status["status"] == "failed":
+            raise Exception(status["error"])
+        if status["status"] == "completed":
+            progress_bar.progress(1.0)
+            break
+        if status["chunks_total"]:
+            progress_bar.progress(min(status["chunks_done"] / status["chunks_total"], 1.0))
+        eta = f", ETA {status['eta_seconds']}s" if status["eta_seconds"] is not None else ""
+        status_text.caption(f"Stage: {status['stage'] or 'queued'}{eta}")
+        time.sleep(1)
+    status_text.empty()
+
+
 def init_session_state():
     """Initialize session state variables"""
     if 'chat_history' not in st.session_state:
-        st.session_state.chat_history = []
+        st.session_state.chat_history = ChatHistory()
     if 'pdf_processed' not in st.session_state:
         st.session_state.pdf_processed = False
     if 'current_mode' not in st.session_state:
@@ -91,70 +292,116 @@ def init_session_state():
         st.session_state.current_tool_result = None
     if 'current_tool_type' not in st.session_state:
         st.session_state.current_tool_type = None
+    if 'current_tool_key' not in st.session_state:
+        st.session_state.current_tool_key = None
+    if 'chat_visible' not in st.session_state:
+        st.session_state.chat_visible = CHAT_PAGE_SIZE
+    if 'playing_message' not in st.session_state:
+        st.session_state.playing_message = None
 
 
 
 def add_message(role: str, content: str, metadata: Optional[dict] = None, audio_data: Optional[bytes] = None):
-    """Add a message to chat history"""
-    st.session_state.chat_history.append({
+    """Add a message to chat history; audio goes to the shared disk store"""
+    st.session_state.chat_history.add({
         "role": role,
         "content": content,
         "metadata": metadata if metadata is not None else {},
-        "timestamp": datetime.now().strftime("%H:%M:%S"),
-        "audio_data": audio_data if audio_data else None
-    })
-
-def display_tool_result(result_type: str, data: dict):
-
+        "timestamp": datetime.now().strftime("%H:%M:%S")
+    }, audio_data=audio_data)
+
+def result_hash(data: dict) -> str:
+    """Stable key for a tool result, used to memoize its rendered HTML"""
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def inject_css():
+    """Emit the tool stylesheet once, at a fixed position at the top of the page
+
+    Streamlit drops elements that a rerun does not emit again, so the style
+    block is sent on every run; being identical and always in the same slot,
+    the frontend leaves it untouched instead of re-parsing per tool render.
+    """
+    st.markdown(TOOL_CSS, unsafe_allow_html=True)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def render_tool_html(result_type: str, result_key: str, _data: dict) -> dict:
+    """Build the static HTML fragments of a tool result once per result
+
+    Cached on result_key (the result hash) so reruns only lay out widgets
+    instead of re-formatting every card; _data is not hashed by Streamlit.
+    """
+    if result_type == "create_flashcards":
+        return {
+            "front": [f'<div class="flashcard question-card">{card["front"]}</div>' for card in _data.get("flashcards", [])],
+            "back": [f'<div class="flashcard answer-card">{card["back"]}</div>' for card in _data.get("flashcards", [])]
+        }
+    if result_type == "generate_practice":
+        return {"problems": [
+            {
+                "question": f'<div class="problem-card"><h3>Problem {i + 1}</h3><p>{prob["question"]}</p></div>',
+                "solution": f'<div class="solution-section"><strong>Step-by-step Solution:</strong><br>{prob["solution"]}</div>',
+                "answer": f'<div class="answer-section"><strong>Final Answer:</strong><br>{prob["final_answer"]}</div>',
+                "explanation": f'<div class="explanation-section"><strong>Explanation:</strong><br>{prob["explanation"]}</div>'
+            }
+            for i, prob in enumerate(_data.get("problems", []))
+        ]}
+    if result_type == "create_concept_map":
+        return {"central": f'<div class="concept-central"><h2>{_data.get("central_concept", "")}</h2></div>'}
+    if result_type == "generate_summary":
+        header = '<div class="summary-header"><h3>{}</h3></div>'
+        return {
+            "main_points": header.format("Key Points") + "".join(
+                f'<div class="main-point-card"><strong>{i}.</strong> {point}</div>'
+                for i, point in enumerate(_data.get("main_points", []), 1)
+            ),
+            "details_header": header.format("Detailed Explanations"),
+            "details": {
+                concept: f'<div class="detail-card">{explanation}</div>'
+                for concept, explanation in _data.get("details", {}).items()
+            },
+            "examples": header.format("Examples") + "".join(
+                f'<div class="example-card"><strong>Example {i}:</strong><br>{example}</div>'
+                for i, example in enumerate(_data.get("examples", []), 1)
+            ),
+            "notes": header.format("Additional Notes") + f'<div class="notes-card">{_data["additional_notes"]}</div>'
+            if "additional_notes" in _data else None
+        }
+    return {}
+
+
+def reset_tool_state(result_key: str):
+    """Start flashcards and practice problems from the top for a new result"""
+    if st.session_state.get("rendered_tool_key") == result_key:
+        return
+    st.session_state.rendered_tool_key = result_key
+    st.session_state.flashcard_index = 0
+    st.session_state.show_answer = False
+    st.session_state.problem_states = {}
+    st.session_state.problem_page = 0
+
+
+def set_problem_page(page: int):
+    st.session_state.problem_page = page
+
+
+def display_tool_result(result_type: str, data: dict, result_key: Optional[str] = None):
+    """Display various tool results in an organized manner"""
     logger.info(f"Displaying tool result for type: {result_type}")
-    logger.debug(f"Received data: {json.dumps(data, indent=2)}")
-
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Received data: {json.dumps(data, indent=2)}")
 
-    """Display various tool results in an organized manner"""
     try:
-        print("data for display we are still outside if conditions  is \n\n", data)
+        result_key = result_key or result_hash(data)
+        reset_tool_state(result_key)
+        html = render_tool_html(result_type, result_key, data)
+
         if result_type == "create_flashcards":
-            logger.info("Processing flashcards display")
-            flashcards = data.get("flashcards", [])
-            logger.debug(f"Found {len(flashcards)} flashcards")
-            
-            
-    
             st.subheader("Flashcards")
             flashcards = data.get("flashcards", [])
-            
-            # Custom CSS for flashcard styling
-            st.markdown("""
-                <style>
-                    .flashcard {
-                        padding: 20px;
-                        border-radius: 10px;
-                        margin: 10px 0;
-                        min-height: 200px;
-                        display: flex;
-                        align-items: center;
-                        justify-content: center;
-                        text-align: center;
-                        font-size: 1.2em;
-                        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-                        transition: transform 0.3s ease;
-                    }
-                    .question-card {
-                        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                        color: white;
-                    }
-                    .answer-card {
-                        background: linear-gradient(135deg, #84fab0 0%, #8fd3f4 100%);
-                        color: #1a1a1a;
-                    }
-                </style>
-            """, unsafe_allow_html=True)
-            
-            # Initialize session state
-            if 'flashcard_index' not in st.session_state:
-                st.session_state.flashcard_index = 0
-                st.session_state.show_answer = False
-            
+            logger.debug(f"Found {len(flashcards)} flashcards")
+
             # Create three columns for navigation and card display
             left_col, center_col, right_col = st.columns([1, 3, 1])
             
@@ -165,20 +412,8 @@ def display_tool_result(result_type: str, data: dict):
                 st.markdown(f"<p style='text-align: center'>{progress_text}</p>", unsafe_allow_html=True)
                 
                 # Display current card
-                current_card = flashcards[st.session_state.flashcard_index]
-                
-                if not st.session_state.show_answer:
-                    st.markdown(f"""
-                        <div class="flashcard question-card">
-                            {current_card["front"]}
-                        </div>
-                    """, unsafe_allow_html=True)
-                else:
-                    st.markdown(f"""
-                        <div class="flashcard answer-card">
-                            {current_card["back"]}
-                        </div>
-                    """, unsafe_allow_html=True)
+                side = "back" if st.session_state.show_answer else "front"
+                st.markdown(html[side][st.session_state.flashcard_index], unsafe_allow_html=True)
             
             # Navigation controls
             col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
@@ -207,136 +442,64 @@ def display_tool_result(result_type: str, data: dict):
                     st.session_state.show_answer = False
                     st.rerun()
 
-      
         elif result_type == "generate_practice":
             st.subheader("Practice Problems")
-            problems = data.get("problems", [])
-            
-            # Custom CSS for practice problems
-            st.markdown("""
-                <style>
-                    .problem-card {
-                        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                        padding: 20px;
-                        border-radius: 15px;
-                        color: white;
-                        margin: 20px 0;
-                        box-shadow: 0 8px 16px rgba(0, 0, 0, 0.2);
-                    }
-                    .solution-section {
-                        background: linear-gradient(135deg, #84fab0 0%, #8fd3f4 100%);
-                        padding: 15px;
-                        border-radius: 12px;
-                        margin: 10px 0;
-                        color: #1a1a1a;
-                    }
-                    .answer-section {
-                        background: linear-gradient(135deg, #f6d365 0%, #fda085 100%);
-                        padding: 15px;
-                        border-radius: 12px;
-                        margin: 10px 0;
-                        color: #1a1a1a;
-                    }
-                    .explanation-section {
-                        background: linear-gradient(135deg, #e0c3fc 0%, #8ec5fc 100%);
-                        padding: 15px;
-                        border-radius: 12px;
-                        margin: 10px 0;
-                        color: #1a1a1a;
-                    }
-                </style>
-            """, unsafe_allow_html=True)
-            
-            # Initialize session state for problem visibility
-            if 'problem_states' not in st.session_state:
-                st.session_state.problem_states = [{
+            problems = html["problems"]
+
+            # Only one page of problems is laid out per rerun
+            page_count = max(1, -(-len(problems) // PROBLEMS_PER_PAGE))
+            page = min(st.session_state.problem_page, page_count - 1)
+            start = page * PROBLEMS_PER_PAGE
+
+            for i in range(start, min(start + PROBLEMS_PER_PAGE, len(problems))):
+                prob = problems[i]
+                state = st.session_state.problem_states.setdefault(i, {
                     'show_solution': False,
                     'show_answer': False,
                     'show_explanation': False
-                } for _ in problems]
-            
-            # Display problems
-            for i, prob in enumerate(problems):
-                st.markdown(f"""
-                    <div class="problem-card">
-                        <h3>Problem {i + 1}</h3>
-                        <p>{prob["question"]}</p>
-                    </div>
-                """, unsafe_allow_html=True)
+                })
+                st.markdown(prob["question"], unsafe_allow_html=True)
                 
                 col1, col2, col3 = st.columns(3)
                 
                 with col1:
                     if st.button(f"Solution {i + 1}", key=f"sol_btn_{i}"):
-                        st.session_state.problem_states[i]['show_solution'] = not st.session_state.problem_states[i]['show_solution']
+                        state['show_solution'] = not state['show_solution']
                 
                 with col2:
                     if st.button(f"Final Answer {i + 1}", key=f"ans_btn_{i}"):
-                        st.session_state.problem_states[i]['show_answer'] = not st.session_state.problem_states[i]['show_answer']
+                        state['show_answer'] = not state['show_answer']
                 
                 with col3:
                     if st.button(f"Explanation {i + 1}", key=f"exp_btn_{i}"):
-                        st.session_state.problem_states[i]['show_explanation'] = not st.session_state.problem_states[i]['show_explanation']
+                        state['show_explanation'] = not state['show_explanation']
                 
                 # Show/Hide sections based on button states
-                if st.session_state.problem_states[i]['show_solution']:
-                    st.markdown(f"""
-                        <div class="solution-section">
-                            <strong>Step-by-step Solution:</strong><br>
-                            {prob["solution"]}
-                        </div>
-                    """, unsafe_allow_html=True)
-                
-                if st.session_state.problem_states[i]['show_answer']:
-                    st.markdown(f"""
-                        <div class="answer-section">
-                            <strong>Final Answer:</strong><br>
-                            {prob["final_answer"]}
-                        </div>
-                    """, unsafe_allow_html=True)
-                
-                if st.session_state.problem_states[i]['show_explanation']:
-                    st.markdown(f"""
-                        <div class="explanation-section">
-                            <strong>Explanation:</strong><br>
-                            {prob["explanation"]}
-                        </div>
-                    """, unsafe_allow_html=True)
+                if state['show_solution']:
+                    st.markdown(prob["solution"], unsafe_allow_html=True)
+                if state['show_answer']:
+                    st.markdown(prob["answer"], unsafe_allow_html=True)
+                if state['show_explanation']:
+                    st.markdown(prob["explanation"], unsafe_allow_html=True)
                 
                 st.divider()
+
+            if page_count > 1:
+                col1, col2, col3 = st.columns([1, 2, 1])
+                with col1:
+                    st.button("← Previous problems", key="prob_prev", disabled=page == 0,
+                              on_click=set_problem_page, args=(page - 1,))
+                with col2:
+                    st.caption(f"Page {page + 1} of {page_count}")
+                with col3:
+                    st.button("More problems →", key="prob_next", disabled=page == page_count - 1,
+                              on_click=set_problem_page, args=(page + 1,))
         elif result_type == "create_concept_map":
             st.subheader("Interactive Concept Map")
-            central = data.get("central_concept", "")
             connections = data.get("connections", [])
             
-            # Enhanced Custom CSS for concept map
-            st.markdown("""
-                <style>
-                    /* Central Concept Styling */
-                    .concept-central {
-                        background: linear-gradient(135deg, #FF6B6B 0%, #FF8E53 100%);
-                        padding: 20px;
-                        border-radius: 15px;
-                        color: white;
-                        text-align: center;
-                        margin: 20px auto;
-                        max-width: 80%;
-                        box-shadow: 0 8px 16px rgba(0, 0, 0, 0.2);
-                        transition: all 0.3s ease;
-                    }
-                    .concept-central:hover {
-                        transform: translateY(-5px);
-                        box-shadow: 0 12px 20px rgba(0, 0, 0, 0.3);
-                    }
-                </style>
-            """, unsafe_allow_html=True)
-            
             # Display central concept
-            st.markdown(f"""
-                <div class="concept-central">
-                    <h2>{central}</h2>
-                </div>
-            """, unsafe_allow_html=True)
+            st.markdown(html["central"], unsafe_allow_html=True)
             
             # Only show the Detailed View
             for conn in connections:
@@ -352,61 +515,6 @@ def display_tool_result(result_type: str, data: dict):
         elif result_type == "generate_summary":
             st.subheader("Interactive Summary")
             
-            # Custom CSS for summary sections
-            st.markdown("""
-                <style>
-                    .summary-header {
-                        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                        padding: 15px;
-                        border-radius: 15px;
-                        color: white;
-                        margin: 20px 0 10px 0;
-                        box-shadow: 0 4px 8px rgba(0, 0, 0, 0.2);
-                        text-align: center;
-                    }
-                    .main-point-card {
-                        background: linear-gradient(135deg, #84fab0 0%, #8fd3f4 100%);
-                        padding: 15px;
-                        border-radius: 12px;
-                        margin: 10px 0;
-                        color: #1a1a1a;
-                        box-shadow: 0 3px 6px rgba(0, 0, 0, 0.1);
-                        transition: transform 0.2s ease;
-                    }
-                    .main-point-card:hover {
-                        transform: translateX(10px);
-                    }
-                    .detail-card {
-                        background: linear-gradient(135deg, #f6d365 0%, #fda085 100%);
-                        padding: 15px;
-                        border-radius: 12px;
-                        margin: 10px 0;
-                        color: #1a1a1a;
-                        box-shadow: 0 3px 6px rgba(0, 0, 0, 0.1);
-                    }
-                    .example-card {
-                        background: linear-gradient(135deg, #e0c3fc 0%, #8ec5fc 100%);
-                        padding: 15px;
-                        border-radius: 12px;
-                        margin: 10px 0;
-                        color: #1a1a1a;
-                        box-shadow: 0 3px 6px rgba(0, 0, 0, 0.1);
-                        transition: transform 0.2s ease;
-                    }
-                    .example-card:hover {
-                        transform: scale(1.02);
-                    }
-                    .notes-card {
-                        background: linear-gradient(135deg, #FF6B6B 0%, #FF8E53 100%);
-                        padding: 15px;
-                        border-radius: 12px;
-                        margin: 10px 0;
-                        color: white;
-                        box-shadow: 0 3px 6px rgba(0, 0, 0, 0.1);
-                    }
-                </style>
-            """, unsafe_allow_html=True)
-            
             # Create tabs with fancy headers
             tab1, tab2, tab3, tab4 = st.tabs([
                 "Main Points", 
@@ -416,83 +524,66 @@ def display_tool_result(result_type: str, data: dict):
             ])
             
             with tab1:
-                st.markdown("""
-                    <div class="summary-header">
-                        <h3>Key Points</h3>
-                    </div>
-                """, unsafe_allow_html=True)
-                
-                for i, point in enumerate(data.get("main_points", []), 1):
-                    st.markdown(f"""
-                        <div class="main-point-card">
-                            <strong>{i}.</strong> {point}
-                        </div>
-                    """, unsafe_allow_html=True)
+                st.markdown(html["main_points"], unsafe_allow_html=True)
             
             with tab2:
-                st.markdown("""
-                    <div class="summary-header">
-                        <h3>Detailed Explanations</h3>
-                    </div>
-                """, unsafe_allow_html=True)
-                
-                for concept, explanation in data.get("details", {}).items():
+                st.markdown(html["details_header"], unsafe_allow_html=True)
+                for concept, detail in html["details"].items():
                     with st.expander(f"**{concept}**"):
-                        st.markdown(f"""
-                            <div class="detail-card">
-                                {explanation}
-                            </div>
-                        """, unsafe_allow_html=True)
+                        st.markdown(detail, unsafe_allow_html=True)
             
             with tab3:
-                st.markdown("""
-                    <div class="summary-header">
-                        <h3>Examples</h3>
-                    </div>
-                """, unsafe_allow_html=True)
-                
-                for i, example in enumerate(data.get("examples", []), 1):
-                    st.markdown(f"""
-                        <div class="example-card">
-                            <strong>Example {i}:</strong><br>
-                            {example}
-                        </div>
-                    """, unsafe_allow_html=True)
+                st.markdown(html["examples"], unsafe_allow_html=True)
             
             with tab4:
-                if "additional_notes" in data:
-                    st.markdown("""
-                        <div class="summary-header">
-                            <h3>Additional Notes</h3>
-                        </div>
-                    """, unsafe_allow_html=True)
-                    
-                    st.markdown(f"""
-                        <div class="notes-card">
-                            {data["additional_notes"]}
-                        </div>
-                    """, unsafe_allow_html=True)
+                if html["notes"]:
+                    st.markdown(html["notes"], unsafe_allow_html=True)
     except Exception as e:
         st.error(f"Error displaying tool result: {str(e)}")
 
 
+def play_message(message_id: int):
+    st.session_state.playing_message = message_id
+
+
+def show_earlier_messages():
+    st.session_state.chat_visible += CHAT_PAGE_SIZE
+
+
 def display_chat():
-    """Display chat history with proper formatting"""
-    for message in st.session_state.chat_history:
-        # Skip displaying messages from learning tools as they are handled separately
-        if message.get("metadata", {}).get("query_type") == "learning_tool":
-            continue
-            
+    """Display the most recent page of chat history
+
+    Older messages (and their audio players) are only rendered on request,
+    so a long session does not re-send the whole history on every rerun.
+    """
+    # Skip displaying messages from learning tools as they are handled separately
+    messages = [
+        message for message in st.session_state.chat_history
+        if message.get("metadata", {}).get("query_type") != "learning_tool"
+    ]
+    hidden = len(messages) - st.session_state.chat_visible
+    if hidden > 0:
+        st.button(f"Show earlier messages ({hidden} hidden)", key="show_earlier", on_click=show_earlier_messages)
+        messages = messages[hidden:]
+
+    for message in messages:
         with st.chat_message(message["role"]):
             # Display regular message content
             st.write(message["content"])
 
-            # Display audio if available
-            if message.get("audio_data") is not None:
-                try:
-                    st.audio(message["audio_data"], format="audio/wav")
-                except Exception as e:
-                    st.error(f"Error playing audio: {str(e)}")
+            # Audio is only read from disk once the user asks to play it
+            if message.get("audio_id"):
+                if st.session_state.playing_message == message["id"]:
+                    audio_data = load_audio(message["audio_id"])
+                    if audio_data is None:
+                        st.caption("Audio is no longer available.")
+                    else:
+                        try:
+                            st.audio(audio_data, format="audio/wav", autoplay=True)
+                        except Exception as e:
+                            st.error(f"Error playing audio: {str(e)}")
+                else:
+                    st.button("Play answer", key=f"play_{message['id']}", on_click=play_message, args=(message["id"],))
             
             # Safely handle metadata
             metadata = message.get("metadata", {})
@@ -516,7 +607,7 @@ def process_user_input(input_text: str, input_type: str = "text", language_code:
             # Handle Learning Tools mode first
             if st.session_state.current_mode == "Learning Tools":
                 logger.info("Using Learning Tools endpoint")
-                response = APIClient.learning_tools_qa(input_text)
+                response = APIClient.learning_tools_qa(input_text, variety=st.session_state.get("tool_variety", False))
                 logger.debug(f"Learning Tools response: {json.dumps(response, indent=2)}")
                 
                 if "tool_result" in response and "tool_used" in response:
@@ -525,6 +616,7 @@ def process_user_input(input_text: str, input_type: str = "text", language_code:
                     # Store the tool result and type in session state
                     st.session_state.current_tool_result = response["tool_result"]
                     st.session_state.current_tool_type = response["tool_used"]
+                    st.session_state.current_tool_key = result_hash(response["tool_result"])
                     
                     
                     # Add the assistant's response to chat history
@@ -540,7 +632,11 @@ def process_user_input(input_text: str, input_type: str = "text", language_code:
                     )
                     
                     # Display tool result and rerun
-                    display_tool_result(response["tool_used"], response["tool_result"])
+                    display_tool_result(
+                        response["tool_used"],
+                        response["tool_result"],
+                        st.session_state.current_tool_key
+                    )
                     return
             else:
                 # Handle other modes (Basic Q&A and Smart Q&A)
@@ -553,14 +649,19 @@ def process_user_input(input_text: str, input_type: str = "text", language_code:
                 audio_data = None
                 if input_type == "voice":
                     try:
-                        response_text = response["answer"][:500]
-                        audio_base64 = text_to_speech(
-                            text=response_text,
+                        # Play the first sentence as soon as it is synthesized
+                        first_segment = st.empty()
+                        segments = []
+                        for segment in stream_speech(
+                            response["answer"],
                             target_language=language_code,
                             speaker="meera"
-                        )
-                        if audio_base64:
-                            audio_data = base64.b64decode(audio_base64)
+                        ):
+                            if not segments:
+                                first_segment.audio(segment, format="audio/wav")
+                            segments.append(segment)
+                        if segments:
+                            audio_data = concatenate_wavs(segments)
                     except Exception as e:
                         st.warning(f"Could not generate audio response: {str(e)}")
                 
@@ -595,6 +696,7 @@ def main():
     
     # Initialize session state
     init_session_state()
+    inject_css()
     
     # Sidebar for PDF upload and mode selection
     with st.sidebar:
@@ -602,20 +704,20 @@ def main():
         
         # Clear chat button
         if st.button("Clear Chat"):
-            st.session_state.chat_history = []
+            st.session_state.chat_history.clear()
+            st.session_state.chat_visible = CHAT_PAGE_SIZE
             st.rerun()
         
         # PDF upload
         uploaded_file = st.file_uploader("Upload PDF", type="pdf")
         if uploaded_file:
-            temp_path = f"temp_{uploaded_file.name}"
-            with open(temp_path, "wb") as f:
-                f.write(uploaded_file.getvalue())
-            
             if st.button("Process PDF"):
                 with st.spinner("Processing PDF..."):
                     try:
-                        APIClient.initialize_system(temp_path)
+                        uploaded_file.seek(0)
+                        job = APIClient.upload_pdf(uploaded_file.name, uploaded_file)
+                        if job["status"] != "already_ingested":
+                            wait_for_ingestion(job["job_id"])
                         st.session_state.pdf_processed = True
                         add_message(
                             "system",
@@ -632,14 +734,26 @@ def main():
                     except Exception as e:
                         st.error(f"Error processing PDF: {str(e)}")
         
+        with st.expander("Voice cache stats"):
+            st.json(cache_stats())
+
+        with st.expander("Session memory"):
+            st.json(st.session_state.chat_history.memory_report())
+
         # Mode selection
         st.session_state.current_mode = st.radio(
             "Select Mode:",
             ["Basic Q&A", "Smart Q&A", "Learning Tools"],
             index=1  # Default to Smart Q&A
         )
+        if st.session_state.current_mode == "Learning Tools":
+            st.checkbox(
+                "Fresh results",
+                key="tool_variety",
+                help="Generate a new set instead of reusing flashcards or problems made earlier for the same topic"
+            )
         if st.session_state.current_mode != st.session_state.last_mode:
-            st.session_state.chat_history = []  # Clear chat history on mode change
+            st.session_state.chat_history.clear()  # Clear chat history on mode change
             st.session_state.last_mode = st.session_state.current_mode
             st.rerun()
 
@@ -649,7 +763,13 @@ def main():
 
     # Display current tool result if it exists
     if st.session_state.current_tool_result and st.session_state.current_tool_type:
-        display_tool_result(st.session_state.current_tool_type, st.session_state.current_tool_result)
+        if st.session_state.current_tool_key is None:
+            st.session_state.current_tool_key = result_hash(st.session_state.current_tool_result)
+        display_tool_result(
+            st.session_state.current_tool_type,
+            st.session_state.current_tool_result,
+            st.session_state.current_tool_key
+        )
 
     
     # Input area
@@ -684,15 +804,12 @@ def main():
                 
             if audio_bytes and audio_bytes != st.session_state.last_processed_audio:
                 st.session_state.last_processed_audio = audio_bytes
-                # Save audio to temporary file
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-                    tmp_file.write(audio_bytes)
-                    tmp_path = tmp_file.name
-                
+
                 try:
                     with st.spinner("Transcribing audio..."):
-                        transcribed_text, language_code = transcribe_and_translate_audio(
-                            audio_file_path=tmp_path,
+                        # In memory: silence is cut and pauses are transcribed in parallel
+                        transcribed_text, language_code = transcribe_recording(
+                            audio_bytes,
                             prompt="This is a question about physics concepts"
                         )
 
@@ -704,9 +821,6 @@ def main():
                             
                 except Exception as e:
                     st.error(f"Error processing audio: {str(e)}")
-                finally:
-                    if os.path.exists(tmp_path):
-                        os.remove(tmp_path)
         else:
             # For other modes, only show text input
             question = st.chat_input("Type your question here...")
@@ -0,0 +1,32 @@
+import os
+
+import pytest
+
+from utils.filter.clean_text import split_sections
+from utils.filter.extract_text_pdf import extract_and_save_text
+
+PDF_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ncert_ch11.pdf")
+
+@pytest.fixture(scope="module")
+def ncert_text(tmp_path_factory):
+    return extract_and_save_text(PDF_PATH, str(tmp_path_factory.mktemp("extracted")))
+
+def test_ncert_ch11_headings(ncert_text):
+    headings = [f"{section['number']} {section['title']}" for section in split_sections(ncert_text)]
+    assert headings == [
+        "11.1 Production of Sound",
+        "11.2 Propagation of Sound",
+        "11.2.1 SOUND WAVES ARE LONGITUDINAL WAVES",
+        "11.2.2 CHARACTERISTICS OF A SOUND WAVE",
+        "11.3 Reflection of Sound",
+        "11.2.3 SPEED OF SOUND IN DIFFERENT MEDIA",
+        "11.3.1 ECHO",
+        "11.3.2 REVERBERATION",
+        "11.3.3 USES OF MULTIPLE REFLECTION OF SOUND",
+        "11.4 Range of Hearing",
+        "11.5 Applications of Ultrasound",
+    ]
+
+def test_section_text_starts_with_its_heading(ncert_text):
+    for section in split_sections(ncert_text):
+        assert section["text"].startswith(f"{section['number']} ")
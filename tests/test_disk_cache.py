@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+from utils import disk_cache
+from utils.disk_cache import DiskCache
+
+def test_corrupt_entry_is_a_miss_and_removed(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    key = DiskCache.make_key("tool", "flashcards")
+    cache.set(key, {"cards": []})
+    with open(cache._path(key), 'wb') as f:
+        f.write(b'{"cards": [')
+
+    assert cache.get(key) is None
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert not os.path.exists(cache._path(key))
+
+def test_hit_survives_eviction_after_the_read(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path), max_bytes=1 << 20)
+    key = DiskCache.make_key("translation", "echo")
+    cache.set(key, "प्रतिध्वनि")
+
+    def evicted(path):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(disk_cache.os, "utime", evicted)
+    assert cache.get(key) == "प्रतिध्वनि"
+    assert cache.hits == 1
+
+def test_failed_write_leaves_no_temp_file(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path))
+
+    def disk_full(src, dst):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(disk_cache.os, "replace", disk_full)
+    with pytest.raises(OSError):
+        cache.set_bytes(DiskCache.make_key("tts", "echo"), b"RIFF")
+    assert [name for _, _, files in os.walk(tmp_path) for name in files] == []
@@ -0,0 +1,78 @@
+import threading
+import time
+from contextlib import nullcontext
+
+from utils import ingestion_jobs
+from utils.disk_cache import DiskCache
+from utils.ingestion_jobs import IngestionJobManager
+
+class FakeProcessor:
+    """Stands in for PDFProcessor: reports progress, then succeeds or fails"""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.current_source_hash = "hash"
+        self.current_sections = []
+
+    def ingest_lock(self):
+        return nullcontext()
+
+    def process_pdf(self, pdf_path, progress=None):
+        progress("embed", 1, 2)
+        if self.error:
+            raise Exception(self.error)
+
+def wait_finished(manager, job_id, timeout=10):
+    deadline = time.time() + timeout
+    while manager.get(job_id).finished_at is None:
+        assert time.time() < deadline, "job did not finish"
+        time.sleep(0.01)
+
+def other_worker(store):
+    """A manager in another process: it shares the store but never ran the job"""
+    return IngestionJobManager(FakeProcessor(), precompute_sections=False, job_store=store)
+
+def test_completed_status_reaches_the_store(tmp_path):
+    store = DiskCache(str(tmp_path / "jobs"))
+    manager = IngestionJobManager(FakeProcessor(), precompute_sections=False, job_store=store)
+    job = manager.submit("book.pdf")
+    wait_finished(manager, job.job_id)
+
+    status = other_worker(store).status(job.job_id)
+    assert status["status"] == "completed"
+    assert status["elapsed_seconds"] is not None
+
+def test_failed_status_reaches_the_store(tmp_path):
+    store = DiskCache(str(tmp_path / "jobs"))
+    manager = IngestionJobManager(FakeProcessor(error="bad pdf"), precompute_sections=False, job_store=store)
+    job = manager.submit("book.pdf")
+    wait_finished(manager, job.job_id)
+
+    status = other_worker(store).status(job.job_id)
+    assert status["status"] == "failed"
+    assert status["error"] == "bad pdf"
+
+def test_unknown_job_without_store(tmp_path):
+    assert IngestionJobManager(FakeProcessor(), precompute_sections=False).status("missing") is None
+
+def test_precompute_progress_reaches_the_store(tmp_path, monkeypatch):
+    halfway, release = threading.Event(), threading.Event()
+
+    def precompute(source_hash, sections, generate, progress):
+        progress(0, 0, 3)
+        progress(1, 0, 3)
+        halfway.set()
+        release.wait(10)
+        progress(3, 0, 3)
+
+    monkeypatch.setattr(ingestion_jobs, "ActionHandler", lambda *args, **kwargs: None)
+    monkeypatch.setattr(ingestion_jobs, "precompute", precompute)
+    store = DiskCache(str(tmp_path / "jobs"))
+    manager = IngestionJobManager(FakeProcessor(), precompute_sections=True, job_store=store)
+    job = manager.submit("book.pdf")
+    assert halfway.wait(10)
+
+    status = other_worker(store).status(job.job_id)
+    assert status["status"] == "completed"
+    assert (status["precompute"]["status"], status["precompute"]["done"]) == ("running", 1)
+    release.set()
@@ -0,0 +1,36 @@
+import os
+
+import chromadb
+import pytest
+
+from utils.embeddings.index_manifest import build_manifest, write_manifest
+from utils.embeddings.store_embeddings import get_embedding_function
+from utils.pdf_processor import PDFProcessor, file_sha256
+
+@pytest.fixture
+def persisted_build(tmp_path, monkeypatch):
+    """A complete build of book.pdf under vector_db/, as left by an earlier server"""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    pdf_path = tmp_path / "book.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 first edition")
+    db_path = tmp_path / "vector_db" / "build_1"
+    client = chromadb.Client(chromadb.Settings(is_persistent=True, persist_directory=str(db_path)))
+    collection = client.create_collection(name="pdf_qa_collection", embedding_function=get_embedding_function())
+    collection.add(ids=["0", "1"], documents=["echo", "sound"], embeddings=[[0.0, 1.0], [1.0, 0.0]])
+    write_manifest(str(db_path), build_manifest(file_sha256(str(pdf_path)), str(pdf_path), [], 2))
+    return pdf_path
+
+def test_reopens_unchanged_pdf(persisted_build):
+    processor = PDFProcessor(db_root=str(persisted_build.parent / "vector_db"))
+    assert processor.reopen()
+    assert processor.current_source_hash == file_sha256(str(persisted_build))
+
+def test_skips_index_of_changed_pdf(persisted_build):
+    persisted_build.write_bytes(b"%PDF-1.4 second edition")
+    processor = PDFProcessor(db_root=str(persisted_build.parent / "vector_db"))
+    assert not processor.reopen()
+    assert processor.collection is None
+
+def test_reopens_when_pdf_is_gone(persisted_build):
+    os.remove(persisted_build)
+    assert PDFProcessor(db_root=str(persisted_build.parent / "vector_db")).reopen()
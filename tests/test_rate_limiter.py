@@ -0,0 +1,51 @@
+import asyncio
+import threading
+
+import pytest
+
+from utils.rate_limiter import RateLimiter, parse_limits
+
+def test_cancelled_waiter_leaves_the_queue():
+    limiter = RateLimiter(rpm=60, tpm=0)
+
+    async def scenario():
+        limiter.back_off(0.3)
+        first = asyncio.create_task(limiter.acquire_async("interactive", 1))
+        second = asyncio.create_task(limiter.acquire_async("ingestion", 1))
+        await asyncio.sleep(0.05)
+        assert limiter.waiting() == 2
+        first.cancel()
+        await asyncio.sleep(0.05)
+        assert limiter.waiting() == 1
+        await asyncio.wait_for(second, 2)
+
+    asyncio.run(scenario())
+    assert limiter.waiting() == 0
+    assert limiter.requests.wait_time(59) == 0  # only the granted call was charged
+
+def test_threads_and_coroutines_share_the_queue():
+    limiter = RateLimiter(rpm=60, tpm=0)
+    limiter.back_off(0.2)
+    thread = threading.Thread(target=limiter.acquire, args=("ingestion", 1))
+    thread.start()
+
+    async def interactive():
+        await limiter.acquire_async("interactive", 1)
+        return limiter.waiting()
+
+    assert asyncio.run(interactive()) in (0, 1)
+    thread.join(2)
+    assert not thread.is_alive()
+    assert limiter.waiting() == 0
+
+def test_limits_per_model_and_group():
+    limiters = parse_limits("gpt-4o=500:30000, gpt-4o-mini|gpt-4.1-mini=500:200000,text-embedding-ada-002=3000:0")
+    assert limiters["gpt-4o"] is not limiters["gpt-4o-mini"]
+    assert limiters["gpt-4o-mini"] is limiters["gpt-4.1-mini"]
+    assert limiters["gpt-4o"].tokens.capacity == 30000
+    assert limiters["text-embedding-ada-002"].tokens is None
+    assert parse_limits("") == {}
+
+def test_invalid_limits():
+    with pytest.raises(Exception, match="OPENAI_LIMITS"):
+        parse_limits("gpt-4o=lots")
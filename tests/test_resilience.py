@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from utils import rate_limiter, resilience
+from utils.action_handler import ActionHandler
+from utils.resilience import CircuitBreaker, LLMUnavailable, llm_call
+
+async def never_answers(**kwargs):
+    await asyncio.sleep(3600)
+
+async def answers(**kwargs):
+    return "ok"
+
+@pytest.fixture
+def open_breaker(monkeypatch):
+    breaker = CircuitBreaker(failures=1, reset_seconds=0)
+    breaker.record(False)
+    monkeypatch.setattr(resilience, "breaker", breaker)
+    return breaker
+
+def test_cancelled_trial_frees_the_slot(open_breaker):
+    async def scenario():
+        trial = asyncio.create_task(llm_call("ask", "interactive", never_answers, hedge=False))
+        await asyncio.sleep(0.1)
+        assert open_breaker.admit() is None  # the trial is in flight
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        return await llm_call("ask", "interactive", answers, hedge=False)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert open_breaker.closed
+
+def test_open_breaker_fails_fast(monkeypatch):
+    breaker = CircuitBreaker(failures=1, reset_seconds=60)
+    breaker.record(False)
+    monkeypatch.setattr(resilience, "breaker", breaker)
+    with pytest.raises(LLMUnavailable):
+        asyncio.run(llm_call("ask", "interactive", answers, hedge=False))
+
+def test_exhausted_rate_limit_retries_count_as_failure(monkeypatch):
+    breaker = CircuitBreaker(failures=1, reset_seconds=60)
+    monkeypatch.setattr(resilience, "breaker", breaker)
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+    async def rate_limited(**kwargs):
+        raise openai.RateLimitError("rate limited", response=httpx.Response(429, request=request), body=None)
+
+    monkeypatch.setattr(rate_limiter, "OPENAI_MAX_RETRIES", 0)
+    with pytest.raises(openai.RateLimitError):
+        asyncio.run(llm_call("ask", "interactive", rate_limited, hedge=False))
+    assert not breaker.closed
+
+def test_practice_problems_let_breaker_503_through(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    handler = ActionHandler()
+
+    async def unavailable(call, **kwargs):
+        raise LLMUnavailable("LLM upstream is failing")
+
+    monkeypatch.setattr(handler, "_chat", unavailable)
+    with pytest.raises(LLMUnavailable):
+        asyncio.run(handler._generate_practice_problems({"topic": "echo", "difficulty": "easy"}, "context"))
@@ -0,0 +1,34 @@
+import pytest
+
+from utils import section_materials
+from utils.section_materials import find_material
+
+SECTIONS = [
+    {"number": "11.1", "title": "Production of Sound"},
+    {"number": "11.2.1", "title": "SOUND WAVES ARE LONGITUDINAL WAVES"},
+    {"number": "11.3.1", "title": "ECHO"},
+]
+
+@pytest.fixture(autouse=True)
+def precomputed(monkeypatch):
+    materials = {f"{s['number']} {s['title']}/create_flashcards": {"flashcards": s["title"]} for s in SECTIONS}
+    monkeypatch.setattr(section_materials, "_stores", {"hash": {"sections": SECTIONS, "materials": materials}})
+
+def flashcards(topic):
+    return find_material("hash", "create_flashcards", {"concept": topic})
+
+@pytest.mark.parametrize("topic", ["sound", "waves", "sound waves", "reflection of sound"])
+def test_broad_topic_is_generated(topic):
+    assert flashcards(topic) is None
+
+@pytest.mark.parametrize("topic, title", [
+    ("Production of Sound", "Production of Sound"),
+    ("production of sounds", "Production of Sound"),
+    ("the echo section", "ECHO"),
+    ("sound waves are longitudinal waves", "SOUND WAVES ARE LONGITUDINAL WAVES"),
+])
+def test_section_topic_is_served(topic, title):
+    assert flashcards(topic) == {"flashcards": title}
+
+def test_other_card_count_is_generated():
+    assert find_material("hash", "create_flashcards", {"concept": "echo", "num_cards": 10}) is None
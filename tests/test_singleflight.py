@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from utils.singleflight import SingleFlight
+
+N = 10
+
+class Upstream:
+    """Counts calls; answers after a short delay so the callers overlap"""
+
+    def __init__(self, error=None):
+        self.calls = 0
+        self.error = error
+
+    async def answer(self):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        if self.error:
+            raise Exception(self.error)
+        return {"answer": "an echo is a reflected sound"}
+
+    async def events(self):
+        self.calls += 1
+        for i in range(5):
+            await asyncio.sleep(0.01)
+            yield i
+        if self.error:
+            raise Exception(self.error)
+
+async def collect(stream):
+    return [event async for event in stream]
+
+def test_do_calls_upstream_once():
+    upstream, flight = Upstream(), SingleFlight("test")
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("q", upstream.answer) for _ in range(N)))
+
+    assert asyncio.run(scenario()) == [{"answer": "an echo is a reflected sound"}] * N
+    assert upstream.calls == 1
+    assert flight.in_flight() == 0
+
+def test_do_error_reaches_every_caller():
+    upstream, flight = Upstream(error="upstream down"), SingleFlight("test")
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("q", upstream.answer) for _ in range(N)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert [str(result) for result in results] == ["upstream down"] * N
+    assert upstream.calls == 1
+
+def test_stream_calls_upstream_once():
+    upstream, flight = Upstream(), SingleFlight("test")
+
+    async def scenario():
+        streams = [flight.stream("q", upstream.events) for _ in range(N)]
+        return await asyncio.gather(*(collect(stream) for stream in streams))
+
+    assert asyncio.run(scenario()) == [[0, 1, 2, 3, 4]] * N
+    assert upstream.calls == 1
+
+def test_late_subscriber_replays_the_stream():
+    upstream, flight = Upstream(), SingleFlight("test")
+
+    async def scenario():
+        leader = asyncio.create_task(collect(flight.stream("q", upstream.events)))
+        await asyncio.sleep(0.03)
+        follower = await collect(flight.stream("q", upstream.events))
+        return await leader, follower
+
+    assert asyncio.run(scenario()) == ([0, 1, 2, 3, 4], [0, 1, 2, 3, 4])
+    assert upstream.calls == 1
+
+def test_stream_error_reaches_every_subscriber():
+    upstream, flight = Upstream(error="upstream down"), SingleFlight("test")
+
+    async def scenario():
+        streams = [flight.stream("q", upstream.events) for _ in range(N)]
+        return await asyncio.gather(*(collect(stream) for stream in streams), return_exceptions=True)
+
+    assert [str(result) for result in asyncio.run(scenario())] == ["upstream down"] * N
+    assert upstream.calls == 1
+
+def test_subscriber_leaving_before_others_start_keeps_the_stream():
+    upstream, flight = Upstream(), SingleFlight("test")
+
+    async def scenario():
+        leader = flight.stream("q", upstream.events)  # response not started yet
+        follower = flight.stream("q", upstream.events)
+        await follower.__anext__()
+        await follower.aclose()  # client gone
+        return await collect(leader)
+
+    assert asyncio.run(scenario()) == [0, 1, 2, 3, 4]
+    assert upstream.calls == 1
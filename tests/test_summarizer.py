@@ -0,0 +1,12 @@
+import pytest
+
+from utils.summarizer import is_whole_document
+
+@pytest.mark.parametrize("topic", ["the whole chapter", "this PDF", "entire document", "the full lesson", "everything", "All of it"])
+def test_whole_document_topics(topic):
+    assert is_whole_document(topic)
+
+@pytest.mark.parametrize("topic", ["all forces acting on a body", "everything about echoes", "whole numbers",
+                                   "entire surface of a sphere", None])
+def test_concept_topics(topic):
+    assert not is_whole_document(topic)
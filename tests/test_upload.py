@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    import main
+
+    monkeypatch.setattr(main, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(main, "MAX_UPLOAD_BYTES", 1024 * 1024)
+    monkeypatch.setattr(main.ingestion_jobs, "submit", lambda pdf_path, source_hash=None: type(
+        "Job", (), {"status": "queued", "job_id": "job"})())
+    return TestClient(main.app)
+
+def test_upload_within_limit(client):
+    response = client.post("/upload", files={"file": ("book.pdf", b"%PDF-1.4 " * 100)})
+    assert response.status_code == 200
+    assert response.json()["job_id"] == "job"
+
+def test_oversized_content_length_is_refused_unread(client):
+    response = client.post("/upload", content=b"",
+                           headers={"content-type": "multipart/form-data; boundary=x", "content-length": str(5 << 20)})
+    assert response.status_code == 413
+
+def test_oversized_stream_stops_being_read(client):
+    import main
+
+    sent = []
+
+    class Upload:
+        async def stream(self):
+            for _ in range(40):
+                sent.append(1)
+                yield b"%" * (256 * 1024)
+
+    async def read_all():
+        return [chunk async for chunk in main.limited_body(Upload(), 1024 * 1024)]
+
+    with pytest.raises(HTTPException) as refused:
+        asyncio.run(read_all())
+    assert refused.value.status_code == 413
+    assert len(sent) == 5  # the chunk that went past 1 MB is the last one read
+
+def test_missing_file_field(client):
+    assert client.post("/upload", data={"pdf": "book"}).status_code == 400
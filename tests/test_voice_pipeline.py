@@ -0,0 +1,28 @@
+import asyncio
+
+import pytest
+
+from utils import voice_pipeline
+from utils.voice_pipeline import VoicePipeline
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    return VoicePipeline()
+
+async def events(pipeline, **kwargs):
+    return [event async for event in pipeline.run(None, **kwargs)]
+
+def test_stt_failure_is_an_error_event(pipeline, monkeypatch):
+    def timeout(audio_bytes, prompt):
+        raise Exception("STT timed out")
+
+    monkeypatch.setattr(voice_pipeline, "transcribe_recording", timeout)
+    assert asyncio.run(events(pipeline, audio_bytes=b"wav")) == [{"type": "error", "detail": "STT timed out"}]
+
+def test_retrieval_failure_is_an_error_event(pipeline, monkeypatch):
+    def chroma_down(question, collection):
+        raise Exception("collection unavailable")
+
+    monkeypatch.setattr(voice_pipeline, "query_similar_chunks", chroma_down)
+    assert asyncio.run(events(pipeline, question="What is an echo?")) == [{"type": "error", "detail": "collection unavailable"}]
@@ -1,12 +1,26 @@
 from typing import Dict, Any, Optional
-from openai import OpenAI
+from openai import AsyncOpenAI
 import json
 from pydantic import BaseModel
 
+from utils.metrics import TOOL_CACHE_REQUESTS, stage_timer
+from utils.resilience import LLMUnavailable, llm_call
+from utils.prompts import (
+    CONCEPT_MAP_SYSTEM, FLASHCARDS_SYSTEM, PRACTICE_SYSTEM, SUMMARY_SYSTEM, TOOL_RESPONSE_SYSTEM,
+    build_messages, record_usage, tool_analysis_system, tool_response_user, tool_user
+)
+from utils.section_materials import find_material
+from utils.summarizer import Summarizer, is_whole_document
+from utils.tool_cache import get_tool_result, set_tool_result, tool_key
+from utils.tracing import current_request_id, set_attribute
+
 class ActionHandler:
-    def __init__(self, pdf_processor=None):
-        self.client = OpenAI()
+    def __init__(self, pdf_processor=None, priority: str = "tool"):
+        self.client = AsyncOpenAI(max_retries=0)  # bound to the event loop that first uses it
         self.pdf_processor = pdf_processor
+        self.priority = priority  # rate-limiter class of every call made by this handler
+        self.tool_model = "gpt-4o"
+        self.summarizer = Summarizer(self._chat, model=self.tool_model)
         
         # Define tool schemas for analysis
         self.tool_schemas = {
@@ -43,45 +57,69 @@ class ActionHandler:
                 }
             }
         }
+        self.analysis_system = tool_analysis_system(self.tool_schemas)
+
+    async def _chat(self, call: str, **kwargs):
+        """Chat completion under the call's deadline, hedged when slow (utils.resilience)"""
+        response = await llm_call(call, self.priority, self.client.chat.completions.create, **kwargs)
+        record_usage(call, response)
+        return response
 
+    @stage_timer("tool_analysis")
     async def analyze_query_for_tools(self, query: str) -> Dict[str, Any]:
         """Analyze if the query would benefit from using a learning tool"""
         try:
-            prompt = f"""Analyze this query to determine if a learning tool would be helpful.It is not neccessary that every query needs learning tool hence respond accordingly.
-            Query: {query}
-            
-            Available tools:
-            {json.dumps(self.tool_schemas, indent=2)}
-            
-            Respond in JSON format with:
-            - should_use_tool (boolean)
-            - tool (string, name of tool if should_use_tool is true)
-            - parameters (object with required parameters if should_use_tool is true)
-            - confidence (float between 0 and 1)
-            - reasoning (string explaining the decision)
-            """
-            
-            response = self.client.chat.completions.create(
+            response = await self._chat(
+                "tool_analysis",
                 model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "You are a learning assistant that analyzes queries for potential tool usage."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=build_messages("tool_analysis", self.analysis_system, f"Query: {query}"),
                 response_format={ "type": "json_object" }
             )
             
-            return json.loads(response.choices[0].message.content)
+            analysis = json.loads(response.choices[0].message.content)
+            set_attribute("tool", analysis.get("tool") if analysis.get("should_use_tool") else None)
+            return analysis
             
         except Exception as e:
-            print(f"Error in analyze_query_for_tools: {str(e)}")
+            print(f"[{current_request_id()}] Error in analyze_query_for_tools: {str(e)}")
             return {
                 "should_use_tool": False,
                 "confidence": 0.0,
                 "reasoning": f"Error during analysis: {str(e)}"
             }
 
-    async def execute_action(self, tool: str, parameters: Dict[str, Any], context: str) -> Dict[str, Any]:
-        """Execute the specified tool action"""
+    @stage_timer("tool_execution")
+    async def execute_action(self, tool: str, parameters: Dict[str, Any], context: str, variety: bool = False) -> Dict[str, Any]:
+        """Execute the specified tool action, reusing a stored result when possible
+
+        Materials precomputed for a matching section come first, then the
+        tool cache. variety=True skips both for users who want a fresh set;
+        the new result still replaces the cached one.
+        """
+        set_attribute("tool", tool)
+        source_hash = self.pdf_processor.current_source_hash if self.pdf_processor else None
+        key = tool_key(tool, parameters, context, self.tool_model, source_hash)
+        if variety:
+            TOOL_CACHE_REQUESTS.inc(tool=tool, result="bypass")
+        else:
+            material = find_material(source_hash, tool, parameters)
+            if material is not None:
+                TOOL_CACHE_REQUESTS.inc(tool=tool, result="precomputed")
+                set_attribute("tool_cache_hit", True)
+                return material
+            cached = get_tool_result(tool, key)
+            set_attribute("tool_cache_hit", cached is not None)
+            if cached is not None:
+                return cached
+            
+        result = await self.run_tool(tool, parameters, context)
+        print("result from tool functions is ", result )
+        if "error" not in result:
+            set_tool_result(key, result)
+        return result
+
+    async def run_tool(self, tool: str, parameters: Dict[str, Any], context: str) -> Dict[str, Any]:
+        """Generate a tool result with the model, without any caching"""
         tool_functions = {
             "create_flashcards": self._create_flashcards,
             "generate_practice": self._generate_practice_problems,
@@ -91,54 +129,26 @@ class ActionHandler:
         
         if tool not in tool_functions:
             raise ValueError(f"Unknown tool: {tool}")
-            
-        result = await tool_functions[tool](parameters, context)
-        print("result from tool functions is ", result )
-        return result
+        return await tool_functions[tool](parameters, context)
 
+    @stage_timer("tool_response")
     async def generate_tool_response(self, query: str, tool_result: Dict[str, Any], tool: str) -> str:
         """Generate a natural language response incorporating the tool result"""
-        prompt = f"""Generate a helpful response to the user's query that incorporates the tool results.
-        Query: {query}
-        Tool Used: {tool}
-        Tool Results: {json.dumps(tool_result, indent=2)}
-        
-        Provide a natural, conversational response that:
-        1. Acknowledges the user's question
-        2. Explains what was created/generated
-        3. Guides them on how to use the results
-        """
-        
-        response = self.client.chat.completions.create(
+        response = await self._chat(
+            "tool_response",
             model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a helpful learning assistant."},
-                {"role": "user", "content": prompt}
-            ]
+            messages=build_messages("tool_response", TOOL_RESPONSE_SYSTEM, tool_response_user(query, tool, tool_result))
         )
         
         return response.choices[0].message.content
 
     async def _create_flashcards(self, parameters: Dict[str, Any], context: str) -> Dict[str, Any]:
         """Create flashcards from the content"""
-        prompt = f"""Create flashcards for learning about {parameters.get('concept')}.
-        Use this content as reference: {context}
-        
-        Generate {parameters.get('num_cards', 5)} flashcards in this JSON format:
-        {{
-            "flashcards": [
-                {{"front": "question/term", "back": "answer/definition"}}
-            ]
-        }}
-        
-        Make the cards clear, concise, and focused on key concepts."""
-        
-        response = self.client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are an expert at creating educational flashcards."},
-                {"role": "user", "content": prompt}
-            ],
+        request = f"Create {parameters.get('num_cards', 5)} flashcards for learning about {parameters.get('concept')}."
+        response = await self._chat(
+            "create_flashcards",
+            model=self.tool_model,
+            messages=build_messages("create_flashcards", FLASHCARDS_SYSTEM, tool_user(request, context)),
             response_format={ "type": "json_object" }
         )
         
@@ -148,27 +158,11 @@ class ActionHandler:
        
         """Generate practice problems with solutions"""
         try:
-            prompt = f"""Create practice problems about {parameters.get('topic')} at {parameters.get('difficulty')} level.
-            Use this content as reference: {context}
-            
-            Generate problems in this JSON format:
-            {{
-                "problems": [
-                    {{
-                        "question": "problem statement",
-                        "solution": "step-by-step solution",
-                        "final_answer": "the answer",
-                        "explanation": "explanation of concepts used"
-                    }}
-                ]
-            }}"""
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "You are an expert at creating educational practice problems."},
-                    {"role": "user", "content": prompt}
-                ],
+            request = f"Create practice problems about {parameters.get('topic')} at {parameters.get('difficulty')} level."
+            response = await self._chat(
+                "generate_practice",
+                model=self.tool_model,
+                messages=build_messages("generate_practice", PRACTICE_SYSTEM, tool_user(request, context)),
                 response_format={ "type": "json_object" }
             )
             
@@ -176,61 +170,49 @@ class ActionHandler:
             return json.loads(response.choices[0].message.content)
             
         except json.JSONDecodeError as e:
-            print(f"JSON parsing error: {str(e)}")
+            print(f"[{current_request_id()}] JSON parsing error: {str(e)}")
             return {"error": "Failed to parse response", "details": str(e)}
+        except LLMUnavailable:
+            raise  # answered with 503 and Retry-After, like every other tool
         except Exception as e:
-            print(f"Error generating practice problems: {str(e)}")
+            print(f"[{current_request_id()}] Error generating practice problems: {str(e)}")
             return {"error": "Failed to generate practice problems", "details": str(e)}
         
     async def _create_concept_map(self, parameters: Dict[str, Any], context: str) -> Dict[str, Any]:
         """Create a concept map showing relationships"""
-        prompt = f"""Create a concept map centered on {parameters.get('central_concept')}.
-        Use this content as reference: {context}
-        
-        Generate the concept map in this JSON format:
-        {{
-            "central_concept": "main topic",
-            "connections": [
-                {{
-                    "concept": "related concept",
-                    "relationship": "how it relates",
-                    "sub_concepts": ["more specific ideas"]
-                }}
-            ]
-        }}"""
-        
-        response = self.client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are an expert at creating concept maps."},
-                {"role": "user", "content": prompt}
-            ],
+        request = f"Create a concept map centered on {parameters.get('central_concept')}."
+        response = await self._chat(
+            "create_concept_map",
+            model=self.tool_model,
+            messages=build_messages("create_concept_map", CONCEPT_MAP_SYSTEM, tool_user(request, context)),
             response_format={ "type": "json_object" }
         )
         
         return json.loads(response.choices[0].message.content)
 
+    def _document_sections(self):
+        """Sections of the live document, or its chunks in groups when none were detected"""
+        sections = self.pdf_processor.current_sections
+        if sections:
+            return sections
+        chunks = self.pdf_processor.collection.get(include=["documents"])["documents"]
+        return [{"title": f"Part {i // 20 + 1}", "text": " ".join(chunks[i:i + 20])} for i in range(0, len(chunks), 20)]
+
     async def _generate_summary(self, parameters: Dict[str, Any], context: str) -> Dict[str, Any]:
-        """Generate a structured summary"""
-        prompt = f"""Create a {parameters.get('format', 'detailed')} summary about {parameters.get('topic')}.
-        Use this content as reference: {context}
-        
-        Generate the summary in this JSON format:
-        {{
-            "main_points": ["key ideas"],
-            "details": {{
-                "concept": "explanation"
-            }},
-            "examples": ["relevant examples"],
-            "additional_notes": "any important considerations"
-        }}"""
-        
-        response = self.client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are an expert at creating educational summaries."},
-                {"role": "user", "content": prompt}
-            ],
+        """Generate a structured summary
+
+        Whole-document topics ("summarize the chapter") are summarized
+        map-reduce over every section instead of the single retrieved chunk.
+        """
+        if self.pdf_processor is not None and self.pdf_processor.collection is not None \
+                and is_whole_document(parameters.get('topic')):
+            return await self.summarizer.summarize(self._document_sections(), parameters.get('format', 'detailed'))
+
+        request = f"Create a {parameters.get('format', 'detailed')} summary about {parameters.get('topic')}."
+        response = await self._chat(
+            "generate_summary",
+            model=self.tool_model,
+            messages=build_messages("generate_summary", SUMMARY_SYSTEM, tool_user(request, context)),
             response_format={ "type": "json_object" }
         )
         
@@ -0,0 +1,75 @@
+import hashlib
+import itertools
+import json
+import os
+from collections import deque
+from typing import Any, Dict, Iterator, Optional
+
+from utils.disk_cache import DiskCache
+
+CHAT_HISTORY_MAX_MESSAGES = int(os.getenv("CHAT_HISTORY_MAX_MESSAGES", "200"))
+CHAT_AUDIO_DIR = os.getenv("CHAT_AUDIO_DIR", ".cache/chat_audio")
+CHAT_AUDIO_CACHE_MB = int(os.getenv("CHAT_AUDIO_CACHE_MB", "1000"))
+
+# Shared by every session on this server; least recently played clips are evicted first
+audio_store = DiskCache(CHAT_AUDIO_DIR, max_bytes=CHAT_AUDIO_CACHE_MB * 1024 * 1024)
+
+def store_audio(audio_data: bytes) -> str:
+    """Write an audio clip to the shared store and return its ID"""
+    audio_id = hashlib.sha256(audio_data).hexdigest()
+    if audio_store.bytes_size(audio_id) is None:
+        audio_store.set_bytes(audio_id, audio_data)
+    return audio_id
+
+def load_audio(audio_id: str) -> Optional[bytes]:
+    """Read a clip back, or None if it has been evicted"""
+    return audio_store.get_bytes(audio_id)
+
+class ChatHistory:
+    """Chat messages of one session, capped at max_messages
+
+    The oldest messages are dropped once the cap is reached. Audio is kept
+    out of the messages: add() stores it in the shared audio_store and the
+    message only carries its audio_id.
+    """
+
+    def __init__(self, max_messages: int = CHAT_HISTORY_MAX_MESSAGES):
+        self.max_messages = max_messages
+        self.dropped = 0
+        self._messages: deque = deque(maxlen=max_messages)
+        self._ids = itertools.count()
+
+    def add(self, message: Dict[str, Any], audio_data: Optional[bytes] = None) -> Dict[str, Any]:
+        message = dict(message, id=next(self._ids), audio_id=store_audio(audio_data) if audio_data else None)
+        if len(self._messages) == self.max_messages:
+            self.dropped += 1
+        self._messages.append(message)
+        return message
+
+    def clear(self):
+        self._messages.clear()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._messages)
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Approximate memory held by this session and disk used by its audio"""
+        text_bytes = sum(
+            len(message["content"].encode("utf-8")) + len(json.dumps(message.get("metadata") or {}))
+            for message in self._messages
+        )
+        audio_ids = {message["audio_id"] for message in self._messages if message.get("audio_id")}
+        sizes = [audio_store.bytes_size(audio_id) for audio_id in audio_ids]
+        return {
+            "messages": len(self._messages),
+            "max_messages": self.max_messages,
+            "dropped_messages": self.dropped,
+            "text_bytes": text_bytes,
+            "audio_clips": len(audio_ids),
+            "audio_clips_evicted": sum(1 for size in sizes if size is None),
+            "audio_bytes_on_disk": sum(size for size in sizes if size),
+            "audio_store": audio_store.stats()
+        }
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Optional
+
+class DiskCache:
+    """Content-addressed cache stored as one file per key
+
+    Values are JSON (get/set) or raw bytes (get_bytes/set_bytes). Writes go
+    through a temp file and os.replace, so several processes can share the
+    same directory safely. With max_bytes set, the least recently used
+    entries are evicted once the directory grows past the limit.
+    """
+
+    def __init__(self, directory: str, max_bytes: Optional[int] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._size = self._scan_size()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Hash the given JSON-serializable parts into a cache key"""
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, suffix: str = ".json") -> str:
+        return os.path.join(self.directory, key[:2], f"{key}{suffix}")
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, stat
+
+    def _scan_size(self) -> int:
+        return sum(stat.st_size for _, stat in self._entries())
+
+    def _read(self, path: str, decode: Optional[Callable[[bytes], Any]] = None) -> Optional[Any]:
+        """Entry at path, decoded; a missing or undecodable entry counts as a miss"""
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            value = decode(data) if decode else data
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except ValueError:
+            self._remove(path, len(data))
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        if self.max_bytes:
+            try:
+                os.utime(path)  # mark as recently used
+            except FileNotFoundError:
+                pass  # evicted since the read
+        return value
+
+    def _remove(self, path: str, size: int):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self._size -= size
+
+    def _write(self, path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            try:
+                old_size = os.path.getsize(path)
+            except FileNotFoundError:
+                old_size = 0
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        with self._lock:
+            self._size += len(data) - old_size
+            over_limit = self.max_bytes is not None and self._size > self.max_bytes
+        if over_limit:
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is 90% of max_bytes"""
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime)
+            size = sum(stat.st_size for _, stat in entries)
+            target = int(self.max_bytes * 0.9)
+            for path, stat in entries:
+                if size <= target:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                size -= stat.st_size
+                self.evictions += 1
+            self._size = size
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._read(self._path(key), json.loads)
+
+    def set(self, key: str, value: Any):
+        self._write(self._path(key), json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        return self._read(self._path(key, ".bin"))
+
+    def set_bytes(self, key: str, data: bytes):
+        self._write(self._path(key, ".bin"), data)
+
+    def bytes_size(self, key: str) -> Optional[int]:
+        """Size on disk of a bytes entry, or None if it is not (or no longer) cached"""
+        try:
+            return os.path.getsize(self._path(key, ".bin"))
+        except FileNotFoundError:
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes
+            }
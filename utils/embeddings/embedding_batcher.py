@@ -0,0 +1,55 @@
+from typing import List, Optional
+from openai import OpenAI
+from dotenv import load_dotenv
+
+from utils.disk_cache import DiskCache
+from utils.embeddings.generate_embeddings import EMBEDDING_MODEL
+from utils.rate_limiter import call_openai
+
+load_dotenv()
+
+class EmbeddingBatcher:
+    """Embeds chunks in batched API calls, skipping chunks already in the cache"""
+
+    def __init__(
+        self,
+        model: str = EMBEDDING_MODEL,
+        batch_size: int = 64,
+        cache: Optional[DiskCache] = None
+    ):
+        self.client = OpenAI(max_retries=0)
+        self.model = model
+        self.batch_size = batch_size
+        self.cache = cache
+        self.api_calls = 0
+        self.cache_hits = 0
+        self.embedded = 0
+
+    def embed(self, chunks: List[str]) -> List[List[float]]:
+        """Return one embedding per chunk, in order"""
+        embeddings: List[Optional[List[float]]] = [None] * len(chunks)
+        missing = []
+        for i, chunk in enumerate(chunks):
+            cached = self.cache.get(DiskCache.make_key(self.model, chunk)) if self.cache else None
+            if cached is not None:
+                embeddings[i] = cached
+                self.cache_hits += 1
+            else:
+                missing.append(i)
+
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            response = call_openai(
+                "ingestion",
+                self.client.embeddings.create,
+                model=self.model,
+                input=[chunks[i] for i in batch]
+            )
+            self.api_calls += 1
+            for i, item in zip(batch, sorted(response.data, key=lambda d: d.index)):
+                embeddings[i] = item.embedding
+                if self.cache:
+                    self.cache.set(DiskCache.make_key(self.model, chunks[i]), item.embedding)
+            self.embedded += len(batch)
+
+        return embeddings
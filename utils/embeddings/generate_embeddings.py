@@ -4,32 +4,43 @@ from openai import OpenAI
 import numpy as np
 from dotenv import load_dotenv
 
+from utils.rate_limiter import call_openai
+
 # Load environment variables from .env file
 load_dotenv()
 
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
 def load_chunks(file_path="processed_texts/cleaned_chunks.json"):
     """Load the cleaned text chunks from JSON file"""
     with open(file_path, 'r', encoding='utf-8') as f:
         data = json.load(f)
     return data['chunks']
 
-def generate_embeddings(chunks):
-    """Generate embeddings for each chunk using OpenAI's API"""
+def generate_embeddings(chunks, progress=None):
+    """Generate embeddings for each chunk using OpenAI's API
+
+    If given, progress(done, total) is called after every chunk.
+    """
     try:
-        client = OpenAI()  # Initialize OpenAI client
+        client = OpenAI(max_retries=0)  # Initialize OpenAI client; retries go through the rate limiter
         embeddings = []
         
         print("Generating embeddings...")
         for i, chunk in enumerate(chunks):
             # Get embedding for the chunk
-            response = client.embeddings.create(
-                model="text-embedding-ada-002",
+            response = call_openai(
+                "ingestion",
+                client.embeddings.create,
+                model=EMBEDDING_MODEL,
                 input=chunk
             )
             
             # Extract the embedding vector
             embedding = response.data[0].embedding
             embeddings.append(embedding)
+            if progress:
+                progress(i + 1, len(chunks))
             
             # Print progress
             if (i + 1) % 10 == 0 or i==len(chunks)-1:
@@ -0,0 +1,49 @@
+"""Manifest written next to every persisted index, so a restarted server can reopen it
+
+An index is reused only when it was built by the current chunker
+(CHUNKER_VERSION) and embedding model; after either changes, the PDF has
+to be ingested again. The manifest also carries what the server needs
+besides the vectors: the PDF's source hash and path and its sections.
+"""
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from utils.embeddings.generate_embeddings import EMBEDDING_MODEL
+from utils.filter.clean_text import CHUNKER_VERSION
+
+MANIFEST_FILE = "manifest.json"
+
+def build_manifest(source_hash: str, pdf_path: str, sections: List[Dict[str, Any]], chunks: int) -> Dict[str, Any]:
+    return {
+        "source_hash": source_hash,
+        "pdf_path": pdf_path,
+        "sections": sections,
+        "chunks": chunks,
+        "chunker_version": CHUNKER_VERSION,
+        "embedding_model": EMBEDDING_MODEL,
+        "created_at": time.time(),
+    }
+
+def mismatch(manifest: Dict[str, Any]) -> Optional[str]:
+    """Why an index built with this manifest cannot be served now, or None if it can"""
+    if manifest.get("chunker_version") != CHUNKER_VERSION:
+        return f"chunker version {manifest.get('chunker_version')} (current {CHUNKER_VERSION})"
+    if manifest.get("embedding_model") != EMBEDDING_MODEL:
+        return f"embedding model {manifest.get('embedding_model')} (current {EMBEDDING_MODEL})"
+    return None
+
+def write_manifest(directory: str, manifest: Dict[str, Any]):
+    """Write last, once the index is complete; directories without one are never reopened"""
+    path = os.path.join(directory, MANIFEST_FILE)
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(path + ".tmp", path)
+
+def read_manifest(directory: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
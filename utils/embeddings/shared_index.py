@@ -0,0 +1,143 @@
+"""Chunk index shared by every worker process through memory-mapped files
+
+    SHARED_INDEX=1 gunicorn main:app -k uvicorn.workers.UvicornWorker -w 4 --preload
+
+With several workers, each would otherwise hold its own Chroma collection
+and only the worker that ran the ingestion would have one. With
+SHARED_INDEX=1 the ingesting worker publishes the chunk embeddings as a
+float32 .npy file and the chunks, sections and source hash as JSON, under
+a new version number, then points the VERSION file at it (os.replace, so
+readers never see a half-written index). Before serving a query every
+worker stats VERSION and maps the new files when it changed.
+np.load(mmap_mode="r") maps the matrix read-only, so the workers share one
+copy of it in the page cache.
+
+Search is exact (a matrix-vector product over all chunks, well under a
+millisecond for a textbook's few thousand) and returns the squared-L2
+distances of the default Chroma collection, so relevance thresholds are
+unchanged.
+"""
+import fcntl
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from utils.embeddings.store_embeddings import get_embedding_function
+from utils.metrics import SHARED_INDEX_VERSION
+
+SHARED_INDEX = os.getenv("SHARED_INDEX", "0") == "1"
+SHARED_INDEX_DIR = os.getenv("SHARED_INDEX_DIR", "shared_index")
+
+class MappedCollection:
+    """Read-only, Chroma-compatible view (query/get/count) of one published index version"""
+
+    def __init__(self, version: int, embeddings: np.ndarray, documents: List[str], metadata: Dict[str, Any]):
+        self.version = version
+        self.embeddings = embeddings
+        self.documents = documents
+        self.metadata = metadata
+        self.ids = [f"chunk_{idx}" for idx in range(len(documents))]
+        self._norms = np.einsum("ij,ij->i", embeddings, embeddings)
+        self._embed = get_embedding_function()
+
+    def count(self) -> int:
+        return len(self.documents)
+
+    def get(self, include: Optional[List[str]] = None) -> Dict[str, Any]:
+        return {"ids": list(self.ids), "documents": list(self.documents)}
+
+    def query(self, query_texts: List[str], n_results: int = 10) -> Dict[str, Any]:
+        queries = np.asarray(self._embed(query_texts), dtype=np.float32)
+        n_results = min(n_results, len(self.documents))
+        results = {"ids": [], "documents": [], "distances": [], "metadatas": []}
+        for query in queries:
+            distances = self._norms - 2 * (self.embeddings @ query) + query @ query
+            top = np.argpartition(distances, n_results - 1)[:n_results] if n_results else []
+            top = sorted(top, key=lambda idx: distances[idx])
+            results["ids"].append([self.ids[idx] for idx in top])
+            results["documents"].append([self.documents[idx] for idx in top])
+            results["distances"].append([float(distances[idx]) for idx in top])
+            results["metadatas"].append([{"source": "PDF Document"} for _ in top])
+        return results
+
+class SharedIndex:
+    """Versioned index files in one directory: publish() from the ingesting worker, latest() everywhere"""
+
+    def __init__(self, directory: str = SHARED_INDEX_DIR):
+        self.directory = directory
+        self._loaded: Optional[MappedCollection] = None
+        self._seen_mtime: Optional[int] = None
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def current_version(self) -> Optional[int]:
+        try:
+            with open(self._path("VERSION"), 'r') as f:
+                return int(f.read().strip())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    @contextmanager
+    def ingest_lock(self) -> Iterator[None]:
+        """Hold an exclusive lock across processes, so one worker ingests at a time"""
+        with open(self._path("ingest.lock"), 'w') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def publish(self, embeddings: List[List[float]], chunks: List[str], metadata: Dict[str, Any]) -> int:
+        """Write a new version and make it current; call under ingest_lock()"""
+        version = (self.current_version() or 0) + 1
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        with open(self._path(f"index_{version}.npy.tmp"), 'wb') as f:
+            np.save(f, matrix)
+        os.replace(self._path(f"index_{version}.npy.tmp"), self._path(f"index_{version}.npy"))
+        with open(self._path(f"index_{version}.json.tmp"), 'w', encoding='utf-8') as f:
+            json.dump({"chunks": chunks, "metadata": metadata}, f)
+        os.replace(self._path(f"index_{version}.json.tmp"), self._path(f"index_{version}.json"))
+        with open(self._path("VERSION.tmp"), 'w') as f:
+            f.write(str(version))
+        os.replace(self._path("VERSION.tmp"), self._path("VERSION"))
+        self._remove_before(version - 1)  # the previous version may still be opening in another worker
+        print(f"Published shared index version {version} ({len(chunks)} chunks)")
+        return version
+
+    def _remove_before(self, version: int):
+        for name in os.listdir(self.directory):
+            match = re.fullmatch(r"index_(\d+)\.(npy|json)", name)
+            if match and int(match.group(1)) < version:
+                os.remove(self._path(name))  # workers still mapping it keep their pages until they reload
+
+    def latest(self) -> Optional[MappedCollection]:
+        """The current version, mapped again only when VERSION has changed since the last call"""
+        try:
+            mtime = os.stat(self._path("VERSION")).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime == self._seen_mtime:
+            return self._loaded
+        with self._lock:
+            if mtime != self._seen_mtime:
+                version = self.current_version()
+                if version is not None and (self._loaded is None or self._loaded.version != version):
+                    self._loaded = self._load(version)
+                self._seen_mtime = mtime
+        return self._loaded
+
+    def _load(self, version: int) -> MappedCollection:
+        embeddings = np.load(self._path(f"index_{version}.npy"), mmap_mode="r")
+        with open(self._path(f"index_{version}.json"), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        SHARED_INDEX_VERSION.set(version)
+        print(f"Loaded shared index version {version} ({len(data['chunks'])} chunks)")
+        return MappedCollection(version, embeddings, data["chunks"], data["metadata"])
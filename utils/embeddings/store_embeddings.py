@@ -5,6 +5,11 @@ import shutil
 from chromadb.utils import embedding_functions
 from dotenv import load_dotenv
 
+from utils.embeddings.generate_embeddings import EMBEDDING_MODEL
+from utils.metrics import stage_timer
+from utils.rate_limiter import call_openai
+from utils.tracing import set_attribute
+
 load_dotenv()
 
 def load_embeddings(file_path="processed_texts/embeddings.json"):
@@ -21,10 +26,42 @@ def clear_vector_db(db_path="./vector_db"):
     # Create the directory
     os.makedirs(db_path, exist_ok=True)
 
-def create_chroma_db(collection_name="pdf_qa_collection"):
+class RateLimitedEmbeddingFunction(embedding_functions.OpenAIEmbeddingFunction):
+    """Query embeddings sent through the OpenAI rate limiter of the embedding model"""
+
+    def __call__(self, input):
+        return call_openai("interactive", super().__call__, limit_model=self.model_name, input=input)
+
+def get_embedding_function():
+    """OpenAI embedding function used by every collection"""
+    return RateLimitedEmbeddingFunction(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        model_name=EMBEDDING_MODEL,
+        api_base=os.getenv("OPENAI_BASE_URL")
+    )
+
+def get_or_create_chroma_collection(collection_name="pdf_qa_collection", db_path="./vector_db"):
+    """Open a persistent collection without clearing it, creating it if missing"""
+    os.makedirs(db_path, exist_ok=True)
+    settings = chromadb.Settings(
+        is_persistent=True,
+        persist_directory=db_path
+    )
+    client = chromadb.Client(settings)
+    return client.get_or_create_collection(
+        name=collection_name,
+        embedding_function=get_embedding_function(),
+        metadata={"description": "PDF Question Answering Collection"}
+    )
+
+def open_chroma_collection(db_path, collection_name="pdf_qa_collection"):
+    """Open an existing persistent collection; raises if it is not there"""
+    client = chromadb.Client(chromadb.Settings(is_persistent=True, persist_directory=db_path))
+    return client.get_collection(name=collection_name, embedding_function=get_embedding_function())
+
+def create_chroma_db(collection_name="pdf_qa_collection", db_path="./vector_db"):
     """Initialize ChromaDB and create a collection"""
     # Clear existing database and create directory
-    db_path = "./vector_db"
     clear_vector_db(db_path)
     
     settings = chromadb.Settings(
@@ -35,10 +72,7 @@ def create_chroma_db(collection_name="pdf_qa_collection"):
     
     client = chromadb.Client(settings)
     
-    embedding_function = embedding_functions.OpenAIEmbeddingFunction(
-        api_key=os.getenv("OPENAI_API_KEY"),
-        model_name="text-embedding-ada-002"
-    )
+    embedding_function = get_embedding_function()
     
     # Create new collection
     try:
@@ -55,10 +89,10 @@ def create_chroma_db(collection_name="pdf_qa_collection"):
     
     return collection
 
-def store_embeddings_in_chroma(embeddings_data, collection_name="pdf_qa_collection"):
+def store_embeddings_in_chroma(embeddings_data, collection_name="pdf_qa_collection", db_path="./vector_db"):
     """Store embeddings in ChromaDB"""
     # Create new collection
-    collection = create_chroma_db(collection_name)
+    collection = create_chroma_db(collection_name, db_path)
     
     # Prepare data for insertion
     documents = []  # The text chunks
@@ -83,6 +117,7 @@ def store_embeddings_in_chroma(embeddings_data, collection_name="pdf_qa_collecti
     print(f"Stored {len(documents)} chunks in ChromaDB")
     return collection
 
+@stage_timer("retrieval")
 def query_similar_chunks(query_text, collection, n_results=3, distance_threshold=0.5):
     """
     Query the database for similar chunks
@@ -98,6 +133,8 @@ def query_similar_chunks(query_text, collection, n_results=3, distance_threshold
     if results['distances'] and results['distances'][0]:
         best_distance = results['distances'][0][0]
         is_relevant = best_distance <= distance_threshold
+        set_attribute("retrieval.best_distance", best_distance)
+    set_attribute("retrieval.n_results", n_results)
 
   
     
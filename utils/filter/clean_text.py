@@ -2,7 +2,16 @@ import re
 import json
 import os
 
-def clean_text(file_path):
+# Section headers look like "11.1 Production of Sound" or "11.2 SOUND WAVES"
+SECTION_PATTERN = r'(?=\d+\.\d+\s+[A-Z])'
+# Numbered headings for split_sections, including subsections ("11.2.1 SOUND WAVES"); extraction
+# sometimes drops the space after the number ("11.2Propagation") or runs a page number into it
+HEADING_PATTERN = re.compile(r'(?<![\d.])(\d+)\.(\d+)(?:\.(\d+))?\s*(?=[A-Z])')
+TITLE_STOP_WORDS = {"Activity", "Example", "Fig", "Figure", "Q", "Questions"}
+SENTENCE_STARTS = {"The", "A", "An", "This", "These", "We", "If", "In"}  # end a Title Case heading
+CHUNKER_VERSION = 2  # bump when chunking or section splitting changes; persisted indexes are then rebuilt
+
+def _read_normalized(file_path):
     # Read the text from the file
     with open(file_path, 'r', encoding='utf-8') as file:
         text = file.read()
@@ -10,11 +19,14 @@ def clean_text(file_path):
     # Basic text cleaning
     text = re.sub(r'\d+\|', '', text)  # Remove line numbers
     text = re.sub(r'\s+', ' ', text)  # Replace multiple spaces with single space
-    text = text.strip()
+    return text.strip()
+
+def clean_text(file_path):
+    text = _read_normalized(file_path)
     
     # Split into initial chunks based on section headers
     # Look for patterns like "11.1", "11.2", etc.
-    sections = re.split(r'(?=\d+\.\d+\s+[A-Z])', text)
+    sections = re.split(SECTION_PATTERN, text)
     
     chunks = []
     for section in sections:
@@ -35,6 +47,58 @@ def clean_text(file_path):
     
     return chunks
 
+def _section_title(words):
+    """Heading words after the section number: an ALL-CAPS run or a Title Case phrase"""
+    title = []
+    upper = bool(words) and len(words[0]) > 1 and words[0].isupper()
+    for word in words[:10]:
+        if word in TITLE_STOP_WORDS or not word[0].isalnum() or (title and word.startswith(title[-1])):
+            break  # "Reflection of Sound Sound bounces...": the first sentence repeats the heading
+        if upper and not word.isupper():
+            break
+        if not upper and not word[0].isupper() and word not in ("of", "in", "and", "the", "a", "an", "to", "on"):
+            break
+        if not upper and title and word in SENTENCE_STARTS:
+            break
+        title.append(word)
+    while title and (title[-1].islower() or len(title[-1]) == 1):
+        title.pop()
+    return " ".join(title)
+
+def split_sections(file_path, min_chars=300):
+    """Numbered sections and subsections of the text as {"number", "title", "text"} dicts
+
+    A section runs from its heading to the next numbered heading. Headings
+    without a usable title (worked examples like "11.2 A person clapped...")
+    or sections shorter than min_chars are skipped. Numbers are checked
+    against the last section heading ("11.3"), so a page number run into a
+    subsection heading ("13411.3.1") is dropped. A heading that occurs again
+    (a page extracted twice) adds its text to the first section of that number.
+    """
+    text = _read_normalized(file_path)
+    headings = list(HEADING_PATTERN.finditer(text))
+    sections = []
+    by_number = {}
+    parent = None
+    for i, heading in enumerate(headings):
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(text)
+        number = [part for part in heading.groups() if part]
+        if parent and number[0] != parent[0] and number[0].endswith(parent[0]):
+            number[0] = parent[0]
+        key = ".".join(number)
+        body = text[heading.end():end].strip()
+        title = _section_title(body.split())
+        if len(key) + len(body) + 1 < min_chars or len(title) < 4:
+            continue
+        if len(number) == 2:
+            parent = number
+        if key in by_number:
+            by_number[key]["text"] += " " + body
+            continue
+        by_number[key] = {"number": key, "title": title, "text": f"{key} {body}"}
+        sections.append(by_number[key])
+    return sections
+
 def save_cleaned_chunks(chunks, output_dir="processed_texts"):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
@@ -0,0 +1,198 @@
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from utils.action_handler import ActionHandler
+from utils.disk_cache import DiskCache
+from utils.pdf_processor import PDFProcessor
+from utils.section_materials import PRECOMPUTE_SECTION_TOOLS, precompute
+
+class IngestionJob:
+    """State and progress of a single background PDF ingestion"""
+
+    def __init__(self, pdf_path: str, source_hash: Optional[str] = None):
+        self.job_id = uuid.uuid4().hex
+        self.pdf_path = pdf_path
+        self.source_hash = source_hash
+        self.status = "queued"  # queued -> running -> completed / failed
+        self.stage: Optional[str] = None
+        self.chunks_done = 0
+        self.chunks_total = 0
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.precompute: Optional[Dict[str, Any]] = None  # section materials, after completion
+        self._stage_started_at: Optional[float] = None
+
+    def update(self, stage: str, done: int, total: int):
+        """Progress callback passed to PDFProcessor.process_pdf"""
+        if stage != self.stage:
+            self.stage = stage
+            self._stage_started_at = time.time()
+        self.chunks_done = done
+        self.chunks_total = total
+
+    def throughput(self) -> Optional[float]:
+        """Chunks per second in the current stage"""
+        if not self._stage_started_at or not self.chunks_done:
+            return None
+        elapsed = time.time() - self._stage_started_at
+        return self.chunks_done / elapsed if elapsed > 0 else None
+
+    def eta_seconds(self) -> Optional[float]:
+        """Estimated time left in the current stage"""
+        rate = self.throughput()
+        if rate is None or self.status != "running":
+            return None
+        return max(self.chunks_total - self.chunks_done, 0) / rate
+
+    def to_dict(self) -> Dict[str, Any]:
+        throughput = self.throughput()
+        eta = self.eta_seconds()
+        return {
+            "job_id": self.job_id,
+            "pdf_path": self.pdf_path,
+            "source_hash": self.source_hash,
+            "status": self.status,
+            "stage": self.stage,
+            "chunks_done": self.chunks_done,
+            "chunks_total": self.chunks_total,
+            "throughput_chunks_per_sec": round(throughput, 2) if throughput is not None else None,
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "elapsed_seconds": round((self.finished_at or time.time()) - self.started_at, 1) if self.started_at else None,
+            "error": self.error,
+            "precompute": self.precompute
+        }
+
+class IngestionJobManager:
+    """Runs PDF ingestion on a worker pool so requests return immediately
+
+    A single worker is used by default since each build rewrites the shared
+    extracted_texts/processed_texts directories. With precompute_sections,
+    each completed job is followed by generating per-section learning
+    materials in the background (see utils.section_materials). With a
+    job_store, job state is also written there so any worker process can
+    report on a job another one runs.
+    """
+
+    def __init__(
+        self,
+        pdf_processor: PDFProcessor,
+        max_workers: int = 1,
+        max_jobs: int = 100,
+        precompute_sections: bool = PRECOMPUTE_SECTION_TOOLS,
+        job_store: Optional[DiskCache] = None
+    ):
+        self.pdf_processor = pdf_processor
+        self.precompute_sections = precompute_sections
+        self.job_store = job_store
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+        self._precompute_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="precompute-job")
+        self._action_handler: Optional[ActionHandler] = None
+        self._precompute_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._max_jobs = max_jobs
+        self._lock = threading.Lock()
+
+    def submit(self, pdf_path: str, source_hash: Optional[str] = None) -> IngestionJob:
+        """Queue a PDF for ingestion and return its job
+
+        If a queued or running job already has the same source_hash, that
+        job is returned instead of ingesting the file twice.
+        """
+        with self._lock:
+            if source_hash:
+                for existing in self._jobs.values():
+                    if existing.source_hash == source_hash and existing.status in ("queued", "running"):
+                        return existing
+            job = IngestionJob(pdf_path, source_hash)
+            self._jobs[job.job_id] = job
+            self._prune()
+        self._save(job)
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """to_dict() of a job run by this process, else its last state in the job_store"""
+        job = self.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        return self.job_store.get(job_id) if self.job_store is not None else None
+
+    def _save(self, job: IngestionJob):
+        if self.job_store is not None:
+            self.job_store.set(job.job_id, job.to_dict())
+
+    def _prune(self):
+        """Forget the oldest finished jobs once more than max_jobs are tracked"""
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self._max_jobs:
+                break
+            if self._jobs[job_id].status in ("completed", "failed"):
+                del self._jobs[job_id]
+
+    def _run(self, job: IngestionJob):
+        def progress(stage: str, done: int, total: int):
+            job.update(stage, done, total)
+            self._save(job)
+
+        try:
+            with self.pdf_processor.ingest_lock():
+                job.status = "running"
+                job.started_at = time.time()
+                self._save(job)
+                self.pdf_processor.process_pdf(job.pdf_path, progress=progress)
+            job.status = "completed"
+            if self.precompute_sections:
+                job.precompute = {"status": "queued", "done": 0, "failed": 0, "total": 0}
+                self._precompute_executor.submit(
+                    self._precompute, job, self.pdf_processor.current_source_hash, self.pdf_processor.current_sections
+                )
+        except Exception as e:
+            print(f"Ingestion job {job.job_id} failed: {str(e)}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            self._save(job)  # other workers answer status polls from the store
+
+    def _precompute(self, job: IngestionJob, source_hash: str, sections):
+        """Generate section materials for a completed job, reporting progress on it"""
+        if self._action_handler is None:
+            self._action_handler = ActionHandler(self.pdf_processor, priority="ingestion")
+            # The handler's async OpenAI client is tied to one event loop, so every
+            # precompute worker submits to this one instead of running its own
+            self._precompute_loop = asyncio.new_event_loop()
+            threading.Thread(target=self._precompute_loop.run_forever, name="precompute-loop", daemon=True).start()
+        handler, loop = self._action_handler, self._precompute_loop
+
+        def progress(done: int, failed: int, total: int):
+            job.precompute.update(done=done, failed=failed, total=total)
+            self._save(job)
+
+        job.precompute["status"] = "running"
+        self._save(job)
+        try:
+            precompute(
+                source_hash,
+                sections,
+                lambda tool, parameters, context: asyncio.run_coroutine_threadsafe(
+                    handler.run_tool(tool, parameters, context), loop
+                ).result(),
+                progress=progress
+            )
+            job.precompute["status"] = "completed"
+        except Exception as e:
+            print(f"Section precompute for job {job.job_id} failed: {str(e)}")
+            job.precompute["status"] = "failed"
+        finally:
+            self._save(job)
@@ -0,0 +1,94 @@
+"""Answer tiers for /smart-ask: canned local answers and a model per category
+
+Greetings, thanks, "who are you" and "how do I upload a pdf" need no
+language model. When SmartQueryRouter puts a query in one of those
+categories with at least LOCAL_ANSWER_CONFIDENCE similarity, the closest
+example it matched selects a templated answer and the request returns
+without any API call. Everything else goes to the model configured for
+its category in SMART_ASK_MODELS ("category=model,..."), so small talk the
+templates don't cover still avoids gpt-4o.
+"""
+import os
+from typing import Any, Dict, Optional
+
+LOCAL_ANSWERS = os.getenv("LOCAL_ANSWERS", "1") != "0"
+LOCAL_ANSWER_CONFIDENCE = float(os.getenv("LOCAL_ANSWER_CONFIDENCE", "0.85"))
+
+DEFAULT_MODELS = {
+    "document_query": "gpt-4o",
+    "meta_query": "gpt-4o-mini",
+    "system_query": "gpt-4o-mini",
+    "conversation": "gpt-4o-mini",
+}
+
+def parse_models(value: str) -> Dict[str, str]:
+    models = dict(DEFAULT_MODELS)
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        category, _, model = item.partition("=")
+        if not model:
+            raise Exception(f"Invalid SMART_ASK_MODELS entry: {item}")
+        models[category.strip()] = model.strip()
+    return models
+
+CATEGORY_MODELS = parse_models(os.getenv("SMART_ASK_MODELS", ""))
+
+CAPABILITIES = (
+    "I'm a study assistant for the textbook PDFs you upload. I can answer questions about the "
+    "chapter, explain concepts from it, answer by voice in Indian languages, and in Learning Tools "
+    "mode make flashcards, practice problems, concept maps and summaries."
+)
+
+# (category, words that identify the router example it matched, answer)
+LOCAL_INTENTS = [
+    ("conversation", ("hello", "hi there", "hey", "good morning", "good afternoon", "good evening"),
+     "Hello! Ask me anything about the uploaded chapter, or switch to Learning Tools for "
+     "flashcards, practice problems, concept maps and summaries."),
+    ("conversation", ("thank", "appreciate", "helpful"),
+     "You're welcome! Let me know if you have another question."),
+    ("conversation", ("bye", "see you", "good day", "next time"),
+     "Goodbye, and happy studying!"),
+    ("conversation", ("understand", "got it", "makes sense", "okay", "alright"),
+     "Great. What would you like to look at next?"),
+    ("conversation", ("great", "perfect", "excellent", "well done", "that works"),
+     "Glad that helped! What would you like to study next?"),
+    ("conversation", ("please", "if you could", "would you mind", "sorry", "excuse me"),
+     "Of course. What would you like to know?"),
+    ("meta_query", ("who are you", "yourself", "purpose", "are you an ai", "who created", "what model", "what version"),
+     CAPABILITIES),
+    ("meta_query", ("what can you do", "capabilities", "features", "kind of tasks", "assist", "how do you work", "how smart"),
+     CAPABILITIES),
+    ("meta_query", ("limitations", "images", "code"),
+     "I work from the text of the PDFs you upload, so pictures and diagrams in them aren't read, "
+     "and my answers are only as complete as the chapter."),
+    ("meta_query", ("remember", "memory"),
+     "Each question is answered on its own from the uploaded document. The chat you see is kept "
+     "for this browser session until you press 'Clear Chat'."),
+    ("system_query", ("upload", "import a pdf", "load a document"),
+     "Choose a file under 'Upload PDF' in the sidebar and press 'Process PDF'. Ingestion runs in "
+     "the background; you can ask questions as soon as it finishes. Uploading another PDF replaces "
+     "the current one."),
+    ("system_query", ("mode", "settings", "preferences"),
+     "Pick Basic Q&A, Smart Q&A or Learning Tools under 'Select Mode' in the sidebar. Changing "
+     "the mode starts a new chat."),
+    ("system_query", ("clear", "delete chat", "new chat", "reset"),
+     "Press 'Clear Chat' in the sidebar to start a new conversation."),
+    ("system_query", ("use this", "commands", "guide me", "how does this work"),
+     "Upload a PDF in the sidebar, then type or record a question. Smart Q&A answers from the "
+     "chapter, Basic Q&A also takes voice questions, and Learning Tools makes study materials "
+     "such as 'flashcards on reverberation' or 'practice problems on echo'."),
+]
+
+def local_answer(classification: Dict[str, Any]) -> Optional[str]:
+    """Templated answer for a confidently classified non-document query, or None"""
+    category = classification["category"]
+    if not LOCAL_ANSWERS or category == "document_query" \
+            or classification["confidence"] < LOCAL_ANSWER_CONFIDENCE:
+        return None
+    match = classification.get("match", "").lower()
+    for intent_category, words, answer in LOCAL_INTENTS:
+        if intent_category == category and any(word in match for word in words):
+            return answer
+    return None
+
+def model_for(category: str) -> str:
+    return CATEGORY_MODELS.get(category, CATEGORY_MODELS["document_query"])
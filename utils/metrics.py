@@ -0,0 +1,247 @@
+"""In-process counters and latency histograms, exported in Prometheus text format
+
+    with stage_timer("retrieval"):
+        ...
+
+    @stage_timer("classify")
+    async def classify_query(...):
+        ...
+
+Metrics are kept per process; under several workers each one serves its own
+/metrics. Recording is a dict lookup, a bisect and a lock, so timers can sit
+on every request path (see benchmarks/metrics_overhead.py).
+"""
+import asyncio
+import bisect
+import functools
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from utils import tracing
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple[str, str] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    """Monotonic count per label combination"""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = tuple(map(labels.get, self.label_names))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        key = tuple(map(labels.get, self.label_names))
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, key)} {value}")
+        return lines
+
+class Gauge:
+    """Current value per label combination, moved up and down"""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = tuple(map(labels.get, self.label_names))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str):
+        key = tuple(map(labels.get, self.label_names))
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels: str) -> float:
+        key = tuple(map(labels.get, self.label_names))
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, key)} {value}")
+        return lines
+
+class Histogram:
+    """Bucketed distribution of observed values (seconds) per label combination"""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(map(labels.get, self.label_names))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, errors: Optional[Counter] = None, **labels: str) -> "Timer":
+        return Timer(self, errors, **labels)
+
+    def snapshot(self, **labels: str) -> Optional[Dict[str, float]]:
+        """Count and sum for one label combination, or None if never observed"""
+        key = tuple(map(labels.get, self.label_names))
+        with self._lock:
+            series = self._series.get(key)
+            return {"count": series[2], "sum": series[1]} if series else None
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, ('le', bound))} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, ('le', '+Inf'))} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {count}")
+        return lines
+
+class Timer:
+    """Records elapsed time into a histogram; usable as context manager or decorator
+
+    Decorated coroutine functions are timed until they complete, not until
+    the coroutine object is created. Exceptions are counted in `errors` (if
+    given) and the duration is still recorded. With span_name set, the timed
+    block is also a span of the current request's trace.
+    """
+
+    def __init__(self, histogram: Histogram, errors: Optional[Counter] = None, span_name: Optional[str] = None, **labels: str):
+        self.histogram = histogram
+        self.errors = errors
+        self.span_name = span_name
+        self.labels = labels
+        self._start = 0.0
+        self._span = tracing.NOOP_SPAN
+
+    def __enter__(self) -> "Timer":
+        if self.span_name:
+            self._span = tracing.span(self.span_name)
+            self._span.__enter__()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self._start, **self.labels)
+        if exc_type is not None and self.errors is not None:
+            self.errors.inc(**self.labels)
+        self._span.__exit__(exc_type, exc, tb)
+        return False
+
+    def __call__(self, func):
+        # Each call gets its own Timer so the decorator is safe across threads and tasks
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with Timer(self.histogram, self.errors, self.span_name, **self.labels):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with Timer(self.histogram, self.errors, self.span_name, **self.labels):
+                return func(*args, **kwargs)
+        return wrapper
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+REQUESTS = registry.counter("http_requests_total", "HTTP requests by route and status", ("method", "path", "status"))
+REQUEST_SECONDS = registry.histogram("http_request_duration_seconds", "Time until the response starts", ("method", "path"))
+STAGE_SECONDS = registry.histogram("stage_duration_seconds", "Time spent in each pipeline stage", ("stage",))
+STAGE_ERRORS = registry.counter("stage_errors_total", "Exceptions raised inside a pipeline stage", ("stage",))
+SARVAM_SECONDS = registry.histogram("sarvam_request_duration_seconds", "Sarvam API calls including retries", ("path",))
+SARVAM_ERRORS = registry.counter("sarvam_errors_total", "Sarvam API calls that failed after retries", ("path",))
+TOOL_CACHE_REQUESTS = registry.counter("tool_cache_requests_total", "Learning-tool lookups by result (precomputed, hit, miss, expired, bypass)", ("tool", "result"))
+SUMMARY_STEPS = registry.counter("summary_steps_total", "Map-reduce summary steps by cache result", ("step", "result"))
+PROMPT_TOKENS = registry.histogram("prompt_tokens", "Locally counted prompt tokens per LLM call", ("call",),
+                                   buckets=(64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384))
+LLM_TOKENS = registry.counter("llm_tokens_total", "Provider-reported tokens by kind (prompt, cached, completion)", ("call", "kind"))
+SMART_ASK_ANSWERS = registry.counter("smart_ask_answers_total", "/smart-ask answers by tier (local or the model used) and category", ("tier", "category"))
+SMART_ASK_SECONDS = registry.histogram("smart_ask_answer_seconds", "/smart-ask time to answer, classification included, by tier", ("tier",),
+                                       buckets=(0.001, 0.0025) + DEFAULT_BUCKETS)
+OPENAI_QUEUE_DEPTH = registry.gauge("openai_limiter_queue_depth", "OpenAI calls waiting for rate-limit capacity", ("priority",))
+OPENAI_LIMITER_WAIT = registry.histogram("openai_limiter_wait_seconds", "Time OpenAI calls waited for rate-limit capacity", ("priority",))
+OPENAI_RATE_LIMITED = registry.counter("openai_rate_limited_total", "OpenAI calls answered with 429", ("priority",))
+LLM_HEDGES = registry.counter("llm_hedges_total", "Hedged LLM calls by outcome (won: the hedge answered first, lost: the original did, failed: neither)", ("call", "outcome"))
+LLM_DEADLINE_EXCEEDED = registry.counter("llm_deadline_exceeded_total", "LLM calls that missed their deadline", ("call",))
+LLM_CIRCUIT_OPEN = registry.gauge("llm_circuit_open", "1 while the LLM circuit breaker is open")
+LLM_CIRCUIT_REJECTED = registry.counter("llm_circuit_rejected_total", "LLM calls failed fast by the open circuit breaker", ("call",))
+SHARED_INDEX_VERSION = registry.gauge("shared_index_version", "Shared index version this worker serves (SHARED_INDEX=1)")
+COALESCED_REQUESTS = registry.counter("singleflight_requests_total", "Requests that ran (leader) or joined (follower) a computation", ("endpoint", "role"))
+
+def stage_timer(stage: str) -> Timer:
+    """Timer for one pipeline stage (classify, retrieval, llm, tool_*, ...)"""
+    return Timer(STAGE_SECONDS, STAGE_ERRORS, span_name=stage, stage=stage)
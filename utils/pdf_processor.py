@@ -1,61 +1,218 @@
+import hashlib
 import os
 import shutil
-from typing import Optional
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional
 from chromadb.api.models.Collection import Collection
 
 from utils.filter.extract_text_pdf import extract_and_save_text
-from utils.filter.clean_text import clean_text, save_cleaned_chunks
+from utils.filter.clean_text import clean_text, save_cleaned_chunks, split_sections
 from utils.embeddings.generate_embeddings import generate_embeddings, save_embeddings
 from utils.embeddings.store_embeddings import (
-    store_embeddings_in_chroma, 
+    open_chroma_collection,
+    store_embeddings_in_chroma,
     load_embeddings
 )
+from utils.embeddings.index_manifest import build_manifest, mismatch, read_manifest, write_manifest
+from utils.embeddings.shared_index import SharedIndex
+
+# progress(stage, done, total) where stage is one of extract/clean/embed/index
+ProgressCallback = Callable[[str, int, int], None]
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file, read in 1 MB blocks"""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
 
 class PDFProcessor:
-    def __init__(self):
+    """Builds and serves the index of the current PDF
+
+    With a SharedIndex (multi-worker mode) the index is published there
+    instead of to Chroma, and every process serves whichever version was
+    published last, whoever ingested it.
+    """
+
+    def __init__(self, db_root: str = "vector_db", shared_index: Optional[SharedIndex] = None):
         self._collection: Optional[Collection] = None
         self._current_pdf_path: Optional[str] = None
+        self._current_db_path: Optional[str] = None
+        self._current_source_hash: Optional[str] = None
+        self._current_sections: List[Dict[str, Any]] = []
+        self._db_root = db_root
+        self._shared_index = shared_index
+        self._lock = threading.Lock()
 
     def clear_previous_data(self):
-        """Clear all previous processing data"""
-        for directory in ["extracted_texts", "processed_texts", "vector_db"]:
+        """Clear all previous processing data, keeping the index currently being served"""
+        for directory in ["extracted_texts", "processed_texts"]:
             if os.path.exists(directory):
                 shutil.rmtree(directory)
             os.makedirs(directory)
 
-    def process_pdf(self, pdf_path: str) -> Collection:
-        """Process PDF through all steps and return ChromaDB collection"""
+        os.makedirs(self._db_root, exist_ok=True)
+        for name in os.listdir(self._db_root):
+            path = os.path.join(self._db_root, name)
+            if path == self._current_db_path:
+                continue
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+
+    @staticmethod
+    def extract_chunks(pdf_path: str, output_dir: str = "extracted_texts") -> List[str]:
+        """Extract and clean a PDF into chunks without touching the live index"""
+        extracted_text_path = extract_and_save_text(pdf_path, output_dir)
+        return clean_text(extracted_text_path)
+
+    def process_pdf(self, pdf_path: str, progress: Optional[ProgressCallback] = None) -> Collection:
+        """Process PDF through all steps and return ChromaDB collection
+
+        The new index is built in its own directory and only swapped in once it
+        is complete, so queries keep using the previous collection meanwhile.
+        """
+        def report(stage: str, done: int = 0, total: int = 0):
+            if progress:
+                progress(stage, done, total)
+
         try:
             # Clear previous data
             self.clear_previous_data()
-            
-            # Store current PDF path
-            self._current_pdf_path = pdf_path
-            
+
+            source_hash = file_sha256(pdf_path)
+
             # Extract and process text
+            report("extract")
             extracted_text_path = extract_and_save_text(pdf_path)
+            report("clean")
             cleaned_chunks = clean_text(extracted_text_path)
+            sections = split_sections(extracted_text_path)
             save_cleaned_chunks(cleaned_chunks)
-            
+
             # Generate and store embeddings
-            embeddings = generate_embeddings(cleaned_chunks)
+            report("embed", 0, len(cleaned_chunks))
+            embeddings = generate_embeddings(
+                cleaned_chunks,
+                progress=lambda done, total: report("embed", done, total)
+            )
+            if embeddings is None:
+                raise Exception("Embedding generation failed")
             save_embeddings(embeddings, cleaned_chunks)
-            
-            # Initialize ChromaDB
+
+            report("index", 0, len(cleaned_chunks))
             embeddings_data = load_embeddings()
-            self._collection = store_embeddings_in_chroma(embeddings_data)
-            
-            return self._collection
-            
+            manifest = build_manifest(source_hash, pdf_path, sections, len(embeddings_data))
+            if self._shared_index is not None:
+                db_path = None
+                self._shared_index.publish(
+                    [item['embedding'] for item in embeddings_data],
+                    [item['chunk'] for item in embeddings_data],
+                    manifest
+                )
+                collection = self._shared_index.latest()
+            else:
+                # Initialize ChromaDB in a fresh build directory
+                db_path = os.path.join(self._db_root, f"build_{int(time.time() * 1000)}")
+                collection = store_embeddings_in_chroma(embeddings_data, db_path=db_path)
+                write_manifest(db_path, manifest)
+            report("index", len(cleaned_chunks), len(cleaned_chunks))
+
+            # Swap the new collection in atomically
+            with self._lock:
+                self._collection = collection
+                self._current_pdf_path = pdf_path
+                self._current_db_path = db_path
+                self._current_source_hash = source_hash
+                self._current_sections = sections
+
+            return collection
+
         except Exception as e:
-            self._collection = None
-            self._current_pdf_path = None
             raise Exception(f"PDF processing failed: {str(e)}")
 
+    def reopen(self) -> bool:
+        """Serve the newest complete index under db_root built by the current chunker and embedding model
+
+        Called at startup, so a restart serves the last ingested PDF without
+        /initialize or any embedding calls. An index whose PDF is still on disk
+        is skipped when the file no longer matches the source hash it was built
+        from. Returns whether an index is served.
+        """
+        if self._shared_index is not None:
+            return self.collection is not None
+        if not os.path.isdir(self._db_root):
+            return False
+        for name in sorted((name for name in os.listdir(self._db_root) if name.startswith("build_")), reverse=True):
+            db_path = os.path.join(self._db_root, name)
+            manifest = read_manifest(db_path)
+            if manifest is None:
+                continue  # build never completed
+            reason = mismatch(manifest)
+            if reason is not None:
+                print(f"Not reopening index {db_path}: built with {reason}")
+                continue
+            if os.path.isfile(manifest["pdf_path"]) and file_sha256(manifest["pdf_path"]) != manifest["source_hash"]:
+                print(f"Not reopening index {db_path}: {manifest['pdf_path']} changed since it was ingested")
+                continue
+            try:
+                collection = open_chroma_collection(db_path)
+                if collection.count() != manifest["chunks"]:
+                    raise Exception(f"{collection.count()} chunks stored, manifest lists {manifest['chunks']}")
+            except Exception as e:
+                print(f"Not reopening index {db_path}: {str(e)}")
+                continue
+            with self._lock:
+                self._collection = collection
+                self._current_pdf_path = manifest["pdf_path"]
+                self._current_db_path = db_path
+                self._current_source_hash = manifest["source_hash"]
+                self._current_sections = manifest["sections"]
+            print(f"Reopened index {db_path} ({manifest['chunks']} chunks of {manifest['pdf_path']})")
+            return True
+        return False
+
+    def ingest_lock(self):
+        """Held around process_pdf: workers share the working directories, so only one may ingest at a time"""
+        return self._shared_index.ingest_lock() if self._shared_index is not None else nullcontext()
+
+    def _sync_shared_index(self):
+        """Switch to the latest shared index version if another worker published one"""
+        if self._shared_index is None:
+            return
+        collection = self._shared_index.latest()
+        if collection is None or collection is self._collection or mismatch(collection.metadata) is not None:
+            return
+        with self._lock:
+            self._collection = collection
+            self._current_pdf_path = collection.metadata["pdf_path"]
+            self._current_db_path = None
+            self._current_source_hash = collection.metadata["source_hash"]
+            self._current_sections = collection.metadata["sections"]
+
     @property
     def collection(self) -> Optional[Collection]:
+        """Chroma collection, or a MappedCollection with a shared index"""
+        self._sync_shared_index()
         return self._collection
 
     @property
     def current_pdf_path(self) -> Optional[str]:
-        return self._current_pdf_path
\ No newline at end of file
+        self._sync_shared_index()
+        return self._current_pdf_path
+
+    @property
+    def current_source_hash(self) -> Optional[str]:
+        """SHA-256 of the PDF behind the live index"""
+        self._sync_shared_index()
+        return self._current_source_hash
+
+    @property
+    def current_sections(self) -> List[Dict[str, Any]]:
+        """Numbered sections ({"number", "title", "text"}) of the PDF behind the live index"""
+        self._sync_shared_index()
+        return self._current_sections
@@ -0,0 +1,145 @@
+"""Prompt construction: stable prefixes, local token counts and context budgets
+
+Providers cache the longest previously seen prefix of a prompt (OpenAI
+from 1024 tokens on), so every prompt here is laid out static-first: the
+instructions, output formats and tool schemas live in the system message,
+byte-identical on every call, and only the user message carries the
+question, retrieved context and other per-request data. Context is
+trimmed to PROMPT_CONTEXT_TOKENS before it is sent.
+
+Token counts use tiktoken when it is installed and about four characters
+per token otherwise. Each prompt's local count goes to the prompt_tokens
+histogram and the provider's reported usage (including cached prompt
+tokens) to llm_tokens_total, both labelled by call.
+"""
+import json
+import math
+import os
+from typing import Any, Dict, List, Optional
+
+from utils.metrics import LLM_TOKENS, PROMPT_TOKENS
+
+PROMPT_CONTEXT_TOKENS = int(os.getenv("PROMPT_CONTEXT_TOKENS", "1500"))
+TOOL_RESULT_TOKENS = int(os.getenv("PROMPT_TOOL_RESULT_TOKENS", "1500"))
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("o200k_base")  # gpt-4o's tokenizer
+except Exception:  # not installed, or its vocabulary can't be fetched offline
+    _encoding = None
+
+def count_tokens(text: str) -> int:
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+def count_message_tokens(messages: List[Dict[str, str]]) -> int:
+    """Prompt tokens of a chat request, including the per-message framing"""
+    return sum(count_tokens(message["content"]) + 4 for message in messages) + 3
+
+def trim_to_tokens(text: Optional[str], max_tokens: int = PROMPT_CONTEXT_TOKENS) -> str:
+    """Cut text to max_tokens, preferring to end at a sentence boundary"""
+    text = text or ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    if _encoding is not None:
+        cut = _encoding.decode(_encoding.encode(text)[:max_tokens])
+    else:
+        cut = text[:max_tokens * 4]
+    sentence_end = max(cut.rfind(". "), cut.rfind("? "), cut.rfind("! "))
+    return cut[:sentence_end + 1] if sentence_end > len(cut) // 2 else cut
+
+def build_messages(call: str, system: str, user: str) -> List[Dict[str, str]]:
+    """System (static prefix) + user (per-request) messages, with their size recorded"""
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user}
+    ]
+    PROMPT_TOKENS.observe(count_message_tokens(messages), call=call)
+    return messages
+
+def record_usage(call: str, response: Any):
+    """Count the provider-reported prompt, cached and completion tokens of a response"""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    LLM_TOKENS.inc(usage.prompt_tokens or 0, call=call, kind="prompt")
+    LLM_TOKENS.inc(usage.completion_tokens or 0, call=call, kind="completion")
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details is not None else None
+    if cached:
+        LLM_TOKENS.inc(cached, call=call, kind="cached")
+
+def _compact(data: Any) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+# Question answering
+
+QA_SYSTEM = "You are a helpful physics teacher. Answer the question using the context given with it."
+CHAT_SYSTEM = "You are a helpful assistant."
+TEACHER_SYSTEM = "You are a helpful teacher."
+
+def qa_user(question: str, context: Optional[str]) -> str:
+    return f"Context: {trim_to_tokens(context)}\n\nQuestion: {question}"
+
+# Learning tools
+
+def tool_analysis_system(tool_schemas: Dict[str, Any]) -> str:
+    return (
+        "You are a learning assistant that analyzes queries for potential tool usage. "
+        "Decide if a learning tool would help with the query; not every query needs one.\n"
+        f"Available tools: {_compact(tool_schemas)}\n"
+        "Respond in JSON with: should_use_tool (boolean), tool (name of the tool if should_use_tool), "
+        "parameters (object with the tool's parameters if should_use_tool), "
+        "confidence (0 to 1), reasoning (short explanation)."
+    )
+
+FLASHCARDS_SYSTEM = (
+    "You are an expert at creating educational flashcards. "
+    "Make the cards clear, concise, and focused on key concepts. Use the reference content.\n"
+    'Respond in this JSON format: {"flashcards":[{"front":"question/term","back":"answer/definition"}]}'
+)
+PRACTICE_SYSTEM = (
+    "You are an expert at creating educational practice problems. Use the reference content.\n"
+    'Respond in this JSON format: {"problems":[{"question":"problem statement","solution":"step-by-step solution",'
+    '"final_answer":"the answer","explanation":"explanation of concepts used"}]}'
+)
+CONCEPT_MAP_SYSTEM = (
+    "You are an expert at creating concept maps. Use the reference content.\n"
+    'Respond in this JSON format: {"central_concept":"main topic","connections":[{"concept":"related concept",'
+    '"relationship":"how it relates","sub_concepts":["more specific ideas"]}]}'
+)
+SUMMARY_FORMAT = (
+    '{"main_points":["key ideas"],"details":{"concept":"explanation"},'
+    '"examples":["relevant examples"],"additional_notes":"any important considerations"}'
+)
+SUMMARY_SYSTEM = (
+    "You are an expert at creating educational summaries. Use the reference content.\n"
+    f"Respond in this JSON format: {SUMMARY_FORMAT}"
+)
+TOOL_RESPONSE_SYSTEM = (
+    "You are a helpful learning assistant. Write a natural, conversational reply to the user's query "
+    "that 1. acknowledges the question, 2. explains what was created from the tool results and "
+    "3. guides them on how to use the results."
+)
+
+def tool_user(request: str, context: Optional[str]) -> str:
+    return f"{request}\n\nReference content: {trim_to_tokens(context)}"
+
+def tool_response_user(query: str, tool: str, tool_result: Dict[str, Any]) -> str:
+    return f"Query: {query}\nTool used: {tool}\nTool results: {trim_to_tokens(_compact(tool_result), TOOL_RESULT_TOKENS)}"
+
+# Map-reduce summaries
+
+SUMMARY_MAP_SYSTEM = (
+    "You summarize textbook sections for students. Summarize the given part of a section in 3-6 bullet "
+    "points, keeping definitions, formulas and key examples."
+)
+SUMMARY_REDUCE_SYSTEM = (
+    "You summarize textbook sections for students. Merge the given partial summaries into one list of "
+    "bullet points, removing repetition."
+)
+SUMMARY_FINAL_SYSTEM = (
+    "You are an expert at creating educational summaries. Create a summary of the whole chapter from the "
+    f"given section summaries.\nRespond in this JSON format: {SUMMARY_FORMAT}"
+)
@@ -0,0 +1,308 @@
+"""Client-side rate limiting and priority scheduling for every OpenAI call
+
+    response = call_openai("interactive", client.chat.completions.create, model=..., messages=...)
+
+OpenAI caps requests and tokens per minute per key and model, so every
+call waits first on the RateLimiter of its model (limiter_for): two token
+buckets (requests and tokens, refilled continuously and holding at most
+OPENAI_LIMIT_BURST_SECONDS worth) and a queue ordered by priority, so when
+capacity runs short interactive questions go first, then learning-tool
+generation, then ingestion. A call's token cost is estimated from its
+prompt plus the expected completion and corrected from the usage the
+response reports.
+
+The limits come from OPENAI_LIMITS, "model=rpm:tpm" entries separated by
+commas, e.g. "gpt-4o=500:30000,gpt-4o-mini=500:200000". Models joined
+with "|" share one bucket (an OpenAI shared-limit group) and "*" covers
+every model not listed; 0 turns a limit off. A model without limits is
+not held back before sending, only after a 429.
+
+A 429 pauses every caller of that model for the Retry-After the API sends
+(jittered exponential backoff when it sends none) and the call is retried;
+clients are built with max_retries=0 so retries happen here, under the
+limiter. Limits are per process: with several workers, divide the quota by
+the worker count.
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import openai
+
+from utils.metrics import OPENAI_LIMITER_WAIT, OPENAI_QUEUE_DEPTH, OPENAI_RATE_LIMITED
+from utils.prompts import count_message_tokens, count_tokens
+
+OPENAI_LIMITS = os.getenv("OPENAI_LIMITS", "")
+OPENAI_LIMIT_BURST_SECONDS = float(os.getenv("OPENAI_LIMIT_BURST_SECONDS", "60"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+COMPLETION_TOKENS = 500  # expected completion size of calls that set no max_tokens
+
+PRIORITIES = {"interactive": 0, "tool": 1, "ingestion": 2}
+TRANSIENT_ERRORS = (openai.APIConnectionError, openai.InternalServerError)
+
+class TokenBucket:
+    """Refills at `per_minute`, holding up to `burst_seconds` of it; the level may go negative after a correction"""
+
+    def __init__(self, per_minute: float, burst_seconds: float = OPENAI_LIMIT_BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(self.rate * burst_seconds, 1.0)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` (at most the capacity) is available"""
+        self._refill()
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+    def give(self, amount: float):
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+class _Waiter:
+    """A queued call; wake() makes it check again whether it is first and capacity is there"""
+
+    def __init__(self, entry: Tuple[int, int], priority: str, tokens: int, wake: Callable[[], None]):
+        self.entry = entry
+        self.priority = priority
+        self.tokens = tokens
+        self.wake = wake
+
+class RateLimiter:
+    """Request and token buckets of one model or limit group, granted in priority order (FIFO within a priority)
+
+    Threads wait with acquire(), coroutines with acquire_async(); a waiter
+    that is cancelled or interrupted leaves the queue without taking capacity.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0):
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self._lock = threading.Lock()
+        self._queue: List[Tuple[int, int]] = []
+        self._waiters: Dict[Tuple[int, int], _Waiter] = {}
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+
+    def _wait_time(self, tokens: int) -> float:
+        wait = self._paused_until - time.monotonic()
+        if self.requests:
+            wait = max(wait, self.requests.wait_time(1))
+        if self.tokens:
+            wait = max(wait, self.tokens.wait_time(tokens))
+        return wait
+
+    def _enqueue(self, priority: str, tokens: int, wake: Callable[[], None]) -> _Waiter:
+        waiter = _Waiter((PRIORITIES[priority], next(self._seq)), priority, tokens, wake)
+        with self._lock:
+            heapq.heappush(self._queue, waiter.entry)
+            self._waiters[waiter.entry] = waiter
+        OPENAI_QUEUE_DEPTH.inc(priority=priority)
+        return waiter
+
+    def _remove(self, waiter: _Waiter):
+        """Take waiter out of the queue (under the lock) and let the others check again"""
+        self._queue.remove(waiter.entry)
+        heapq.heapify(self._queue)
+        del self._waiters[waiter.entry]
+        OPENAI_QUEUE_DEPTH.dec(priority=waiter.priority)
+        self._wake_all()
+
+    def _wake_all(self):
+        for waiter in self._waiters.values():
+            waiter.wake()
+
+    def _grant(self, waiter: _Waiter) -> Optional[float]:
+        """Under the lock: 0 once capacity was taken for waiter, else seconds to wait (None: until woken)"""
+        if self._queue[0] != waiter.entry:
+            return None
+        wait = self._wait_time(waiter.tokens)
+        if wait > 0:
+            return wait
+        if self.requests:
+            self.requests.take(1)
+        if self.tokens:
+            self.tokens.take(waiter.tokens)
+        self._remove(waiter)
+        return 0.0
+
+    def _abandon(self, waiter: _Waiter):
+        with self._lock:
+            if waiter.entry in self._waiters:
+                self._remove(waiter)
+
+    def acquire(self, priority: str, tokens: int):
+        """Block the calling thread until the call may be sent; only the first call in the queue can be granted"""
+        woken = threading.Event()
+        waiter = self._enqueue(priority, tokens, woken.set)
+        start = time.monotonic()
+        try:
+            while True:
+                woken.clear()
+                with self._lock:
+                    wait = self._grant(waiter)
+                if wait == 0:
+                    break
+                woken.wait(wait)
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        OPENAI_LIMITER_WAIT.observe(time.monotonic() - start, priority=priority)
+
+    async def acquire_async(self, priority: str, tokens: int):
+        """acquire() for coroutines: waits on the event loop, and cancelling it frees the queue slot"""
+        loop = asyncio.get_running_loop()
+        woken = asyncio.Event()
+
+        def wake():
+            try:
+                loop.call_soon_threadsafe(woken.set)
+            except RuntimeError:
+                pass  # loop already closed
+
+        waiter = self._enqueue(priority, tokens, wake)
+        start = time.monotonic()
+        try:
+            while True:
+                woken.clear()
+                with self._lock:
+                    wait = self._grant(waiter)
+                if wait == 0:
+                    break
+                try:
+                    await asyncio.wait_for(woken.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        OPENAI_LIMITER_WAIT.observe(time.monotonic() - start, priority=priority)
+
+    def waiting(self) -> int:
+        """Calls queued for capacity right now"""
+        with self._lock:
+            return len(self._queue)
+
+    def settle(self, estimated: int, actual: Optional[int]):
+        """Correct the token bucket once the response reports what the call really used"""
+        if self.tokens is None or actual is None:
+            return
+        with self._lock:
+            if actual < estimated:
+                self.tokens.give(estimated - actual)
+            else:
+                self.tokens.take(actual - estimated)
+            self._wake_all()
+
+    def back_off(self, seconds: float):
+        """Hold every caller for `seconds` after the API said the limit was hit"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+def parse_limits(spec: str) -> Dict[str, RateLimiter]:
+    """OPENAI_LIMITS -> limiter by model name; models of one entry share its limiter"""
+    limiters: Dict[str, RateLimiter] = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        models, _, limits = entry.partition("=")
+        rpm, _, tpm = limits.partition(":")
+        try:
+            shared = RateLimiter(int(rpm or 0), int(tpm or 0))
+        except ValueError:
+            raise Exception(f"Invalid OPENAI_LIMITS entry '{entry}', expected model=rpm:tpm")
+        for model in models.split("|"):
+            limiters[model.strip()] = shared
+    return limiters
+
+_limiters = parse_limits(OPENAI_LIMITS)
+_limiters_lock = threading.Lock()
+
+def limiter_for(model: Optional[str]) -> RateLimiter:
+    """The limiter of model's group; an unlisted model gets "*" or its own limiter without limits"""
+    with _limiters_lock:
+        if model not in _limiters:
+            _limiters[model] = _limiters.get("*") or RateLimiter()
+        return _limiters[model]
+
+def estimate_tokens(kwargs: Dict[str, Any]) -> int:
+    """Tokens a chat or embeddings request will count against TPM"""
+    if "messages" in kwargs:
+        return count_message_tokens(kwargs["messages"]) + (kwargs.get("max_tokens") or COMPLETION_TOKENS)
+    inputs = kwargs.get("input", "")
+    return sum(count_tokens(str(text)) for text in (inputs if isinstance(inputs, list) else [inputs]))
+
+def retry_delay(error: Exception, attempt: int) -> float:
+    """Retry-After(-ms) from the response when given, else full-jitter exponential backoff"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        try:
+            return float(headers.get(header)) * scale
+        except (TypeError, ValueError):
+            pass
+    return random.uniform(0, 0.5 * (2 ** attempt))
+
+def _retryable(error: openai.RateLimitError) -> bool:
+    return getattr(error, "code", None) != "insufficient_quota"  # out of credit, not rate limited
+
+def _used_tokens(response: Any) -> Optional[int]:
+    usage = getattr(response, "usage", None)
+    return getattr(usage, "total_tokens", None)
+
+def call_openai(priority: str, create: Callable[..., Any], limit_model: Optional[str] = None, **kwargs) -> Any:
+    """Run a blocking OpenAI create(**kwargs) under its model's limiter, retrying 429s and transient errors
+
+    limit_model names the model for create() functions that take no model argument.
+    """
+    limiter = limiter_for(kwargs.get("model", limit_model))
+    tokens = estimate_tokens(kwargs)
+    for attempt in range(OPENAI_MAX_RETRIES + 1):
+        limiter.acquire(priority, tokens)
+        try:
+            response = create(**kwargs)
+        except openai.RateLimitError as e:
+            OPENAI_RATE_LIMITED.inc(priority=priority)
+            if attempt == OPENAI_MAX_RETRIES or not _retryable(e):
+                raise
+            limiter.back_off(retry_delay(e, attempt))
+            continue
+        except TRANSIENT_ERRORS as e:
+            if attempt == OPENAI_MAX_RETRIES:
+                raise
+            time.sleep(retry_delay(e, attempt))
+            continue
+        limiter.settle(tokens, _used_tokens(response))
+        return response
+
+async def acall_openai(priority: str, create: Callable[..., Any], limit_model: Optional[str] = None, **kwargs) -> Any:
+    """asyncio counterpart of call_openai for AsyncOpenAI methods; waits without holding a thread"""
+    limiter = limiter_for(kwargs.get("model", limit_model))
+    tokens = estimate_tokens(kwargs)
+    for attempt in range(OPENAI_MAX_RETRIES + 1):
+        await limiter.acquire_async(priority, tokens)
+        try:
+            response = await create(**kwargs)
+        except openai.RateLimitError as e:
+            OPENAI_RATE_LIMITED.inc(priority=priority)
+            if attempt == OPENAI_MAX_RETRIES or not _retryable(e):
+                raise
+            limiter.back_off(retry_delay(e, attempt))
+            continue
+        except TRANSIENT_ERRORS as e:
+            if attempt == OPENAI_MAX_RETRIES:
+                raise
+            await asyncio.sleep(retry_delay(e, attempt))
+            continue
+        limiter.settle(tokens, _used_tokens(response))
+        return response
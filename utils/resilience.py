@@ -0,0 +1,196 @@
+"""Deadlines, hedged requests and a circuit breaker for LLM calls
+
+    response = await llm_call("ask", "interactive", client.chat.completions.create, model=..., messages=...)
+
+Every call has a deadline (LLM_TIMEOUT_SECONDS, or per call name in
+LLM_TIMEOUTS, e.g. "generate_summary=90,tool_analysis=15") covering the
+rate-limiter wait, retries and the response. When the first attempt has
+not answered after the p95 latency of recent calls with the same name
+(LLM_HEDGE_DELAY_SECONDS until enough have completed; at most half the
+deadline), a duplicate is
+sent; whichever answers first wins and the other is cancelled, which
+closes its connection. Hedges are skipped while calls queue for
+rate-limit capacity or the breaker is not closed, so they never add load
+to an upstream that is already struggling.
+
+LLM_BREAKER_FAILURES consecutive timeouts, upstream errors or 429s that
+outlast the retries open the breaker: for LLM_BREAKER_RESET_SECONDS calls
+fail at once with LLMUnavailable instead of each waiting out its deadline,
+then a single trial call decides whether to close it again.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+import openai
+
+from utils.metrics import LLM_CIRCUIT_OPEN, LLM_CIRCUIT_REJECTED, LLM_DEADLINE_EXCEEDED, LLM_HEDGES
+from utils.rate_limiter import acall_openai, limiter_for
+
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+LLM_HEDGE = os.getenv("LLM_HEDGE", "1") != "0"
+LLM_HEDGE_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_DELAY_SECONDS", "5"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+HEDGE_QUANTILE = 0.95
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+# a RateLimitError reaching llm_call has outlasted the limiter's retries (or the quota is gone)
+UPSTREAM_ERRORS = (asyncio.TimeoutError, openai.APIConnectionError, openai.InternalServerError, openai.RateLimitError)
+
+def parse_timeouts(value: str) -> Dict[str, float]:
+    timeouts = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        call, _, seconds = item.partition("=")
+        try:
+            timeouts[call.strip()] = float(seconds)
+        except ValueError:
+            raise Exception(f"Invalid LLM_TIMEOUTS entry: {item}")
+    return timeouts
+
+LLM_TIMEOUTS = parse_timeouts(os.getenv("LLM_TIMEOUTS", ""))
+
+class LLMUnavailable(Exception):
+    """The LLM call missed its deadline or the circuit breaker is open"""
+
+class CircuitBreaker:
+    """Closed until `failures` calls in a row fail; open for reset_seconds; then one trial call"""
+
+    def __init__(self, failures: int = LLM_BREAKER_FAILURES, reset_seconds: float = LLM_BREAKER_RESET_SECONDS):
+        self.threshold = failures
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def closed(self) -> bool:
+        return self.opened_at is None
+
+    def admit(self) -> Optional[str]:
+        """"closed" or "trial" when a call may go ahead, None when it must fail fast"""
+        if self.threshold <= 0:
+            return "closed"
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if not self._trial and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self._trial = True
+                return "trial"
+            return None
+
+    def release_trial(self):
+        """Free the trial slot of a call that ended without an outcome (cancelled)"""
+        with self._lock:
+            self._trial = False
+
+    def record(self, ok: bool):
+        if self.threshold <= 0:
+            return
+        with self._lock:
+            self._trial = False
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+            else:
+                self.failures += 1
+                if self.opened_at is not None or self.failures >= self.threshold:
+                    self.opened_at = time.monotonic()
+            LLM_CIRCUIT_OPEN.set(float(self.opened_at is not None))
+
+class LatencyWindow:
+    """Latencies of the last completed attempts per call name"""
+
+    def __init__(self, size: int = LATENCY_WINDOW):
+        self.size = size
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, call: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(call, deque(maxlen=self.size)).append(seconds)
+
+    def quantile(self, call: str, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(call, ()))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return samples[min(int(q * len(samples)), len(samples) - 1)]
+
+breaker = CircuitBreaker()
+latencies = LatencyWindow()
+
+def hedge_delay(call: str, timeout: float) -> float:
+    """p95 of recent attempts, at most half the deadline so the hedge has time to answer"""
+    delay = latencies.quantile(call, HEDGE_QUANTILE)
+    return min(delay if delay is not None else LLM_HEDGE_DELAY_SECONDS, timeout / 2)
+
+async def _attempt(call: str, priority: str, create: Callable[..., Any], kwargs: Dict[str, Any]) -> Any:
+    start = time.monotonic()
+    response = await acall_openai(priority, create, **kwargs)
+    latencies.add(call, time.monotonic() - start)
+    return response
+
+async def _hedged(call: str, priority: str, create: Callable[..., Any], kwargs: Dict[str, Any], timeout: float) -> Any:
+    primary = asyncio.create_task(_attempt(call, priority, create, kwargs))
+    pending = {primary}
+    hedge: Optional[asyncio.Task] = None
+    outcome = "failed"
+    try:
+        done, _ = await asyncio.wait(pending, timeout=hedge_delay(call, timeout))
+        if done or not breaker.closed or limiter_for(kwargs.get("model")).waiting():
+            return await primary
+        hedge = asyncio.create_task(_attempt(call, priority, create, kwargs))
+        pending.add(hedge)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    outcome = "won" if task is hedge else "lost"
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+        if hedge is not None:
+            LLM_HEDGES.inc(call=call, outcome=outcome)
+
+async def llm_call(call: str, priority: str, create: Callable[..., Any], hedge: bool = True, **kwargs) -> Any:
+    """await create(**kwargs) (an AsyncOpenAI method) under a deadline, hedged unless hedge=False
+
+    For streams the deadline covers getting the response started.
+    """
+    admitted = breaker.admit()
+    if admitted is None:
+        LLM_CIRCUIT_REJECTED.inc(call=call)
+        raise LLMUnavailable(f"LLM upstream is failing; calls are paused for up to {LLM_BREAKER_RESET_SECONDS:.0f} s")
+    timeout = LLM_TIMEOUTS.get(call, LLM_TIMEOUT_SECONDS)
+    if hedge and LLM_HEDGE:
+        attempt = _hedged(call, priority, create, kwargs, timeout)
+    else:
+        attempt = _attempt(call, priority, create, kwargs)
+    try:
+        response = await asyncio.wait_for(attempt, timeout)
+    except asyncio.TimeoutError:
+        breaker.record(False)
+        LLM_DEADLINE_EXCEEDED.inc(call=call)
+        raise LLMUnavailable(f"LLM call {call} timed out after {timeout:.0f} s")
+    except UPSTREAM_ERRORS:
+        breaker.record(False)
+        raise
+    except Exception:
+        breaker.record(True)  # the upstream answered, if only with an error
+        raise
+    except BaseException:
+        if admitted == "trial":
+            breaker.release_trial()  # cancelled: says nothing about the upstream
+        raise
+    breaker.record(True)
+    return response
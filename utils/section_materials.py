@@ -0,0 +1,126 @@
+"""Learning materials generated ahead of time for each section of a document
+
+With PRECOMPUTE_SECTION_TOOLS=1, ingestion ends with a background stage
+that generates a summary, a flashcard set and a concept map for every
+section found by clean_text's header pattern, PRECOMPUTE_WORKERS at a time.
+Results are stored per source hash (re-ingesting the same PDF reuses them)
+and saved as they complete, so /learning-tools requests whose topic names a
+section are served from the store without a model call.
+"""
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.disk_cache import DiskCache
+
+PRECOMPUTE_SECTION_TOOLS = os.getenv("PRECOMPUTE_SECTION_TOOLS", "0") == "1"
+PRECOMPUTE_WORKERS = int(os.getenv("PRECOMPUTE_WORKERS", "4"))
+SECTION_STORE_DIR = os.getenv("SECTION_STORE_DIR", ".cache/sections")
+SECTION_CONTEXT_CHARS = 8000
+SECTION_MATCH_RATIO = 0.8  # share of topic and title words in common needed to serve a section's material
+
+# Tool -> (parameter naming the topic, remaining parameters used when precomputing)
+SECTION_TOOLS = {
+    "generate_summary": ("topic", {"format": "detailed"}),
+    "create_flashcards": ("concept", {"num_cards": 5}),
+    "create_concept_map": ("central_concept", {"depth": 2}),
+}
+STOP_WORDS = {"a", "an", "and", "the", "of", "in", "on", "to", "for", "about", "section", "chapter", "topic"}
+
+section_store = DiskCache(SECTION_STORE_DIR)
+_lock = threading.Lock()
+_stores: Dict[str, Dict[str, Any]] = {}  # source hash -> {"sections": [...], "materials": {...}}
+
+def topic_words(text: str) -> set:
+    """Content words of a topic or title, lowercased and crudely singularized"""
+    words = set()
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if word in STOP_WORDS:
+            continue
+        if len(word) > 3 and word.endswith("s"):
+            word = word[:-1]
+        words.add(word)
+    return words
+
+def _material_id(section: Dict[str, Any], tool: str) -> str:
+    return f"{section['number']} {section['title']}/{tool}"
+
+def _store(source_hash: str) -> Dict[str, Any]:
+    with _lock:
+        if source_hash not in _stores:
+            saved = section_store.get(DiskCache.make_key("sections", source_hash))
+            _stores[source_hash] = saved or {"sections": [], "materials": {}}
+        return _stores[source_hash]
+
+def find_material(source_hash: Optional[str], tool: str, parameters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Precomputed result for a request whose topic names a section, or None
+
+    The topic must name the section itself: shared content words over all
+    content words of topic and title must reach SECTION_MATCH_RATIO, so a
+    broad topic ("sound") is not answered with one narrow section's
+    material. The closest title wins. Requests for a different number of
+    flashcards than were precomputed are not matched.
+    """
+    if not source_hash or tool not in SECTION_TOOLS:
+        return None
+    topic_parameter, defaults = SECTION_TOOLS[tool]
+    if "num_cards" in defaults and str(parameters.get("num_cards") or defaults["num_cards"]) != str(defaults["num_cards"]):
+        return None
+    words = topic_words(str(parameters.get(topic_parameter) or ""))
+    if not words:
+        return None
+
+    store = _store(source_hash)
+    best, best_score = None, 0.0
+    with _lock:
+        for section in store["sections"]:
+            title = topic_words(section["title"])
+            material = store["materials"].get(_material_id(section, tool))
+            score = len(words & title) / len(words | title)
+            if material is not None and score >= SECTION_MATCH_RATIO and score > best_score:
+                best, best_score = material, score
+    return best
+
+def precompute(
+    source_hash: str,
+    sections: List[Dict[str, Any]],
+    generate: Callable[[str, Dict[str, Any], str], Dict[str, Any]],
+    progress: Optional[Callable[[int, int, int], None]] = None,
+    workers: int = PRECOMPUTE_WORKERS
+):
+    """Generate the missing materials of every section on a bounded pool
+
+    generate(tool, parameters, context) returns the tool result; progress is
+    called with (done, failed, total) after each item.
+    """
+    store = _store(source_hash)
+    with _lock:
+        store["sections"] = [{"number": section["number"], "title": section["title"]} for section in sections]
+    items = [(section, tool) for section in sections for tool in SECTION_TOOLS
+             if _material_id(section, tool) not in store["materials"]]
+    done = failed = 0
+    if progress:
+        progress(done, failed, len(items))
+
+    def run(section: Dict[str, Any], tool: str):
+        topic_parameter, defaults = SECTION_TOOLS[tool]
+        result = generate(tool, dict(defaults, **{topic_parameter: section["title"]}), section["text"][:SECTION_CONTEXT_CHARS])
+        if "error" in result:
+            raise Exception(f"{tool} failed for section {section['number']}: {result['error']}")
+        with _lock:
+            store["materials"][_material_id(section, tool)] = result
+            section_store.set(DiskCache.make_key("sections", source_hash), store)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="precompute") as pool:
+        futures = [pool.submit(run, section, tool) for section, tool in items]
+        for future in as_completed(futures):
+            try:
+                future.result()
+                done += 1
+            except Exception as e:
+                print(f"Section precompute error: {str(e)}")
+                failed += 1
+            if progress:
+                progress(done, failed, len(items))
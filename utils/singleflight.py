@@ -0,0 +1,132 @@
+"""Coalesce identical concurrent requests onto one upstream computation
+
+When a class submits the same question within a second, the first request
+(the leader) runs retrieval and the LLM call and the others (followers)
+await its result instead of repeating the work. Only requests that overlap
+in time are merged: a key is forgotten as soon as its computation ends, so
+this is not a cache and never serves an answer computed for an older index.
+
+Streams are shared the same way. The leader's generator runs in its own
+task and every event is buffered and fanned out, so a follower that joins
+mid-stream first replays what it missed and then receives live events. The
+stream is cancelled once every subscriber has disconnected.
+
+Set COALESCE_REQUESTS=0 to run every request on its own.
+"""
+import asyncio
+import os
+import re
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from utils.metrics import COALESCED_REQUESTS
+from utils.tracing import set_attribute
+
+COALESCE_REQUESTS = os.getenv("COALESCE_REQUESTS", "1") == "1"
+
+def normalize_question(question: str) -> str:
+    """Case-, whitespace- and trailing-punctuation-insensitive form of a question"""
+    return re.sub(r"\s+", " ", question).strip().rstrip("?!. ").casefold()
+
+class _Broadcast:
+    """Runs one async generator and replays its events to any number of subscribers"""
+
+    def __init__(self, source: AsyncIterator[Any]):
+        self.events: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.condition = asyncio.Condition()
+        self.task = asyncio.create_task(self._pump(source))
+
+    async def _pump(self, source: AsyncIterator[Any]):
+        try:
+            async for event in source:
+                async with self.condition:
+                    self.events.append(event)
+                    self.condition.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            async with self.condition:
+                self.done = True
+                self.condition.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[Any]:
+        """Events for one subscriber, already counted in self.subscribers when it joined"""
+        index = 0
+        try:
+            while True:
+                async with self.condition:
+                    await self.condition.wait_for(lambda: index < len(self.events) or self.done)
+                    pending = self.events[index:]
+                    done = self.done
+                for event in pending:
+                    yield event
+                index += len(pending)
+                if done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.task.done():
+                self.task.cancel()
+
+class SingleFlight:
+    """In-flight deduplication for one endpoint, keyed by any hashable value"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._streams: Dict[Hashable, _Broadcast] = {}
+
+    def _count(self, leader: bool):
+        COALESCED_REQUESTS.inc(endpoint=self.name, role="leader" if leader else "follower")
+        if not leader:
+            set_attribute("coalesced", True)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Result of fn(), shared with every concurrent caller using the same key
+
+        The computation is shielded, so a leader whose client goes away does
+        not cancel it for the followers. Exceptions reach every caller.
+        """
+        if not COALESCE_REQUESTS:
+            return await fn()
+        task = self._calls.get(key)
+        self._count(task is None)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+
+            def forget(finished: asyncio.Task):
+                if self._calls.get(key) is finished:
+                    del self._calls[key]
+                if not finished.cancelled():
+                    finished.exception()  # retrieved by the callers; avoids "never retrieved"
+
+            task.add_done_callback(forget)
+        return await asyncio.shield(task)
+
+    def stream(self, key: Hashable, factory: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """Events of factory(), shared with every concurrent subscriber using the same key"""
+        if not COALESCE_REQUESTS:
+            return factory()
+        broadcast = self._streams.get(key)
+        self._count(broadcast is None)
+        if broadcast is None:
+            broadcast = _Broadcast(factory())
+            self._streams[key] = broadcast
+
+            def forget(_):
+                if self._streams.get(key) is broadcast:
+                    del self._streams[key]
+
+            broadcast.task.add_done_callback(forget)
+        # counted now, not on first iteration: a subscriber that leaves before
+        # another has started must not bring the count to 0 and cancel the stream
+        broadcast.subscribers += 1
+        return broadcast.subscribe()
+
+    def in_flight(self) -> int:
+        return len(self._calls) + len(self._streams)
@@ -1,6 +1,10 @@
+import asyncio
+
 from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 
+from utils.metrics import stage_timer
+
 class SmartQueryRouter:
     def __init__(self):
         self.model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
@@ -165,13 +169,16 @@ class SmartQueryRouter:
         self.medium_confidence = 0.70
         self.low_confidence = 0.50
 
+    @stage_timer("classify")
     async def classify_query(self, query: str):
-        query_embedding = self.model.encode([query])[0]
+        query_embedding = (await asyncio.to_thread(self.model.encode, [query]))[0]
         similarities = {}
+        matches = {}
         
         for category, embeddings in self.category_embeddings.items():
-            similarity = cosine_similarity([query_embedding], embeddings).max()
-            similarities[category] = similarity
+            scores = cosine_similarity([query_embedding], embeddings)[0]
+            similarities[category] = scores.max()
+            matches[category] = self.category_examples[category][scores.argmax()]
         
         best_category = max(similarities.items(), key=lambda x: x[1])
         confidence = float(best_category[1])
@@ -181,5 +188,6 @@ class SmartQueryRouter:
         return {
             "category": best_category[0],
             "confidence": float(confidence),  # Ensure it's a float for JSON serialization
-            "requires_context": best_category[0] in ["document_query"]
+            "requires_context": best_category[0] in ["document_query"],
+            "match": matches[best_category[0]]  # closest example, used to pick a local answer
         }
\ No newline at end of file
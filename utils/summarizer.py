@@ -0,0 +1,107 @@
+"""Hierarchical (map-reduce) summaries of a whole document
+
+Each section (split further when longer than MAP_CHARS) is summarized on
+its own, SUMMARY_CONCURRENCY calls at a time; the partial summaries are
+then merged REDUCE_FAN_IN at a time until one final call turns them into
+the structured summary the learning tools return. Every step is cached by
+a hash of its prompt, which contains the text it summarizes, so a repeat
+request costs nothing and a re-ingest only re-runs the steps whose input
+changed: the edited sections and the merges above them.
+"""
+import asyncio
+import json
+import os
+import re
+from typing import Any, Awaitable, Callable, Dict, List
+
+from utils.disk_cache import DiskCache
+from utils.metrics import SUMMARY_STEPS
+from utils.prompts import SUMMARY_FINAL_SYSTEM, SUMMARY_MAP_SYSTEM, SUMMARY_REDUCE_SYSTEM, build_messages
+
+SUMMARY_CACHE_DIR = os.getenv("SUMMARY_CACHE_DIR", ".cache/summaries")
+SUMMARY_CACHE_MB = int(os.getenv("SUMMARY_CACHE_MB", "50"))
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "4"))
+MAP_CHARS = 6000
+REDUCE_FAN_IN = 6
+PROMPT_VERSION = 2  # bump when the prompts below change
+
+# the document itself is named, or the topic is nothing but "everything"/"all of it"
+WHOLE_DOCUMENT = re.compile(
+    r"\b(?:chapter|document|pdf|book|textbook)s?\b"
+    r"|\b(?:whole|entire|full)\s+(?:thing|text|lesson|unit)\b"
+    r"|^\W*(?:everything|all|all of it)\W*$"
+)
+
+summary_cache = DiskCache(SUMMARY_CACHE_DIR, max_bytes=SUMMARY_CACHE_MB * 1024 * 1024)
+
+def is_whole_document(topic: Any) -> bool:
+    """True for topics like "the whole chapter" or "this pdf" rather than a concept"""
+    return bool(WHOLE_DOCUMENT.search(str(topic or "").lower()))
+
+def split_text(text: str, max_chars: int = MAP_CHARS) -> List[str]:
+    """Split at sentence ends into pieces of at most max_chars (longer sentences stay whole)"""
+    pieces, current = [], ""
+    for sentence in re.split(r'(?<=[.!?])\s+', text):
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+class Summarizer:
+    """Map-reduce summarizer on top of an async chat(call, **kwargs) completion callable"""
+
+    def __init__(self, chat: Callable[..., Awaitable[Any]], model: str = "gpt-4o", concurrency: int = SUMMARY_CONCURRENCY):
+        self.chat = chat
+        self.model = model
+        self.concurrency = concurrency
+
+    async def _complete(self, step: str, system: str, prompt: str, semaphore: asyncio.Semaphore, json_mode: bool = False) -> str:
+        key = DiskCache.make_key("summary", PROMPT_VERSION, step, self.model, system, prompt)
+        cached = summary_cache.get(key)
+        if cached is not None:
+            SUMMARY_STEPS.inc(step=step, result="hit")
+            return cached
+
+        async with semaphore:
+            response = await self.chat(
+                f"summary_{step}",
+                model=self.model,
+                messages=build_messages(f"summary_{step}", system, prompt),
+                **({"response_format": {"type": "json_object"}} if json_mode else {})
+            )
+        text = response.choices[0].message.content
+        summary_cache.set(key, text)
+        SUMMARY_STEPS.inc(step=step, result="miss")
+        return text
+
+    async def summarize(self, sections: List[Dict[str, Any]], format: str = "detailed") -> Dict[str, Any]:
+        """Summary of the given {"title", "text"} sections in the summary tool's JSON format"""
+        if not sections:
+            raise Exception("No document content to summarize")
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        partials = await asyncio.gather(*(
+            self._complete("map", SUMMARY_MAP_SYSTEM, f"Section: {section['title']}\n\n{piece}", semaphore)
+            for section in sections
+            for piece in split_text(section["text"])
+        ))
+
+        while len(partials) > REDUCE_FAN_IN:
+            groups = [partials[i:i + REDUCE_FAN_IN] for i in range(0, len(partials), REDUCE_FAN_IN)]
+            partials = await asyncio.gather(*(
+                self._complete("reduce", SUMMARY_REDUCE_SYSTEM, "\n\n".join(group), semaphore)
+                for group in groups
+            ))
+
+        final = await self._complete(
+            "final",
+            SUMMARY_FINAL_SYSTEM,
+            f"Summary format: {format}\n\n" + "\n".join(partials),
+            semaphore,
+            json_mode=True
+        )
+        return json.loads(final)
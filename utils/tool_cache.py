@@ -0,0 +1,54 @@
+"""Persistent cache of generated learning-tool results
+
+Flashcards, practice problems, concept maps and summaries are keyed on the
+tool, its normalized parameters, a hash of the retrieved context, the model
+and the SHA-256 of the indexed PDF. Re-ingesting a different document (or a
+re-chunked one, whose context differs) therefore never reuses old results;
+those entries simply age out through the TTL and the LRU size limit.
+"""
+import hashlib
+import os
+import re
+import time
+from typing import Any, Dict, Optional
+
+from utils.disk_cache import DiskCache
+from utils.metrics import TOOL_CACHE_REQUESTS
+
+TOOL_CACHE_DIR = os.getenv("TOOL_CACHE_DIR", ".cache/tools")
+TOOL_CACHE_MB = int(os.getenv("TOOL_CACHE_MB", "100"))
+TOOL_CACHE_TTL_SECONDS = int(os.getenv("TOOL_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+tool_cache = DiskCache(TOOL_CACHE_DIR, max_bytes=TOOL_CACHE_MB * 1024 * 1024)
+
+def normalize_parameters(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Parameters as the LLM may phrase them differently: case, spacing, "5" vs 5"""
+    normalized = {}
+    for name, value in parameters.items():
+        if value is None:
+            continue
+        if isinstance(value, str):
+            value = re.sub(r"\s+", " ", value).strip().casefold()
+            if value.isdigit():
+                value = int(value)
+        normalized[name] = value
+    return normalized
+
+def tool_key(tool: str, parameters: Dict[str, Any], context: Optional[str], model: str, source_hash: Optional[str]) -> str:
+    context_hash = hashlib.sha256((context or "").encode("utf-8")).hexdigest()
+    return DiskCache.make_key("tool", tool, normalize_parameters(parameters), context_hash, model, source_hash)
+
+def get_tool_result(tool: str, key: str) -> Optional[Dict[str, Any]]:
+    """Cached result if present and younger than the TTL"""
+    entry = tool_cache.get(key)
+    if entry is None:
+        TOOL_CACHE_REQUESTS.inc(tool=tool, result="miss")
+        return None
+    if time.time() - entry["created"] > TOOL_CACHE_TTL_SECONDS:
+        TOOL_CACHE_REQUESTS.inc(tool=tool, result="expired")
+        return None
+    TOOL_CACHE_REQUESTS.inc(tool=tool, result="hit")
+    return entry["result"]
+
+def set_tool_result(key: str, result: Dict[str, Any]):
+    tool_cache.set(key, {"created": time.time(), "result": result})
@@ -0,0 +1,183 @@
+"""Per-request span trees carried in contextvars
+
+The HTTP middleware opens a trace per request with start_trace(); any code
+running in that request (including coroutines and asyncio.to_thread calls)
+opens child spans with span(), and every stage_timer in utils.metrics opens
+one automatically. Finished traces are exported one span per line in the
+JSON shape of OpenTelemetry's ConsoleSpanExporter, to stdout ("console") or
+to a JSON-lines file ("file").
+
+Traces are head-sampled (TRACE_SAMPLE_RATE). For unsampled requests span()
+returns a shared no-op object after a single contextvar lookup, so tracing
+costs next to nothing at high QPS. A request ID is assigned either way.
+"""
+import json
+import os
+import random
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+TRACE_EXPORT = os.getenv("TRACE_EXPORT", "")  # "", "console" or "file"
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "pdf-learning-assistant")
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_export_lock = threading.Lock()
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+def set_request_id(request_id: str):
+    _request_id.set(request_id)
+
+def _otel_time(ns: int) -> str:
+    return datetime.fromtimestamp(ns / 1e9, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+class Trace:
+    """Spans of one request, exported together when the root span ends"""
+
+    def __init__(self, request_id: str, trace_id: Optional[str] = None):
+        self.request_id = request_id
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.spans: List["Span"] = []
+        self.finished = False
+
+    def timings(self) -> Dict[str, float]:
+        """Milliseconds per span name (repeated stages are summed), root excluded"""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            if span.parent_id is not None and span.end_ns:
+                totals[span.name] = totals.get(span.name, 0.0) + (span.end_ns - span.start_ns) / 1e6
+        return totals
+
+class Span:
+    def __init__(self, trace: Trace, name: str, parent_id: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.trace = trace
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.status = "UNSET"
+        self.start_ns = 0
+        self.end_ns = 0
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        if exc_type is not None:
+            self.status = "ERROR"
+            self.attributes["exception.type"] = exc_type.__name__
+            self.attributes["exception.message"] = str(exc)
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            pass  # exited in another context, e.g. the end of a streamed body
+        if not self.trace.finished:
+            self.trace.spans.append(self)
+        return False
+
+    def to_otel(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "context": {"trace_id": f"0x{self.trace.trace_id}", "span_id": f"0x{self.span_id}", "trace_state": "[]"},
+            "kind": "SpanKind.SERVER" if self.parent_id is None else "SpanKind.INTERNAL",
+            "parent_id": f"0x{self.parent_id}" if self.parent_id else None,
+            "start_time": _otel_time(self.start_ns),
+            "end_time": _otel_time(self.end_ns),
+            "status": {"status_code": self.status},
+            "attributes": dict(self.attributes, **{"request.id": self.trace.request_id}),
+            "events": [],
+            "links": [],
+            "resource": {"attributes": {"service.name": SERVICE_NAME}, "schema_url": ""}
+        }
+
+class _NoopSpan:
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NOOP_SPAN = _NoopSpan()
+
+def span(name: str, **attributes: Any):
+    """Child span of the current span, or a no-op when the request is not traced"""
+    parent = _current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(parent.trace, name, parent.span_id, attributes)
+
+def set_attribute(key: str, value: Any):
+    """Attach an attribute to the current span, if any"""
+    current = _current_span.get()
+    if current is not None:
+        current.set_attribute(key, value)
+
+def should_sample(forced: bool = False) -> bool:
+    return forced or (TRACE_SAMPLE_RATE > 0 and random.random() < TRACE_SAMPLE_RATE)
+
+class _RootSpan(Span):
+    def __init__(self, trace: Trace, name: str, remote_parent_id: Optional[str], attributes: Dict[str, Any]):
+        super().__init__(trace, name, None, attributes)
+        self.remote_parent_id = remote_parent_id
+
+    def to_otel(self) -> Dict[str, Any]:
+        data = super().to_otel()
+        data["parent_id"] = f"0x{self.remote_parent_id}" if self.remote_parent_id else None
+        return data
+
+    def __exit__(self, exc_type, exc, tb):
+        super().__exit__(exc_type, exc, tb)
+        self.trace.finished = True
+        export(self.trace)
+        return False
+
+def start_trace(name: str, request_id: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None, **attributes: Any) -> Span:
+    """Root span of a new sampled trace; exported when it ends
+
+    trace_id/parent_id continue a trace started by the caller (traceparent).
+    """
+    return _RootSpan(Trace(request_id, trace_id), name, parent_id, attributes)
+
+def parse_traceparent(header: Optional[str]):
+    """(trace_id, parent_span_id, sampled) from a W3C traceparent header, or None"""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2], parts[3] == "01"
+
+def export(trace: Trace):
+    if not TRACE_EXPORT:
+        return
+    lines = "".join(json.dumps(span.to_otel()) + "\n" for span in trace.spans)
+    with _export_lock:
+        if TRACE_EXPORT == "console":
+            print(lines, end="", flush=True)
+        elif TRACE_EXPORT == "file":
+            with open(TRACE_FILE, 'a', encoding='utf-8') as f:
+                f.write(lines)
+
+def format_timings(trace: Trace, total_ms: float) -> str:
+    """Value of the X-Debug-Timings header: "classify=12.1ms, llm=803.4ms, total=850.2ms\""""
+    parts = [f"{name}={ms:.1f}ms" for name, ms in trace.timings().items()]
+    parts.append(f"total={total_ms:.1f}ms")
+    return ", ".join(parts)
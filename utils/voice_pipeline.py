@@ -0,0 +1,156 @@
+import asyncio
+import base64
+import re
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from openai import AsyncOpenAI
+
+from sarvamai_tools.streaming_stt import transcribe_recording
+from sarvamai_tools.tts_pipeline import MAX_TTS_CHARS, synthesize_segment
+from utils.embeddings.store_embeddings import query_similar_chunks
+from utils.prompts import QA_SYSTEM, build_messages, qa_user, record_usage
+from utils.resilience import llm_call
+
+SENTENCE_END = re.compile(r'(?<=[.!?।])\s+')
+
+def pop_sentences(buffer: str, max_chars: int = MAX_TTS_CHARS) -> Tuple[str, str]:
+    """Split buffer into (complete sentences, unfinished remainder)
+
+    Text without a sentence boundary is still released once it reaches
+    max_chars, cut at the last space, so synthesis never waits too long.
+    """
+    matches = list(SENTENCE_END.finditer(buffer))
+    if matches:
+        last = matches[-1]
+        return buffer[:last.start()].strip(), buffer[last.end():]
+    if len(buffer) >= max_chars:
+        cut = buffer.rfind(" ", 0, max_chars)
+        cut = cut if cut > 0 else max_chars
+        return buffer[:cut].strip(), buffer[cut:]
+    return "", buffer
+
+class VoicePipeline:
+    """Answers a spoken question with overlapping stages
+
+    STT runs first; retrieval starts as soon as the transcript exists; the
+    LLM answer is streamed and every completed sentence is translated and
+    synthesized (bounded concurrency) while generation continues. Events
+    are yielded as they happen, audio segments strictly in order.
+    """
+
+    def __init__(self, model: str = "gpt-4o", tts_concurrency: int = 3):
+        self.model = model
+        self.client = AsyncOpenAI(max_retries=0)
+        self._tts_slots = asyncio.Semaphore(tts_concurrency)
+
+    async def _synthesize(self, text: str, language_code: str, speaker: str) -> bytes:
+        async with self._tts_slots:
+            return await asyncio.to_thread(synthesize_segment, text, language_code, speaker)
+
+    async def run(
+        self,
+        collection,
+        audio_bytes: Optional[bytes] = None,
+        question: Optional[str] = None,
+        language_code: Optional[str] = None,
+        speaker: str = "meera"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+
+        def mark(name: str):
+            timings.setdefault(name, round(time.perf_counter() - start, 3))
+
+        # the response headers are already sent: failures become an error event, not a cut stream
+        try:
+            if audio_bytes is not None:
+                question, detected_language = await asyncio.to_thread(
+                    transcribe_recording, audio_bytes, "This is a question about physics concepts"
+                )
+                language_code = language_code or detected_language
+                mark("transcript")
+                yield {"type": "transcript", "text": question, "language_code": language_code}
+            language_code = language_code or "en-IN"
+
+            similar_chunks, _ = await asyncio.to_thread(query_similar_chunks, question, collection)
+            context = similar_chunks['documents'][0][0]
+            mark("retrieval")
+        except Exception as e:
+            yield {"type": "error", "detail": str(e)}
+            return
+
+        events: asyncio.Queue = asyncio.Queue()
+        segments: asyncio.Queue = asyncio.Queue()
+
+        async def generate():
+            stream = await llm_call(
+                "voice_ask",
+                "interactive",
+                self.client.chat.completions.create,
+                hedge=False,  # the deadline covers the stream starting, not the whole answer
+                model=self.model,
+                messages=build_messages("voice_ask", QA_SYSTEM, qa_user(question, context)),
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            answer = ""
+            buffer = ""
+            async for chunk in stream:
+                record_usage("voice_ask", chunk)  # only the final chunk carries usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content or ""
+                if not delta:
+                    continue
+                mark("first_token")
+                answer += delta
+                buffer += delta
+                await events.put({"type": "text", "delta": delta})
+                sentences, buffer = pop_sentences(buffer)
+                if sentences:
+                    await segments.put(asyncio.create_task(self._synthesize(sentences, language_code, speaker)))
+            if buffer.strip():
+                await segments.put(asyncio.create_task(self._synthesize(buffer.strip(), language_code, speaker)))
+            mark("generation_done")
+            await segments.put(None)
+            return answer
+
+        async def emit_audio():
+            index = 0
+            while True:
+                task = await segments.get()
+                if task is None:
+                    break
+                audio = await task
+                mark("first_audio")
+                await events.put({"type": "audio", "index": index, "audio": base64.b64encode(audio).decode("ascii")})
+                index += 1
+
+        generator = asyncio.create_task(generate())
+        emitter = asyncio.create_task(emit_audio())
+        done = asyncio.gather(generator, emitter)
+
+        def finished(future: asyncio.Future):
+            if not future.cancelled():
+                future.exception()  # re-raised below by `await done`; avoids "never retrieved"
+            events.put_nowait(None)
+
+        done.add_done_callback(finished)
+
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+            answer, _ = await done
+        except Exception as e:
+            yield {"type": "error", "detail": str(e)}
+            return
+        finally:
+            for task in (generator, emitter):
+                task.cancel()
+
+        mark("done")
+        yield {"type": "done", "answer": answer, "language_code": language_code, "timings": timings}